@@ -0,0 +1,21 @@
+"""add comment_ids to ai_summaries
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("ai_summaries", sa.Column("comment_ids", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("ai_summaries", "comment_ids")
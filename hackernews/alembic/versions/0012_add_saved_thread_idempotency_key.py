@@ -0,0 +1,23 @@
+"""add idempotency_key to saved_threads
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("saved_threads", sa.Column("idempotency_key", sa.String(length=64), nullable=True))
+    op.create_index("ix_saved_threads_idempotency_key", "saved_threads", ["idempotency_key"], unique=True)
+
+
+def downgrade():
+    op.drop_index("ix_saved_threads_idempotency_key", table_name="saved_threads")
+    op.drop_column("saved_threads", "idempotency_key")
@@ -21,3 +21,22 @@ def list_users(session=Depends(_get_session), _payload=Depends(require_admin)):
     from app.db.models.user import User
     users = session.query(User).all()
     return [{"id": u.id, "name": u.name, "email": u.email, "created_at": u.created_at} for u in users]
+
+
+@router.get("/admin/worker/metrics")
+async def worker_metrics(request: Request, _payload=Depends(require_admin)):
+    from app.tasks.scheduler import METRICS_KEY
+    snapshot = await request.app.state.redis_cache.get_json(METRICS_KEY)
+    return snapshot or {"updated_at": None, "families": {}}
+
+
+@router.get("/admin/ai/result-cache")
+async def ai_result_cache_stats(request: Request, _payload=Depends(require_admin)):
+    from app.services.ai.result_cache import result_cache_stats
+    return await result_cache_stats(request.app.state.redis_cache)
+
+
+@router.get("/admin/cache/l1")
+def l1_cache_stats(request: Request, _payload=Depends(require_admin)):
+    stats = request.app.state.redis_cache.local_stats()
+    return stats or {"enabled": False}
@@ -1,16 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
 
 from app.config import settings
-from app.db.session import get_session
+from app.db.session import get_session, run_db
 from app.services.auth.deps import require_user
 from app.services.ai.factory import get_ai_provider
-from app.db.models.comment import Comment
 from app.repositories.comment_repo import CommentRepository
-from app.services.sources.hackernews.client import AsyncHNClient
 from app.repositories.comment_summary_repo import CommentSummaryRepository
 from app.services.cache.comment_summary_cache import CommentSummaryCache
 from app.services.cache.redis import RedisCache
-from app.schemas.summary import SummaryOut
+from app.services.cache.single_flight import SingleFlight, summary_flight_key
+from app.services.queue.summary_queue import async_generation_enabled, submit_summary_job
+from app.schemas.summary import SummaryOut, SummaryJobOut, summary_payload
 
 router = APIRouter()
 
@@ -51,22 +52,15 @@ async def get_comment_summary(
 @router.post("/comments/{comment_hn_id}/summary/generate", response_model=SummaryOut, status_code=200)
 async def generate_comment_summary(
     comment_hn_id: int,
+    request: Request,
     session=Depends(_get_session),
     cache: CommentSummaryCache = Depends(_get_cache),
     _user=Depends(require_user),
 ):
     existing_repo = CommentSummaryRepository()
-    existing = existing_repo.fetch_latest(session, comment_hn_id, settings.SUMMARIZATION_MODEL_VERSION)
+    existing = await run_db(existing_repo.fetch_latest, session, comment_hn_id, settings.SUMMARIZATION_MODEL_VERSION)
     if existing is not None:
-        payload = {
-            "tldr": existing.tldr,
-            "key_points": existing.key_points,
-            "consensus": existing.consensus,
-            "model_version": existing.model_version,
-            "model_name": existing.model_name,
-            "created_at": existing.created_at.isoformat() if existing.created_at else None,
-            "updated_at": existing.updated_at.isoformat() if existing.updated_at else None,
-        }
+        payload = summary_payload(existing)
         await cache.set(comment_hn_id, existing.model_version, payload)
         return SummaryOut(
             hn_id=comment_hn_id,
@@ -79,55 +73,55 @@ async def generate_comment_summary(
             updated_at=existing.updated_at,
         )
 
-    row = session.query(Comment).filter_by(comment_hn_id=comment_hn_id).one_or_none()
+    row = await run_db(CommentRepository().get_by_hn_id, session, comment_hn_id)
     if row is None:
-        client = AsyncHNClient(base_url=str(settings.HN_API_URL))
-        await client.init()
-        try:
-            raw = await client.fetch_item(comment_hn_id)
-            if not raw or raw.get("type") != "comment":
-                raise HTTPException(status_code=404, detail="comment not found")
-
-            # Resolve story id by walking parents until we hit a story.
-            story_hn_id = None
-            parent_id = raw.get("parent")
-            for _ in range(10):
-                if parent_id is None:
-                    break
-                parent_raw = await client.fetch_item(int(parent_id))
-                if not parent_raw:
-                    break
-                if parent_raw.get("type") == "story":
-                    story_hn_id = int(parent_raw.get("id"))
-                    break
-                parent_id = parent_raw.get("parent")
-
-            if story_hn_id is None:
-                raise HTTPException(status_code=404, detail="comment must be in DB for summarization")
-
-            comment_repo = CommentRepository()
-            row, _c, _u = comment_repo.upsert(session, story_hn_id, raw)
-        finally:
-            await client.close()
-
-    provider = get_ai_provider()
-    payload = row.raw_payload or {"id": row.comment_hn_id, "text": row.text}
-    summary = await provider.summarize_story(payload)
+        client = request.app.state.hn_client
+        raw = await client.fetch_item(comment_hn_id)
+        if not raw or raw.get("type") != "comment":
+            raise HTTPException(status_code=404, detail="comment not found")
+
+        # Resolve story id by walking parents until we hit a story.
+        story_hn_id = None
+        parent_id = raw.get("parent")
+        for _ in range(10):
+            if parent_id is None:
+                break
+            parent_raw = await client.fetch_item(int(parent_id))
+            if not parent_raw:
+                break
+            if parent_raw.get("type") == "story":
+                story_hn_id = int(parent_raw.get("id"))
+                break
+            parent_id = parent_raw.get("parent")
+
+        if story_hn_id is None:
+            raise HTTPException(status_code=404, detail="comment must be in DB for summarization")
+
+        comment_repo = CommentRepository()
+        row, _c, _u = await run_db(comment_repo.upsert, session, story_hn_id, raw)
 
     summary_repo = CommentSummaryRepository()
     model_version = settings.SUMMARIZATION_MODEL_VERSION
-    model_name = settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else "mock"
-    saved, _created, _updated = summary_repo.upsert(session, comment_hn_id, summary, model_version, model_name)
-
-    payload = {
-        "tldr": saved.tldr,
-        "key_points": saved.key_points,
-        "consensus": saved.consensus,
-        "model_version": saved.model_version,
-        "model_name": saved.model_name,
-        "created_at": saved.created_at.isoformat() if saved.created_at else None,
-        "updated_at": saved.updated_at.isoformat() if saved.updated_at else None,
-    }
+
+    if async_generation_enabled(cache.redis):
+        job_id, status = await submit_summary_job(cache.redis, "comment", comment_hn_id, _user.id, model_version)
+        body = SummaryJobOut(job_id=job_id, status=status, kind="comment", hn_id=comment_hn_id, model_version=model_version)
+        return JSONResponse(status_code=202, content=body.dict(), headers={"Location": f"/v1/summaries/jobs/{job_id}"})
+
+    async def _check():
+        return await run_db(summary_repo.fetch_latest, session, comment_hn_id, model_version)
+
+    async def _produce():
+        provider = get_ai_provider(cache.redis)
+        payload = row.raw_payload or {"id": row.comment_hn_id, "text": row.text}
+        summary = await provider.summarize_story(payload)
+        model_name = settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else "mock"
+        saved, _created, _updated = await run_db(summary_repo.upsert, session, comment_hn_id, summary, model_version, model_name)
+        return saved
+
+    saved = await SingleFlight(cache.redis).run(summary_flight_key("comment", comment_hn_id, model_version), _check, _produce)
+
+    payload = summary_payload(saved)
     await cache.set(comment_hn_id, model_version, payload)
 
     return SummaryOut(
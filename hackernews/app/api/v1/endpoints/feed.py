@@ -1,14 +1,15 @@
-import math
-from datetime import datetime, timezone, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
 
 from app.config import settings
-from app.db.session import get_session
+from app.db.session import get_session, run_db
 from app.repositories.interest_repo import InterestRepository
 from app.repositories.story_repo import StoryRepository
 from app.repositories.user_story_state_repo import UserStoryStateRepository
 from app.services.auth.deps import require_user
+from app.services.cache.story_card_cache import StoryCardCache
+from app.services.cache.user_feed_cache import UserFeedCache
+from app.services.interests.ranking import shelf_scores
 
 router = APIRouter()
 
@@ -19,17 +20,6 @@ async def _get_session(request: Request):
         yield session
 
 
-def _rank(points: int | None, time: int | None, read_count: int | None) -> float:
-    p = points or 0
-    rc = read_count or 0
-    if time:
-        age_hours = max(0.0, (datetime.now(timezone.utc).timestamp() - time) / 3600.0)
-        recency = max(0.0, 1.0 - (age_hours / 72.0))
-    else:
-        recency = 0.0
-    return 0.6 * math.log1p(p) + 0.3 * recency - 0.1 * math.log1p(rc)
-
-
 class FeedSeenRequest(BaseModel):
     hn_ids: list[int]
 
@@ -54,11 +44,18 @@ async def interest_feed(
     redis_cache = request.app.state.redis_cache
     await redis_cache.track_active_user(user.id)
 
+    # Repeat opens are served from the user's materialized page
+    user_feed_cache = UserFeedCache(redis_cache)
+    # the epoch is captured before the build so a mid-build shelf rotation retires this page
+    cached, shelf_epoch = await user_feed_cache.get(user.id)
+    if cached is not None:
+        return cached[:limit]
+
     repo = InterestRepository()
     story_repo = StoryRepository()
     state_repo = UserStoryStateRepository()
     
-    interest_ids = repo.get_user_interest_ids(session, user.id)
+    interest_ids = await run_db(repo.get_user_interest_ids, session, user.id)
     import logging
     logger = logging.getLogger(__name__)
     logger.info("Feed request: user_id=%s, interest_ids=%s", user.id, interest_ids)
@@ -68,27 +65,27 @@ async def interest_feed(
         return []
 
     # Get interest names for tags
-    interest_interests_map = {}
-    for iid in interest_ids:
-        obj = repo.get_by_id(session, iid)
-        if obj:
-            interest_interests_map[iid] = obj.name
-            logger.info("Interest %s -> %s", iid, obj.name)
+    interests_by_id = await run_db(repo.get_many, session, interest_ids)
+    interest_interests_map = {iid: interests_by_id[iid].name for iid in interest_ids if iid in interests_by_id}
 
     # --- 2. Build shelves & track global size ---
     all_story_pools: dict[int, list[int]] = {}
     all_story_ids: set[int] = set()
+    # Pre-ranked by the worker (one pipelined read); rebuild from the DB (and re-publish) on a miss
+    shelves = await redis_cache.get_interest_shelves(interest_ids)
     for iid in interest_ids:
-        rows = repo.list_interest_stories(session, iid)
-        logger.info("Interest %s: found %s stories in shelf", iid, len(rows))
-        # Sort by rank locally
-        ranked = sorted(rows, key=lambda r: _rank(r.points, r.time, r.read_count), reverse=True)
-        ids = [r.story_hn_id for r in ranked]
+        ids = shelves.get(iid)
+        if ids is None:
+            rows = await run_db(repo.list_interest_stories, session, iid)
+            scores = shelf_scores(rows)
+            ids = sorted(scores, key=scores.get, reverse=True)
+            await redis_cache.set_interest_shelf(iid, scores, ex=settings.INTEREST_SHELF_TTL_SECONDS)
+        logger.info("Interest %s: found %s stories in shelf", iid, len(ids))
         all_story_pools[iid] = ids
         all_story_ids.update(ids)
 
     # --- 3. Filter unseen (read + dismissed are excluded) ---
-    state_map = state_repo.get_state_map(session, user.id, all_story_ids)
+    state_map = await run_db(state_repo.get_state_map, session, user.id, all_story_ids)
 
     def _is_excluded(hn_id: int) -> bool:
         state = state_map.get(hn_id)
@@ -97,6 +94,7 @@ async def interest_feed(
         return (state.read_count or 0) > 0 or state.dismissed_at is not None
 
     unseen_pools: dict[int, list[int]] = {}
+    low_interest_ids = []
     for iid in interest_ids:
         ids = all_story_pools.get(iid, [])
         unseen = [hid for hid in ids if not _is_excluded(hid)]
@@ -104,14 +102,17 @@ async def interest_feed(
 
         # Signal worker only if shelf is truly low or user exhausted this interest
         if len(ids) < settings.INTEREST_STORY_LIMIT or len(unseen) == 0:
-            logger.info("Signaling interest fetch for %s", iid)
-            await redis_cache.signal_interest_fetch(iid)
+            low_interest_ids.append(iid)
+    if low_interest_ids:
+        logger.info("Signaling interest fetch for %s", low_interest_ids)
+        await redis_cache.signal_interest_fetches(low_interest_ids)
 
     # --- 4. Diversity Interleaving Algorithm (unseen only) ---
+    # Build the full page once; smaller limits are a prefix of it
     results_ids = []
     pointer = 0
     added_ids = set()
-    while len(results_ids) < limit:
+    while len(results_ids) < max_limit:
         exhausted_all = True
         for iid in interest_ids:
             pool = unseen_pools.get(iid, [])
@@ -121,7 +122,7 @@ async def interest_feed(
                     results_ids.append(hn_id)
                     added_ids.add(hn_id)
                     exhausted_all = False
-            if len(results_ids) >= limit:
+            if len(results_ids) >= max_limit:
                 break
         if exhausted_all:
             break
@@ -130,8 +131,8 @@ async def interest_feed(
     logger.info("Interleaved results count: %s", len(results_ids))
 
     # --- 5. Personalize Status ---
-    state_map = state_repo.get_state_map(session, user.id, results_ids)
-    
+    # state_map from step 3 already covers every candidate id
+
     id_to_interests = {}
     for iid in interest_interests_map:
         name = interest_interests_map[iid]
@@ -141,10 +142,12 @@ async def interest_feed(
                     id_to_interests[hid] = set()
                 id_to_interests[hid].add(name)
 
+    cards = await StoryCardCache(redis_cache, story_repo).get_many(session, results_ids)
+
     final_results = []
     for hn_id in results_ids:
-        story = story_repo.get_by_hn_id(session, hn_id)
-        if story is None:
+        card = cards.get(hn_id)
+        if card is None:
             logger.warning("Story %s in interest shelf but not in stories table!", hn_id)
             continue
         
@@ -152,46 +155,49 @@ async def interest_feed(
         is_read = state.read_count > 0 if state else False
         
         final_results.append({
-            "hn_id": story.hn_id,
-            "title": story.title,
-            "url": story.url,
-            "score": story.raw_payload.get("score") if story.raw_payload else None,
-            "time": story.raw_payload.get("time") if story.raw_payload else None,
+            **card,
             "is_read": is_read,
             "tags": list(id_to_interests.get(hn_id, []))
         })
 
-    logger.info("Returning %s final results", len(final_results))
-    return final_results
+    await user_feed_cache.set(user.id, final_results, shelf_epoch)
+
+    logger.info("Returning %s final results", len(final_results[:limit]))
+    return final_results[:limit]
 
 
 @router.post("/feed/seen")
 async def mark_feed_seen(
     payload: FeedSeenRequest,
+    request: Request,
     session=Depends(_get_session),
     user=Depends(require_user),
 ):
     state_repo = UserStoryStateRepository()
-    updated = state_repo.mark_seen(session, user.id, payload.hn_ids)
+    updated = await run_db(state_repo.mark_seen, session, user.id, payload.hn_ids)
+    await UserFeedCache(request.app.state.redis_cache).invalidate(user.id)
     return {"status": "ok", "updated": updated}
 
 
 @router.post("/feed/dismiss")
 async def dismiss_feed_items(
     payload: FeedDismissRequest,
+    request: Request,
     session=Depends(_get_session),
     user=Depends(require_user),
 ):
     state_repo = UserStoryStateRepository()
-    updated = state_repo.mark_dismissed(session, user.id, payload.hn_ids)
+    updated = await run_db(state_repo.mark_dismissed, session, user.id, payload.hn_ids)
+    await UserFeedCache(request.app.state.redis_cache).invalidate(user.id)
     return {"status": "ok", "updated": updated}
 
 
 @router.post("/stories/{hn_id}/read")
-async def mark_story_read(hn_id: int, session=Depends(_get_session), user=Depends(require_user)):
+async def mark_story_read(hn_id: int, request: Request, session=Depends(_get_session), user=Depends(require_user)):
     repo = InterestRepository()
     state_repo = UserStoryStateRepository()
-    count = repo.increment_story_reads(session, hn_id)
-    interest_count = repo.increment_interest_reads_for_story(session, hn_id)
-    state_repo.mark_read(session, user.id, hn_id)
+    count = await run_db(repo.increment_story_reads, session, hn_id)
+    interest_count = await run_db(repo.increment_interest_reads_for_story, session, hn_id)
+    await run_db(state_repo.mark_read, session, user.id, hn_id)
+    await UserFeedCache(request.app.state.redis_cache).invalidate(user.id)
     return {"status": "ok", "updated": count, "interest_updated": interest_count}
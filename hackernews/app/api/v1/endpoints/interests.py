@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 
-from app.db.session import get_session
+from app.db.session import get_session, run_db
 from app.repositories.interest_repo import InterestRepository
 from app.services.auth.deps import require_user
+from app.services.cache.interest_cache import InterestListCache
+from app.services.cache.user_feed_cache import UserFeedCache
 from app.services.interests.catalog import INTEREST_GROUPS
 
 router = APIRouter()
@@ -26,34 +28,42 @@ def _seed_interests(session):
             repo.upsert_interest(session, group["group"], item["name"], item["keywords"])
 
 
-@router.get("/interests")
-async def list_interests(session=Depends(_get_session)):
-    _seed_interests(session)
+async def _interest_list(request: Request, session) -> list[dict]:
+    """The (static) catalog, seeded on first use and cached in Redis / L1."""
+    cache = InterestListCache(request.app.state.redis_cache)
+    cached = await cache.get()
+    if cached is not None:
+        return cached
+    await run_db(_seed_interests, session)
     repo = InterestRepository()
-    rows = repo.list_interests(session)
-    return [
+    rows = await run_db(repo.list_interests, session)
+    items = [
         {"id": r.id, "group": r.group_name, "name": r.name, "keywords": r.keywords}
         for r in rows
     ]
+    await cache.set(items)
+    return items
+
+
+@router.get("/interests")
+async def list_interests(request: Request, session=Depends(_get_session)):
+    return await _interest_list(request, session)
 
 
 @router.post("/interests/selection")
-async def select_interests(payload: InterestSelectionIn, session=Depends(_get_session), user=Depends(require_user)):
+async def select_interests(payload: InterestSelectionIn, request: Request, session=Depends(_get_session), user=Depends(require_user)):
     if len(payload.interest_ids) < 5 or len(payload.interest_ids) > 10:
         raise HTTPException(status_code=400, detail="select between 5 and 10 interests")
-    _seed_interests(session)
+    await run_db(_seed_interests, session)
     repo = InterestRepository()
-    repo.set_user_interests(session, user.id, payload.interest_ids)
+    await run_db(repo.set_user_interests, session, user.id, payload.interest_ids)
+    await UserFeedCache(request.app.state.redis_cache).invalidate(user.id)
     return {"status": "ok", "count": len(payload.interest_ids)}
 
 
 @router.get("/interests/me")
-async def get_my_interests(session=Depends(_get_session), user=Depends(require_user)):
+async def get_my_interests(request: Request, session=Depends(_get_session), user=Depends(require_user)):
     repo = InterestRepository()
-    ids = repo.get_user_interest_ids(session, user.id)
-    all_interests = repo.list_interests(session)
-    selected = [
-        {"id": r.id, "group": r.group_name, "name": r.name, "keywords": r.keywords}
-        for r in all_interests if r.id in ids
-    ]
+    ids = await run_db(repo.get_user_interest_ids, session, user.id)
+    selected = [item for item in await _interest_list(request, session) if item["id"] in ids]
     return {"interest_ids": ids, "selected": selected}
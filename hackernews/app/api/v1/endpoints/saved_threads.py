@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 
 from app.config import settings
-from app.db.session import get_session
+from app.db.session import get_session, run_db
 from app.services.auth.deps import require_user
 from app.repositories.story_repo import StoryRepository
 from app.repositories.saved_thread_repo import SavedThreadRepository
 from app.schemas.saved_thread import SavedThreadCreate, SavedThreadOut, SavedThreadItemOut, SavedThreadQueueOut
 from app.services.cache.redis import RedisCache
-from app.services.queue.saved_thread_queue import enqueue_saved_thread
+from app.services.queue.saved_thread_queue import enqueue_saved_thread, saved_thread_idempotency_key
 
 router = APIRouter()
 
@@ -28,12 +30,19 @@ async def create_saved_thread(
     session=Depends(_get_session),
     redis_cache: RedisCache = Depends(_get_redis),
     user=Depends(require_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     if not redis_cache.enabled():
         raise HTTPException(status_code=503, detail="redis required for queued saved threads")
 
-    await enqueue_saved_thread(redis_cache, user.id, payload.story_hn_id, payload.comment_hn_ids)
-    return SavedThreadQueueOut(status="queued", story_hn_id=payload.story_hn_id, comment_count=len(payload.comment_hn_ids))
+    key = saved_thread_idempotency_key(user.id, payload.story_hn_id, payload.comment_hn_ids, client_key=idempotency_key)
+    await enqueue_saved_thread(redis_cache, user.id, payload.story_hn_id, payload.comment_hn_ids, idempotency_key=key)
+    return SavedThreadQueueOut(
+        status="queued",
+        story_hn_id=payload.story_hn_id,
+        comment_count=len(payload.comment_hn_ids),
+        idempotency_key=key,
+    )
 
 
 @router.get("/saved_threads", response_model=list[SavedThreadOut])
@@ -42,10 +51,10 @@ async def list_saved_threads(
     user=Depends(require_user),
 ):
     repo = SavedThreadRepository()
-    threads = repo.list_threads(session, user.id)
+    threads = await run_db(repo.list_threads, session, user.id)
     results = []
     for t in threads:
-        items = repo.list_items(session, t.id)
+        items = await run_db(repo.list_items, session, t.id)
         results.append(
             SavedThreadOut(
                 id=t.id,
@@ -66,10 +75,10 @@ async def get_saved_thread(
     user=Depends(require_user),
 ):
     repo = SavedThreadRepository()
-    t = repo.get_thread(session, user.id, thread_id)
+    t = await run_db(repo.get_thread, session, user.id, thread_id)
     if t is None:
         raise HTTPException(status_code=404, detail="thread not found")
-    items = repo.list_items(session, t.id)
+    items = await run_db(repo.list_items, session, t.id)
     return SavedThreadOut(
         id=t.id,
         story_hn_id=t.story_hn_id,
@@ -2,7 +2,7 @@ from __future__ import annotations
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from app.db.session import get_session
+from app.db.session import get_session, run_db
 from app.repositories.search_query_repo import SearchQueryRepository
 from app.repositories.story_repo import StoryRepository
 from app.services.sources.hackernews.fetcher import StoryData
@@ -50,7 +50,7 @@ async def search_stories(
 
     # cache (db)
     search_repo = SearchQueryRepository()
-    row = search_repo.get(session, normalized, limit)
+    row = await run_db(search_repo.get, session, normalized, limit)
     if row is not None and search_repo.is_fresh(row, settings.SEARCH_DB_TTL_DAYS):
         return row.results
 
@@ -63,6 +63,7 @@ async def search_stories(
     hits = await client.search(normalized, limit)
     results: List[StoryOut] = []
     story_repo = StoryRepository()
+    minimal_stories: List[StoryData] = []
     for h in hits:
         try:
             hn_id = int(h.get("objectID")) if h.get("objectID") else None
@@ -77,24 +78,27 @@ async def search_stories(
 
         results.append(StoryOut(hn_id=hn_id, title=title, url=url, score=score, time=time_val))
 
-        # upsert minimal story row for detail views
+        # minimal story row for detail views
         raw_payload = {"id": hn_id, "title": title, "url": url, "score": score, "time": time_val}
-        sd = StoryData(
-            hn_id=hn_id,
-            title=title,
-            url=url,
-            score=score,
-            time=time_val,
-            descendants=None,
-            raw_payload=raw_payload,
+        minimal_stories.append(
+            StoryData(
+                hn_id=hn_id,
+                title=title,
+                url=url,
+                score=score,
+                time=time_val,
+                descendants=None,
+                raw_payload=raw_payload,
+            )
         )
-        try:
-            story_repo.upsert(session, sd)
-        except Exception:
-            # best-effort upsert
-            pass
+
+    try:
+        await run_db(story_repo.upsert_many, session, minimal_stories)
+    except Exception:
+        # best-effort upsert
+        await run_db(session.rollback)
 
     payload = [r.dict() for r in results]
     await cache.set(normalized, limit, payload)
-    search_repo.upsert(session, normalized, limit, payload)
+    await run_db(search_repo.upsert, session, normalized, limit, payload)
     return results
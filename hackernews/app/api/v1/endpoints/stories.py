@@ -1,14 +1,18 @@
+import asyncio
 from typing import List
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from app.config import settings
 from app.schemas.story import StoryOut
 from app.schemas.comment import CommentOut
 from app.repositories.comment_repo import CommentRepository
 from app.repositories.story_repo import StoryRepository
-from app.services.sources.hackernews.client import AsyncHNClient
 from app.services.sources.hackernews.fetcher import HNFetcher
 from app.services.cache.feed_cache import FeedCache
-from app.db.session import get_session
+from app.db.session import get_session, run_db
+from app.repositories.summary_repo import SummaryRepository
+from app.services.cache.summary_cache import SummaryCache
+from app.services.queue.story_events import StorySubscription, format_sse, SUMMARY_READY
 
 from fastapi import Request
 
@@ -19,7 +23,7 @@ async def _get_feed_cache(request: Request) -> FeedCache:
     # `app.state` must have `redis_cache` and `SessionLocal` set by create_app
     redis_cache = request.app.state.redis_cache
     repo = request.app.state.top_story_repo
-    return FeedCache(redis_cache, repo)
+    return FeedCache(redis_cache, repo, request.app.state.SessionLocal)
 
 
 async def _get_session(request: Request):
@@ -40,12 +44,7 @@ async def get_stories(
     if limit > max_limit:
         limit = max_limit
 
-    # Try cache first
-    cached = await feed_cache.read_feed()
-    if cached:
-        return cached[:limit]
-
-    # fallback to DB serialization
+    # Current snapshot (rebuilt in the background when soft-expired; built once on a cold cache)
     result = await feed_cache.read_or_fallback(session)
     return result[:limit]
 
@@ -57,7 +56,7 @@ async def get_story_detail(
     session=Depends(_get_session),
 ):
     story_repo = StoryRepository()
-    story = story_repo.get_by_hn_id(session, hn_id)
+    story = await run_db(story_repo.get_by_hn_id, session, hn_id)
     if story is None:
         raise HTTPException(status_code=404, detail="story not found")
 
@@ -68,24 +67,20 @@ async def get_story_detail(
         await redis_cache.signal_comment_fetch(hn_id)
 
     comment_repo = CommentRepository()
-    comments = comment_repo.fetch_for_story(session, hn_id, limit=settings.COMMENTS_PREVIEW_LIMIT)
+    comments = await run_db(comment_repo.fetch_for_story, session, hn_id, limit=settings.COMMENTS_PREVIEW_LIMIT)
 
     # Optimization: If DB is empty, fetch just 3 comments synchronously for instant feedback
     if not comments and story.raw_payload and story.raw_payload.get("kids"):
         kids = story.raw_payload.get("kids")[: settings.COMMENTS_PREVIEW_LIMIT]
-        client = AsyncHNClient(base_url=str(settings.HN_API_URL))
-        await client.init()
-        try:
-            for kid in kids:
-                try:
-                    raw = await client.fetch_item(int(kid))
-                    if raw and isinstance(raw, dict) and raw.get("type") == "comment" and not raw.get("dead") and not raw.get("deleted"):
-                        comment_repo.upsert(session, hn_id, raw)
-                except Exception:
-                    continue
-        finally:
-            await client.close()
-        comments = comment_repo.fetch_for_story(session, hn_id, limit=settings.COMMENTS_PREVIEW_LIMIT)
+        client = request.app.state.hn_client
+        for kid in kids:
+            try:
+                raw = await client.fetch_item(int(kid))
+                if raw and isinstance(raw, dict) and raw.get("type") == "comment" and not raw.get("dead") and not raw.get("deleted"):
+                    await run_db(comment_repo.upsert, session, hn_id, raw)
+            except Exception:
+                continue
+        comments = await run_db(comment_repo.fetch_for_story, session, hn_id, limit=settings.COMMENTS_PREVIEW_LIMIT)
 
     return {
         "hn_id": story.hn_id,
@@ -114,7 +109,7 @@ async def get_story_comments(
     comment_repo = CommentRepository()
     
     # Check what we have
-    comments = comment_repo.fetch_for_story(session, hn_id, limit=limit)
+    comments = await run_db(comment_repo.fetch_for_story, session, hn_id, limit=limit)
     
     # Trigger (or re-trigger) background fetch if we are below requested limit
     if len(comments) < limit:
@@ -123,21 +118,58 @@ async def get_story_comments(
     # If totally empty, do a small synchronous fetch like in detail view
     if not comments:
         story_repo = StoryRepository()
-        story = story_repo.get_by_hn_id(session, hn_id)
+        story = await run_db(story_repo.get_by_hn_id, session, hn_id)
         if story and story.raw_payload and story.raw_payload.get("kids"):
             kids = story.raw_payload.get("kids")[: settings.COMMENTS_PREVIEW_LIMIT]
-            client = AsyncHNClient(base_url=str(settings.HN_API_URL))
-            await client.init()
-            try:
-                for kid in kids:
-                    try:
-                        raw = await client.fetch_item(int(kid))
-                        if raw and isinstance(raw, dict) and raw.get("type") == "comment" and not raw.get("dead") and not raw.get("deleted"):
-                            comment_repo.upsert(session, hn_id, raw)
-                    except Exception:
-                        continue
-            finally:
-                await client.close()
-            comments = comment_repo.fetch_for_story(session, hn_id, limit=limit)
+            client = request.app.state.hn_client
+            for kid in kids:
+                try:
+                    raw = await client.fetch_item(int(kid))
+                    if raw and isinstance(raw, dict) and raw.get("type") == "comment" and not raw.get("dead") and not raw.get("deleted"):
+                        await run_db(comment_repo.upsert, session, hn_id, raw)
+                except Exception:
+                    continue
+            comments = await run_db(comment_repo.fetch_for_story, session, hn_id, limit=limit)
 
     return comments
+
+
+@router.get("/{hn_id}/events")
+async def story_events(hn_id: int, request: Request):
+    """Server-Sent Events stream of `summary_ready` / `comments_ready` for one story.
+
+    Replaces polling the summary and comments endpoints: the current summary (if
+    any) is sent on connect, then events are pushed as the worker publishes them.
+    """
+    redis_cache = request.app.state.redis_cache
+    SessionLocal = request.app.state.SessionLocal
+    model_version = settings.SUMMARIZATION_MODEL_VERSION
+
+    async def _stream():
+        async with StorySubscription(request.app.state.story_events, hn_id) as sub:
+            # subscribed first, so a summary written during this check is still delivered
+            with get_session(SessionLocal) as session:
+                summary = await SummaryCache(redis_cache, SummaryRepository()).get_or_db(session, hn_id, model_version)
+            if summary is not None:
+                yield format_sse(SUMMARY_READY, {"event": SUMMARY_READY, "hn_id": hn_id, "model_version": model_version, "summary": summary})
+            if not sub.active:
+                return
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + settings.SSE_MAX_STREAM_SECONDS
+            while loop.time() < deadline:
+                if await request.is_disconnected():
+                    break
+                event = await sub.next_event(timeout=settings.SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event.get("event") == SUMMARY_READY and event.get("model_version") != model_version:
+                    continue
+                yield format_sse(event.get("event", "message"), event)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,20 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.config import settings
 from app.services.cache.summary_cache import SummaryCache
-from app.schemas.summary import SummaryOut
+from app.schemas.summary import SummaryOut, SummaryJobOut, summary_payload
 from app.repositories.summary_repo import SummaryRepository
 from datetime import datetime, timezone
 from app.repositories.story_repo import StoryRepository
-from app.services.sources.hackernews.client import AsyncHNClient
 from app.services.sources.hackernews.fetcher import HNFetcher
-from app.db.session import get_session
+from app.db.session import get_session, run_db
 from app.services.cache.redis import RedisCache
+from app.services.cache.single_flight import SingleFlight, summary_flight_key
 from app.services.auth.deps import require_user
 from app.services.ai.factory import get_ai_provider
+from app.services.ai.base import summary_events
+from app.services.ai.pipeline import discussion_summarizer, summarize_story_with_discussion
+from app.services.ai.schemas import SummaryData
+from app.services.queue.story_events import StorySubscription, format_sse, SUMMARY_READY
 from app.repositories.comment_summary_repo import CommentSummaryRepository
 from app.services.cache.comment_summary_cache import CommentSummaryCache
 from app.repositories.comment_repo import CommentRepository
+from app.services.queue.summary_queue import (
+    async_generation_enabled,
+    submit_summary_job,
+    get_job_status,
+    parse_summary_job_id,
+    JOB_QUEUED,
+    JOB_DONE,
+    JOB_FAILED,
+)
+
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -31,6 +50,51 @@ async def _get_session(request: Request):
         yield session
 
 
+async def _accept_summary_job(redis_cache: RedisCache, kind: str, hn_id: int, user_id: int, model_version: str) -> JSONResponse:
+    job_id, status = await submit_summary_job(redis_cache, kind, hn_id, user_id, model_version)
+    body = SummaryJobOut(job_id=job_id, status=status, kind=kind, hn_id=hn_id, model_version=model_version)
+    return JSONResponse(status_code=202, content=body.dict(), headers={"Location": f"/v1/summaries/jobs/{job_id}"})
+
+
+async def _check_story_rate_limit(redis_cache: RedisCache, user_id: int) -> None:
+    # Rate limit per user per hour
+    if redis_cache and redis_cache.enabled():
+        hour_key = datetime.now(timezone.utc).strftime("%Y%m%d%H")
+        rate_key = f"rate:summary:{user_id}:{hour_key}"
+        count = await redis_cache.incr(rate_key, ex=3600)
+        if count and count > settings.SUMMARY_RATE_LIMIT_PER_HOUR:
+            raise HTTPException(status_code=429, detail="summary generation rate limit exceeded")
+
+
+async def _load_or_fetch_story(request: Request, session, hn_id: int):
+    story_repo = StoryRepository()
+    story = await run_db(story_repo.get_by_hn_id, session, hn_id)
+    if story is None:
+        # Fetch from HN API on-demand (for search results not in DB)
+        try:
+            fetcher = HNFetcher(request.app.state.hn_client)
+            sd = await fetcher.fetch_and_normalize(hn_id)
+        except Exception:
+            sd = None
+        if sd is None:
+            raise HTTPException(status_code=404, detail="story not found")
+        story, _created, _updated = await run_db(story_repo.upsert, session, sd)
+    return story
+
+
+def _summary_out(hn_id: int, model_version: str, payload: dict) -> SummaryOut:
+    return SummaryOut(
+        hn_id=hn_id,
+        model_version=model_version,
+        tldr=payload.get("tldr"),
+        key_points=payload.get("key_points"),
+        consensus=payload.get("consensus"),
+        model_name=payload.get("model_name"),
+        created_at=payload.get("created_at"),
+        updated_at=payload.get("updated_at"),
+    )
+
+
 @router.get("/stories/{hn_id}/summary", response_model=SummaryOut)
 async def get_summary(hn_id: int, session=Depends(_get_session), summary_cache: SummaryCache = Depends(_get_summary_cache)):
     model_version = settings.SUMMARIZATION_MODEL_VERSION
@@ -52,9 +116,24 @@ async def get_summary(hn_id: int, session=Depends(_get_session), summary_cache:
     )
 
 
+@router.get("/summaries", response_model=list[SummaryOut])
+async def get_summaries(
+    hn_ids: list[int] = Query(..., description="story ids of a feed page (repeat the parameter)"),
+    session=Depends(_get_session),
+    summary_cache: SummaryCache = Depends(_get_summary_cache),
+):
+    """Available summaries for a page of stories; stories without one are omitted."""
+    if len(hn_ids) > settings.TOP_STORIES_LIMIT:
+        raise HTTPException(status_code=400, detail=f"at most {settings.TOP_STORIES_LIMIT} ids per request")
+    model_version = settings.SUMMARIZATION_MODEL_VERSION
+    found = await summary_cache.get_many_or_db(session, hn_ids, model_version)
+    return [_summary_out(hn_id, model_version, found[hn_id]) for hn_id in dict.fromkeys(hn_ids) if hn_id in found]
+
+
 @router.post("/stories/{hn_id}/summary/generate", response_model=SummaryOut, status_code=200)
 async def generate_summary(
     hn_id: int,
+    request: Request,
     session=Depends(_get_session),
     summary_cache: SummaryCache = Depends(_get_summary_cache),
     _user=Depends(require_user),
@@ -62,17 +141,9 @@ async def generate_summary(
     model_version = settings.SUMMARIZATION_MODEL_VERSION
     summary_repo = SummaryRepository()
 
-    existing = summary_repo.fetch_latest(session, hn_id, model_version)
+    existing = await run_db(summary_repo.fetch_latest, session, hn_id, model_version)
     if existing is not None:
-        payload = {
-            "tldr": existing.tldr,
-            "key_points": existing.key_points,
-            "consensus": existing.consensus,
-            "model_version": existing.model_version,
-            "model_name": existing.model_name,
-            "created_at": existing.created_at.isoformat() if existing.created_at else None,
-            "updated_at": existing.updated_at.isoformat() if existing.updated_at else None,
-        }
+        payload = summary_payload(existing)
         await summary_cache.set(hn_id, model_version, payload)
         return SummaryOut(
             hn_id=hn_id,
@@ -85,47 +156,30 @@ async def generate_summary(
             updated_at=existing.updated_at,
         )
 
-    # Rate limit per user per hour
     redis_cache: RedisCache = summary_cache.redis
-    if redis_cache and redis_cache.enabled():
-        hour_key = datetime.now(timezone.utc).strftime("%Y%m%d%H")
-        rate_key = f"rate:summary:{_user.id}:{hour_key}"
-        count = await redis_cache.incr(rate_key, ex=3600)
-        if count and count > settings.SUMMARY_RATE_LIMIT_PER_HOUR:
-            raise HTTPException(status_code=429, detail="summary generation rate limit exceeded")
+    await _check_story_rate_limit(redis_cache, _user.id)
+    story = await _load_or_fetch_story(request, session, hn_id)
 
-    # Fetch story
-    story_repo = StoryRepository()
-    story = story_repo.get_by_hn_id(session, hn_id)
-    if story is None:
-        # Fetch from HN API on-demand (for search results not in DB)
-        client = AsyncHNClient(base_url=str(settings.HN_API_URL))
-        await client.init()
-        try:
-            fetcher = HNFetcher(client)
-            sd = await fetcher.fetch_and_normalize(hn_id)
-        except Exception:
-            sd = None
-        finally:
-            await client.close()
-        if sd is None:
-            raise HTTPException(status_code=404, detail="story not found")
-        story, _created, _updated = story_repo.upsert(session, sd)
-
-    provider = get_ai_provider()
-    summary = await provider.summarize_story(story.raw_payload or {"id": story.hn_id, "title": story.title})
-    model_name = settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else "mock"
-    saved, _created, _updated = summary_repo.upsert_summary(session, story.hn_id, summary, model_version, model_name)
-
-    payload = {
-        "tldr": saved.tldr,
-        "key_points": saved.key_points,
-        "consensus": saved.consensus,
-        "model_version": saved.model_version,
-        "model_name": saved.model_name,
-        "created_at": saved.created_at.isoformat() if saved.created_at else None,
-        "updated_at": saved.updated_at.isoformat() if saved.updated_at else None,
-    }
+    if async_generation_enabled(redis_cache):
+        return await _accept_summary_job(redis_cache, "story", story.hn_id, _user.id, model_version)
+
+    # Concurrent requests for the same story wait for one generation
+    async def _check():
+        return await run_db(summary_repo.fetch_latest, session, story.hn_id, model_version)
+
+    async def _produce():
+        provider = get_ai_provider(redis_cache)
+        comments = await run_db(CommentRepository().fetch_uncovered_for_story, session, story.hn_id, (), settings.DISCUSSION_MAX_COMMENTS)
+        result = await summarize_story_with_discussion(provider, story.raw_payload or {"id": story.hn_id, "title": story.title}, comments)
+        model_name = settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else "mock"
+        saved, _created, _updated = await run_db(
+            summary_repo.upsert_summary, session, story.hn_id, result.summary, model_version, model_name, result.comment_ids
+        )
+        return saved
+
+    saved = await SingleFlight(redis_cache).run(summary_flight_key("story", story.hn_id, model_version), _check, _produce)
+
+    payload = summary_payload(saved)
     await summary_cache.set(story.hn_id, model_version, payload)
 
     return SummaryOut(
@@ -140,6 +194,159 @@ async def generate_summary(
     )
 
 
+def _replay_sse(hn_id: int, payload: dict):
+    """SSE frames for an already generated summary, in the same shape as a live stream."""
+    stored = SummaryData(tldr=payload.get("tldr") or "", key_points=payload.get("key_points") or [], consensus=payload.get("consensus") or "unclear")
+    for event in summary_events(stored)[:-1]:
+        yield format_sse(event.kind, {"text": event.text})
+    yield format_sse("done", {"hn_id": hn_id, **payload})
+
+
+# strong references to stream generations that outlive a disconnected client
+_stream_generations: set = set()
+
+
+@router.post("/stories/{hn_id}/summary/stream")
+async def stream_summary(
+    hn_id: int,
+    request: Request,
+    session=Depends(_get_session),
+    summary_cache: SummaryCache = Depends(_get_summary_cache),
+    _user=Depends(require_user),
+):
+    """Generate a story summary as Server-Sent Events.
+
+    Emits `tldr` first, then one `key_point` per bullet and `consensus` as the model
+    produces them, and finally `done` with the persisted summary.
+
+    Generation goes through the story's single-flight key: the leader streams live,
+    concurrent requests wait for it and replay the stored result. In async mode the
+    worker generates instead; the stream emits `queued` with the job id and replays
+    the summary when `summary_ready` arrives on the story's event channel.
+    """
+    model_version = settings.SUMMARIZATION_MODEL_VERSION
+    summary_repo = SummaryRepository()
+    redis_cache: RedisCache = summary_cache.redis
+    SessionLocal = request.app.state.SessionLocal
+
+    existing = await run_db(summary_repo.fetch_latest, session, hn_id, model_version)
+    if existing is not None:
+        return _sse_response(_replay_sse(hn_id, summary_payload(existing)))
+
+    await _check_story_rate_limit(redis_cache, _user.id)
+    story = await _load_or_fetch_story(request, session, hn_id)
+    story_payload = story.raw_payload or {"id": story.hn_id, "title": story.title}
+
+    if async_generation_enabled(redis_cache):
+        return _sse_response(_await_summary_job(request, redis_cache, SessionLocal, hn_id, _user.id, model_version))
+
+    comments = await run_db(CommentRepository().fetch_uncovered_for_story, session, story.hn_id, (), settings.DISCUSSION_MAX_COMMENTS)
+
+    async def _events():
+        frames: asyncio.Queue = asyncio.Queue()
+        streamed = False
+
+        async def _check():
+            with get_session(SessionLocal) as read_session:
+                return await run_db(summary_repo.fetch_latest, read_session, hn_id, model_version)
+
+        async def _produce():
+            nonlocal streamed
+            provider = get_ai_provider(redis_cache)
+            model_name = settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else "mock"
+            payload, chunks = story_payload, []
+            if comments:
+                # chunk summaries run first; the final merge is what streams
+                payload, chunks = await discussion_summarizer(provider).final_payload(story_payload, comments)
+            comment_ids = [cid for chunk in chunks for cid in chunk.comment_ids]
+            async for event in provider.stream_summary(payload):
+                if event.kind != "done":
+                    streamed = True
+                    frames.put_nowait(format_sse(event.kind, {"text": event.text}))
+                    continue
+                with get_session(SessionLocal) as write_session:
+                    saved, _created, _updated = await run_db(
+                        summary_repo.upsert_summary, write_session, hn_id, event.summary, model_version, model_name, comment_ids
+                    )
+                return saved
+            raise RuntimeError("summary stream ended without a result")
+
+        # runs to completion even if the client goes away, so the summary is still stored
+        flight = asyncio.create_task(SingleFlight(redis_cache).run(summary_flight_key("story", hn_id, model_version), _check, _produce))
+        _stream_generations.add(flight)
+        flight.add_done_callback(_stream_generations.discard)
+        flight.add_done_callback(lambda _task: frames.put_nowait(None))
+
+        while True:
+            try:
+                frame = await asyncio.wait_for(frames.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # followers wait on the leader silently; keep the connection open
+                yield ": keep-alive\n\n"
+                continue
+            if frame is None:
+                break
+            yield frame
+
+        try:
+            saved = flight.result()
+        except Exception:
+            logger.exception("Streaming summary failed for %s", hn_id)
+            yield format_sse("error", {"detail": "summary generation failed"})
+            return
+        payload = summary_payload(saved)
+        await summary_cache.set(hn_id, model_version, payload)
+        if streamed:
+            yield format_sse("done", {"hn_id": hn_id, **payload})
+        else:
+            # another request generated it while this one waited
+            for frame in _replay_sse(hn_id, payload):
+                yield frame
+
+    return _sse_response(_events())
+
+
+async def _await_summary_job(request: Request, redis_cache: RedisCache, SessionLocal, hn_id: int, user_id: int, model_version: str):
+    """Async mode: enqueue the job and stream the summary once the worker publishes it."""
+    async with StorySubscription(request.app.state.story_events, hn_id) as sub:
+        # subscribed before submitting, so the worker's summary_ready cannot be missed
+        job_id, status = await submit_summary_job(redis_cache, "story", hn_id, user_id, model_version)
+        yield format_sse(JOB_QUEUED, {"job_id": job_id, "status": status})
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.SSE_MAX_STREAM_SECONDS
+        while loop.time() < deadline:
+            with get_session(SessionLocal) as session:
+                payload = await SummaryCache(redis_cache, SummaryRepository()).get_or_db(session, hn_id, model_version)
+            if payload is not None:
+                for frame in _replay_sse(hn_id, payload):
+                    yield frame
+                return
+            job = await get_job_status(redis_cache, job_id)
+            if job is not None and job.get("status") == JOB_FAILED:
+                yield format_sse("error", {"detail": "summary generation failed", "job_id": job_id})
+                return
+            if await request.is_disconnected():
+                return
+            event = await sub.next_event(timeout=settings.SSE_HEARTBEAT_SECONDS)
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            if event.get("event") == SUMMARY_READY and event.get("model_version") == model_version and event.get("summary"):
+                for frame in _replay_sse(hn_id, event["summary"]):
+                    yield frame
+                return
+        yield format_sse("error", {"detail": "timed out waiting for the summary", "job_id": job_id})
+
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/comments/{hn_id}/summary", response_model=SummaryOut)
 async def get_comment_summary(
     hn_id: int,
@@ -178,7 +385,7 @@ async def generate_comment_summary(
     repo = CommentSummaryRepository()
     cache = CommentSummaryCache(redis_cache, repo)
 
-    existing = repo.fetch_latest(session, hn_id, model_version)
+    existing = await run_db(repo.fetch_latest, session, hn_id, model_version)
     if existing is not None:
         return SummaryOut(
             hn_id=hn_id,
@@ -200,52 +407,50 @@ async def generate_comment_summary(
             raise HTTPException(status_code=429, detail="rate limit exceeded")
 
     comment_repo = CommentRepository()
-    comment = comment_repo.get_by_hn_id(session, hn_id)
+    comment = await run_db(comment_repo.get_by_hn_id, session, hn_id)
     if comment is None:
         # fetch from HN and backfill to DB on-demand
-        client = AsyncHNClient(base_url=str(settings.HN_API_URL))
-        await client.init()
-        try:
-            raw = await client.fetch_item(hn_id)
-            if not raw or raw.get("type") != "comment":
-                raise HTTPException(status_code=404, detail="comment not found")
-
-            # Resolve story id by walking parents until we hit a story.
-            story_hn_id = None
-            parent_id = raw.get("parent")
-            for _ in range(10):
-                if parent_id is None:
-                    break
-                parent_raw = await client.fetch_item(int(parent_id))
-                if not parent_raw:
-                    break
-                if parent_raw.get("type") == "story":
-                    story_hn_id = int(parent_raw.get("id"))
-                    break
-                parent_id = parent_raw.get("parent")
-
-            if story_hn_id is None:
-                raise HTTPException(status_code=404, detail="comment must be in DB for summarization")
-
-            comment_repo = CommentRepository()
-            comment, _c, _u = comment_repo.upsert(session, story_hn_id, raw)
-        finally:
-            await client.close()
-
-    provider = get_ai_provider()
-    summary = await provider.summarize_story(comment.raw_payload or {"id": comment.comment_hn_id, "text": comment.text})
-    model_name = settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else "mock"
-    saved, _, _ = repo.upsert(session, hn_id, summary, model_version, model_name)
-
-    payload = {
-        "tldr": saved.tldr,
-        "key_points": saved.key_points,
-        "consensus": saved.consensus,
-        "model_version": saved.model_version,
-        "model_name": saved.model_name,
-        "created_at": saved.created_at.isoformat() if saved.created_at else None,
-        "updated_at": saved.updated_at.isoformat() if saved.updated_at else None,
-    }
+        client = request.app.state.hn_client
+        raw = await client.fetch_item(hn_id)
+        if not raw or raw.get("type") != "comment":
+            raise HTTPException(status_code=404, detail="comment not found")
+
+        # Resolve story id by walking parents until we hit a story.
+        story_hn_id = None
+        parent_id = raw.get("parent")
+        for _ in range(10):
+            if parent_id is None:
+                break
+            parent_raw = await client.fetch_item(int(parent_id))
+            if not parent_raw:
+                break
+            if parent_raw.get("type") == "story":
+                story_hn_id = int(parent_raw.get("id"))
+                break
+            parent_id = parent_raw.get("parent")
+
+        if story_hn_id is None:
+            raise HTTPException(status_code=404, detail="comment must be in DB for summarization")
+
+        comment_repo = CommentRepository()
+        comment, _c, _u = await run_db(comment_repo.upsert, session, story_hn_id, raw)
+
+    if async_generation_enabled(redis_cache):
+        return await _accept_summary_job(redis_cache, "comment", hn_id, _user.id, model_version)
+
+    async def _check():
+        return await run_db(repo.fetch_latest, session, hn_id, model_version)
+
+    async def _produce():
+        provider = get_ai_provider(redis_cache)
+        summary = await provider.summarize_story(comment.raw_payload or {"id": comment.comment_hn_id, "text": comment.text})
+        model_name = settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else "mock"
+        saved, _, _ = await run_db(repo.upsert, session, hn_id, summary, model_version, model_name)
+        return saved
+
+    saved = await SingleFlight(redis_cache).run(summary_flight_key("comment", hn_id, model_version), _check, _produce)
+
+    payload = summary_payload(saved)
     await cache.set(hn_id, model_version, payload)
 
     return SummaryOut(
@@ -258,3 +463,52 @@ async def generate_comment_summary(
         created_at=saved.created_at,
         updated_at=saved.updated_at,
     )
+
+
+@router.get("/summaries/jobs/{job_id}", response_model=SummaryJobOut)
+async def get_summary_job(
+    job_id: str,
+    request: Request,
+    wait: float = Query(default=0, ge=0),
+    session=Depends(_get_session),
+    _user=Depends(require_user),
+):
+    """Poll a generation job; `wait` long-polls (capped) until the summary is ready."""
+    parsed = parse_summary_job_id(job_id)
+    if parsed is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    kind, hn_id, model_version = parsed
+
+    redis_cache: RedisCache = request.app.state.redis_cache
+    if kind == "comment":
+        cache = CommentSummaryCache(redis_cache, CommentSummaryRepository())
+    else:
+        cache = SummaryCache(redis_cache, SummaryRepository())
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(wait, settings.SUMMARY_JOB_MAX_WAIT_SECONDS)
+    while True:
+        payload = await cache.get_or_db(session, hn_id, model_version)
+        if payload is not None:
+            return SummaryJobOut(
+                job_id=job_id,
+                status=JOB_DONE,
+                kind=kind,
+                hn_id=hn_id,
+                model_version=model_version,
+                summary=_summary_out(hn_id, model_version, payload),
+            )
+
+        status = await get_job_status(redis_cache, job_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail="job not found")
+        if status.get("status") in (JOB_DONE, JOB_FAILED) or loop.time() >= deadline:
+            return SummaryJobOut(
+                job_id=job_id,
+                status=status.get("status"),
+                kind=kind,
+                hn_id=hn_id,
+                model_version=model_version,
+                error=status.get("error"),
+            )
+        await asyncio.sleep(settings.SUMMARY_JOB_POLL_SECONDS)
@@ -7,14 +7,28 @@ from typing import Optional
 class Settings(BaseSettings):
     # External services
     HN_API_URL: AnyUrl = Field("https://hacker-news.firebaseio.com/v0", env="HN_API_URL")
+    # Shared HN client: token bucket, in-flight cap and connection pool
+    HN_RATE_LIMIT_PER_SEC: float = Field(10.0, env="HN_RATE_LIMIT_PER_SEC")
+    HN_MAX_CONCURRENCY: int = Field(10, env="HN_MAX_CONCURRENCY")
+    HN_HTTP2: bool = Field(True, env="HN_HTTP2")
+    HN_MAX_CONNECTIONS: int = Field(20, env="HN_MAX_CONNECTIONS")
+    HN_MAX_KEEPALIVE_CONNECTIONS: int = Field(10, env="HN_MAX_KEEPALIVE_CONNECTIONS")
+    HN_KEEPALIVE_EXPIRY_SECONDS: float = Field(30.0, env="HN_KEEPALIVE_EXPIRY_SECONDS")
 
     # Redis
     REDIS_ENABLED: bool = True
     REDIS_URL: str | None = "redis://localhost:6379"
+    # Cache value codec: "json" (legacy text), "orjson" or "msgpack" (framed, needs the package).
+    # Readers accept every format, so switch writers only after all replicas run this code.
+    REDIS_CODEC: str = Field("json", env="REDIS_CODEC")
+    # zlib-compress encoded values at least this large (0 disables; framed format)
+    REDIS_COMPRESS_MIN_BYTES: int = Field(0, env="REDIS_COMPRESS_MIN_BYTES")
 
 
     # Database (SQLite for MVP)
     DATABASE_URL: str = Field("sqlite:///./dev.db", env="DATABASE_URL")
+    # Bounded thread pool that runs blocking SQLAlchemy work off the event loop
+    DB_THREADPOOL_SIZE: int = Field(8, env="DB_THREADPOOL_SIZE")
 
     # Search (HN Algolia)
     SEARCH_API_URL: AnyUrl = Field("https://hn.algolia.com/api/v1/search", env="SEARCH_API_URL")
@@ -27,6 +41,10 @@ class Settings(BaseSettings):
     INTEREST_REFRESH_SECONDS: int = Field(900, env="INTEREST_REFRESH_SECONDS")
     INTEREST_BACKLOG_LIMIT: int = Field(50, env="INTEREST_BACKLOG_LIMIT")
     INTEREST_STORY_LIMIT: int = Field(10, env="INTEREST_STORY_LIMIT")
+    # Pre-ranked shelf ZSETs outlive a couple of refresh cycles, then fall back to the DB
+    INTEREST_SHELF_TTL_SECONDS: int = Field(3600, env="INTEREST_SHELF_TTL_SECONDS")
+    USER_FEED_TTL_SECONDS: int = Field(600, env="USER_FEED_TTL_SECONDS")
+    INTERESTS_LIST_TTL_SECONDS: int = Field(3600, env="INTERESTS_LIST_TTL_SECONDS")
 
     # Top stories (global)
     TOP_STORIES_LIMIT: int = Field(50, env="TOP_STORIES_LIMIT")
@@ -35,10 +53,24 @@ class Settings(BaseSettings):
     # Fetching / operational
     FETCH_INTERVAL_SECONDS: int = Field(60, env="FETCH_INTERVAL_SECONDS")
     FEED_LIMIT: int = Field(50, env="FEED_LIMIT")
+    # Top-stories snapshots: soft-expire after FEED_TTL_SECONDS (served while a rebuild runs),
+    # hard-expire after FEED_SNAPSHOT_TTL_SECONDS; a replaced snapshot lingers briefly for in-flight readers
     FEED_TTL_SECONDS: int = Field(300, env="FEED_TTL_SECONDS")
+    FEED_SNAPSHOT_TTL_SECONDS: int = Field(86400, env="FEED_SNAPSHOT_TTL_SECONDS")
+    FEED_PREVIOUS_SNAPSHOT_TTL_SECONDS: int = Field(60, env="FEED_PREVIOUS_SNAPSHOT_TTL_SECONDS")
+    STORY_CARD_TTL_SECONDS: int = Field(300, env="STORY_CARD_TTL_SECONDS")
     CLEANUP_INTERVAL_SECONDS: int = Field(86400, env="CLEANUP_INTERVAL_SECONDS")
     CLEANUP_RETENTION_DAYS: int = Field(7, env="CLEANUP_RETENTION_DAYS")
 
+    # In-process L1 cache in front of Redis (hot feed / summary / interests keys).
+    # Enable on API replicas and the worker so writes broadcast invalidations.
+    CACHE_L1_ENABLED: bool = Field(False, env="CACHE_L1_ENABLED")
+    CACHE_L1_MAX_ENTRIES: int = Field(2048, env="CACHE_L1_MAX_ENTRIES")
+    CACHE_L1_MAX_BYTES: int = Field(32 * 1024 * 1024, env="CACHE_L1_MAX_BYTES")
+    CACHE_L1_FEED_TTL_SECONDS: float = Field(10, env="CACHE_L1_FEED_TTL_SECONDS")
+    CACHE_L1_SUMMARY_TTL_SECONDS: float = Field(60, env="CACHE_L1_SUMMARY_TTL_SECONDS")
+    CACHE_L1_INTERESTS_TTL_SECONDS: float = Field(300, env="CACHE_L1_INTERESTS_TTL_SECONDS")
+
     # Misc
     LOG_LEVEL: str = Field("INFO", env="LOG_LEVEL")
 
@@ -46,20 +78,82 @@ class Settings(BaseSettings):
     AI_PROVIDER: Optional[str] = None
     OPENAI_API_KEY: Optional[str] = Field(None, env="OPENAI_API_KEY")
     OPENAI_MODEL: Optional[str] = Field(None, env="OPENAI_MODEL")
+    OPENAI_BASE_URL: str = Field("https://api.openai.com/v1", env="OPENAI_BASE_URL")
+    # OpenAI quota governor: RPM/TPM budgets, adaptive concurrency ceiling, retries
+    OPENAI_RPM_LIMIT: float = Field(500, env="OPENAI_RPM_LIMIT")
+    OPENAI_TPM_LIMIT: float = Field(200000, env="OPENAI_TPM_LIMIT")
+    OPENAI_MAX_CONCURRENCY: int = Field(8, env="OPENAI_MAX_CONCURRENCY")
+    OPENAI_EXPECTED_OUTPUT_TOKENS: int = Field(400, env="OPENAI_EXPECTED_OUTPUT_TOKENS")
+    # Max (estimated) input tokens per summary prompt; long text is trimmed to fit
+    AI_PROMPT_TOKEN_BUDGET: int = Field(1500, env="AI_PROMPT_TOKEN_BUDGET")
+    # Discussion map-reduce: comments per story considered, tokens per chunk, parallel chunk calls
+    DISCUSSION_MAX_COMMENTS: int = Field(500, env="DISCUSSION_MAX_COMMENTS")
+    DISCUSSION_CHUNK_TOKENS: int = Field(1200, env="DISCUSSION_CHUNK_TOKENS")
+    DISCUSSION_CONCURRENCY: int = Field(4, env="DISCUSSION_CONCURRENCY")
+    # Delta re-summarization: new (uncovered) comments needed before a summary is updated
+    SUMMARY_DELTA_MIN_NEW_COMMENTS: int = Field(25, env="SUMMARY_DELTA_MIN_NEW_COMMENTS")
+    OPENAI_MAX_RETRIES: int = Field(4, env="OPENAI_MAX_RETRIES")
+    OPENAI_BACKOFF_BASE_SECONDS: float = Field(0.5, env="OPENAI_BACKOFF_BASE_SECONDS")
+    OPENAI_BACKOFF_MAX_SECONDS: float = Field(30.0, env="OPENAI_BACKOFF_MAX_SECONDS")
+    OPENAI_TIMEOUT_SECONDS: float = Field(30.0, env="OPENAI_TIMEOUT_SECONDS")
+    OPENAI_STREAM_READ_TIMEOUT_SECONDS: float = Field(60.0, env="OPENAI_STREAM_READ_TIMEOUT_SECONDS")
+    OPENAI_MAX_CONNECTIONS: int = Field(20, env="OPENAI_MAX_CONNECTIONS")
 
     # Summarization feature flags and cache TTL
     ENABLE_SUMMARIZATION: bool = Field(False, env="ENABLE_SUMMARIZATION")
     SUMMARY_TTL_SECONDS: int = Field(3600, env="SUMMARY_TTL_SECONDS")
+    # Summary cache stampede protection: TTL jitter (fraction), XFetch early-refresh beta,
+    # stale window past logical expiry, and the single-refiller lock / wait for other readers
+    SUMMARY_TTL_JITTER: float = Field(0.1, env="SUMMARY_TTL_JITTER")
+    SUMMARY_XFETCH_BETA: float = Field(1.0, env="SUMMARY_XFETCH_BETA")
+    SUMMARY_STALE_GRACE_SECONDS: int = Field(300, env="SUMMARY_STALE_GRACE_SECONDS")
+    SUMMARY_FILL_LOCK_SECONDS: int = Field(5, env="SUMMARY_FILL_LOCK_SECONDS")
+    SUMMARY_FILL_WAIT_SECONDS: float = Field(0.5, env="SUMMARY_FILL_WAIT_SECONDS")
     SUMMARIZATION_MODEL_VERSION: str = Field("mock-v1", env="SUMMARIZATION_MODEL_VERSION")
+    # Content-addressed LLM result cache (sha256 of model + normalized input)
+    AI_RESULT_CACHE_ENABLED: bool = Field(True, env="AI_RESULT_CACHE_ENABLED")
+    AI_RESULT_CACHE_TTL_SECONDS: int = Field(604800, env="AI_RESULT_CACHE_TTL_SECONDS")
     SUMMARY_RATE_LIMIT_PER_HOUR: int = Field(30, env="SUMMARY_RATE_LIMIT_PER_HOUR")
     SUMMARY_QUEUE_MAX_PER_TICK: int = Field(20, env="SUMMARY_QUEUE_MAX_PER_TICK")
+    # Enqueue generate requests and answer 202 + job handle instead of waiting on the LLM
+    SUMMARY_ASYNC_GENERATION: bool = Field(False, env="SUMMARY_ASYNC_GENERATION")
+    SUMMARY_JOB_TTL_SECONDS: int = Field(3600, env="SUMMARY_JOB_TTL_SECONDS")
+    SUMMARY_JOB_MAX_WAIT_SECONDS: float = Field(25.0, env="SUMMARY_JOB_MAX_WAIT_SECONDS")
+    SUMMARY_JOB_POLL_SECONDS: float = Field(0.5, env="SUMMARY_JOB_POLL_SECONDS")
+    # SSE story events: heartbeat cadence and max connection lifetime (clients reconnect)
+    SSE_HEARTBEAT_SECONDS: float = Field(15.0, env="SSE_HEARTBEAT_SECONDS")
+    SSE_MAX_STREAM_SECONDS: float = Field(300.0, env="SSE_MAX_STREAM_SECONDS")
+    # Single-flight generation: lock expiry if the holder dies (renewed while it runs)
+    # and how long followers wait for the leader
+    SUMMARY_FLIGHT_LOCK_SECONDS: int = Field(120, env="SUMMARY_FLIGHT_LOCK_SECONDS")
+    SUMMARY_FLIGHT_WAIT_SECONDS: float = Field(90.0, env="SUMMARY_FLIGHT_WAIT_SECONDS")
 
     # Comments ingestion / previews
     COMMENTS_PREVIEW_LIMIT: int = Field(5, env="COMMENTS_PREVIEW_LIMIT")
     COMMENTS_FETCH_LIMIT: int = Field(100, env="COMMENTS_FETCH_LIMIT")
+    # Comment-tree crawler: total item budget, parallel fetchers, persist batch size
+    COMMENT_CRAWL_BUDGET: int = Field(500, env="COMMENT_CRAWL_BUDGET")
+    COMMENT_CRAWL_WORKERS: int = Field(5, env="COMMENT_CRAWL_WORKERS")
+    COMMENT_CRAWL_FLUSH_SIZE: int = Field(50, env="COMMENT_CRAWL_FLUSH_SIZE")
 
     # Saved threads queue
     SAVED_THREAD_QUEUE_MAX_PER_TICK: int = Field(10, env="SAVED_THREAD_QUEUE_MAX_PER_TICK")
+    # Parallel comment fetches / summaries within one saved-thread job
+    SAVED_THREAD_CONCURRENCY: int = Field(8, env="SAVED_THREAD_CONCURRENCY")
+
+    # Worker scheduler: per-family concurrency and idle poll cadence
+    WORKER_QUEUE_POLL_SECONDS: float = Field(1.0, env="WORKER_QUEUE_POLL_SECONDS")
+    WORKER_SUMMARY_CONCURRENCY: int = Field(4, env="WORKER_SUMMARY_CONCURRENCY")
+    WORKER_SAVED_THREAD_CONCURRENCY: int = Field(2, env="WORKER_SAVED_THREAD_CONCURRENCY")
+    WORKER_COMMENT_CONCURRENCY: int = Field(2, env="WORKER_COMMENT_CONCURRENCY")
+    WORKER_INTEREST_SIGNAL_CONCURRENCY: int = Field(2, env="WORKER_INTEREST_SIGNAL_CONCURRENCY")
+    WORKER_METRICS_INTERVAL_SECONDS: float = Field(60.0, env="WORKER_METRICS_INTERVAL_SECONDS")
+
+    # Redis Streams job queues (consumer groups shared by worker replicas)
+    STREAM_BLOCK_MS: int = Field(1000, env="STREAM_BLOCK_MS")
+    STREAM_CLAIM_IDLE_MS: int = Field(300000, env="STREAM_CLAIM_IDLE_MS")
+    STREAM_MAX_DELIVERIES: int = Field(5, env="STREAM_MAX_DELIVERIES")
+    STREAM_MAXLEN: int = Field(10000, env="STREAM_MAXLEN")
 
 
     # Auth (JWT)
@@ -17,6 +17,8 @@ class AiSummary(Base):
     tldr = Column(String, nullable=True)
     key_points = Column(JSON, nullable=True)
     consensus = Column(String, nullable=True)
+    # comment ids the summary covers (None: story-only / unknown); drives delta refreshes
+    comment_ids = Column(JSON, nullable=True)
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
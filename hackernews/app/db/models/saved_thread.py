@@ -12,6 +12,8 @@ class SavedThread(Base):
     story_hn_id = Column(Integer, nullable=False, index=True)
     title = Column(String, nullable=True)
     url = Column(String, nullable=True)
+    # set by the saved-thread job; a redelivered job finds its thread instead of creating another
+    idempotency_key = Column(String(64), nullable=True, unique=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     def __repr__(self) -> str:
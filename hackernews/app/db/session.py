@@ -1,21 +1,35 @@
 """Database session and engine helpers for MVP v1."""
-from typing import Generator, Optional
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Generator, Optional, TypeVar
 from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.engine.url import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
 
 # Declarative base for models
 Base = declarative_base()
 
+T = TypeVar("T")
+
+_db_executor: Optional[ThreadPoolExecutor] = None
+
 
 def get_engine(database_url: str):
     url = make_url(database_url)
     connect_args = {}
+    kwargs = {}
     if url.drivername.startswith("sqlite"):
         # SQLite needs check_same_thread=False for sessions across threads
         connect_args = {"check_same_thread": False}
-    return create_engine(database_url, connect_args=connect_args, pool_pre_ping=True)
+        if url.database in (None, "", ":memory:"):
+            # One shared connection so the DB thread pool sees the same in-memory database
+            kwargs["poolclass"] = StaticPool
+    return create_engine(database_url, connect_args=connect_args, pool_pre_ping=True, **kwargs)
 
 
 def init_sessionmaker(engine) -> sessionmaker:
@@ -29,3 +43,28 @@ def get_session(SessionLocal: sessionmaker) -> Generator[Session, None, None]:
         yield session
     finally:
         session.close()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Bounded thread pool shared by all blocking DB work in this process."""
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(max_workers=settings.DB_THREADPOOL_SIZE, thread_name_prefix="db")
+    return _db_executor
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking repository call (e.g. `repo.get_by_hn_id(session, 1)`) off the event loop.
+
+    A `Session` is not thread-safe: await each call before issuing the next one on the
+    same session rather than gathering them.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_db_executor() -> None:
+    global _db_executor
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=True)
+        _db_executor = None
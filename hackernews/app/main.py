@@ -3,9 +3,13 @@ import logging
 from typing import Optional
 
 from app.config import settings
-from app.db.session import get_engine, init_sessionmaker
+from app.db.session import get_engine, init_sessionmaker, shutdown_db_executor
 from app.db.base import Base
 from app.services.cache.redis import RedisCache
+from app.services.cache.local_cache import local_cache_from_settings
+from app.services.sources.hackernews.client import AsyncHNClient, create_hn_client
+from app.services.ai.factory import close_ai_provider
+from app.services.queue.story_events import StoryEventHub
 from app.repositories.story_repo import StoryRepository
 from app.repositories.top_story_repo import TopStoryRepository
 from app.api.v1 import routers as api_v1_routers
@@ -13,7 +17,7 @@ from app.api.v1 import routers as api_v1_routers
 logger = logging.getLogger(__name__)
 
 
-def create_app(redis_cache: Optional[RedisCache] = None, engine=None) -> FastAPI:
+def create_app(redis_cache: Optional[RedisCache] = None, engine=None, hn_client: Optional[AsyncHNClient] = None) -> FastAPI:
     app = FastAPI(title="HN Clarity Backend - MVP v1")
 
     # DB engine and SessionLocal
@@ -28,9 +32,16 @@ def create_app(redis_cache: Optional[RedisCache] = None, engine=None) -> FastAPI
     # Redis cache
     if redis_cache is None:
         redis_url = settings.REDIS_URL if settings.REDIS_ENABLED else None
-        redis_cache = RedisCache(url=redis_url)
+        redis_cache = RedisCache(url=redis_url, local=local_cache_from_settings())
+
+    # One pooled HN client per process (shared connections + rate limit)
+    if hn_client is None:
+        hn_client = create_hn_client()
 
     app.state.redis_cache = redis_cache
+    app.state.hn_client = hn_client
+    # one pub/sub connection per process for every SSE client
+    app.state.story_events = StoryEventHub(redis_cache)
     app.state.SessionLocal = SessionLocal
     app.state.story_repo = StoryRepository()
     app.state.top_story_repo = TopStoryRepository()
@@ -42,11 +53,17 @@ def create_app(redis_cache: Optional[RedisCache] = None, engine=None) -> FastAPI
     async def _startup():
         logger.info("Starting app: initializing redis cache")
         await app.state.redis_cache.init()
+        await app.state.hn_client.init()
+        app.state.story_events.start()
 
     @app.on_event("shutdown")
     async def _shutdown():
         logger.info("Shutting down app: closing redis cache")
+        await app.state.story_events.stop()
         await app.state.redis_cache.close()
+        await app.state.hn_client.close()
+        await close_ai_provider()
+        shutdown_db_executor()
 
     return app
 
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import List
+from typing import Iterable, List
 
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.db.models.comment import Comment
@@ -10,6 +11,12 @@ class CommentRepository:
     def get_by_hn_id(self, session: Session, comment_hn_id: int) -> Comment | None:
         return session.query(Comment).filter_by(comment_hn_id=comment_hn_id).one_or_none()
 
+    def get_many_by_hn_ids(self, session: Session, comment_hn_ids: Iterable[int]) -> dict[int, Comment]:
+        ids = list(set(comment_hn_ids))
+        if not ids:
+            return {}
+        return {r.comment_hn_id: r for r in session.query(Comment).filter(Comment.comment_hn_id.in_(ids)).all()}
+
     def upsert(self, session: Session, story_hn_id: int, raw: dict) -> tuple[Comment, bool, bool]:
         now = datetime.utcnow()
         comment_hn_id = raw.get("id")
@@ -68,6 +75,80 @@ class CommentRepository:
 
         return row, False, False
 
+    def upsert_many(self, session: Session, story_hn_id: int, raws: Iterable[dict]) -> tuple[list[int], list[int]]:
+        """Upsert a batch of raw HN comment payloads for one story in a single commit.
+
+        Existing rows are loaded with one `IN` query and diffed in memory; only new or
+        changed comments are written, using `INSERT ... ON CONFLICT DO UPDATE` on
+        Postgres/SQLite. Returns (created_ids, updated_ids) as comment hn ids.
+        """
+        now = datetime.utcnow()
+
+        by_id: dict[int, dict] = {}
+        for raw in raws:
+            comment_hn_id = raw.get("id")
+            if comment_hn_id is None:
+                raise ValueError("comment id missing")
+            by_id[comment_hn_id] = raw
+        if not by_id:
+            return [], []
+
+        existing = {
+            r.comment_hn_id: r
+            for r in session.query(Comment).filter(Comment.comment_hn_id.in_(list(by_id.keys()))).all()
+        }
+
+        created: list[int] = []
+        updated: list[int] = []
+        values: list[dict] = []
+        for comment_hn_id, raw in by_id.items():
+            row_values = {
+                "comment_hn_id": comment_hn_id,
+                "story_hn_id": story_hn_id,
+                "parent_hn_id": raw.get("parent"),
+                "author": raw.get("by"),
+                "time": raw.get("time"),
+                "text": raw.get("text"),
+                "raw_payload": raw,
+            }
+            row = existing.get(comment_hn_id)
+            if row is None:
+                created.append(comment_hn_id)
+            elif any(getattr(row, k) != v for k, v in row_values.items()):
+                updated.append(comment_hn_id)
+            else:
+                continue
+            values.append({**row_values, "created_at": now, "updated_at": now})
+
+        if values:
+            self._write_changed(session, values, existing)
+            session.commit()
+            # rows loaded above were written behind the ORM's back; reload on next access
+            for comment_hn_id in updated:
+                session.expire(existing[comment_hn_id])
+        return created, updated
+
+    def _write_changed(self, session: Session, values: list[dict], existing: dict[int, Comment]) -> None:
+        fields = ("story_hn_id", "parent_hn_id", "author", "time", "text", "raw_payload", "updated_at")
+        dialect = session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(Comment).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Comment.comment_hn_id],
+                set_={f: getattr(stmt.excluded, f) for f in fields},
+            )
+            session.execute(stmt)
+            return
+
+        for row_values in values:
+            row = existing.get(row_values["comment_hn_id"])
+            if row is None:
+                session.add(Comment(**row_values))
+                continue
+            for f in fields:
+                setattr(row, f, row_values[f])
+
     def fetch_for_story(self, session: Session, story_hn_id: int, limit: int = 10) -> List[Comment]:
         return (
             session.query(Comment)
@@ -76,3 +157,19 @@ class CommentRepository:
             .limit(limit)
             .all()
         )
+
+    def fetch_uncovered_for_story(
+        self, session: Session, story_hn_id: int, covered_hn_ids: Iterable[int] = (), limit: int = 500
+    ) -> List[Comment]:
+        """The newest `limit` comments not in `covered_hn_ids`, returned oldest first.
+
+        Summaries read these instead of `fetch_for_story`, so a thread with more
+        stored comments than `limit` still gets its latest ones summarized.
+        """
+        query = session.query(Comment).filter_by(story_hn_id=story_hn_id)
+        covered = list(set(covered_hn_ids))
+        if covered:
+            query = query.filter(Comment.comment_hn_id.notin_(covered))
+        rows = query.order_by(Comment.time.desc().nullsfirst(), Comment.id.desc()).limit(limit).all()
+        rows.reverse()
+        return rows
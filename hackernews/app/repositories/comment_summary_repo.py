@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
 from sqlalchemy.orm import Session
 
@@ -47,3 +47,36 @@ class CommentSummaryRepository:
             .filter_by(comment_hn_id=comment_hn_id, model_version=model_version)
             .one_or_none()
         )
+
+    def fetch_many(self, session: Session, comment_hn_ids: Iterable[int], model_version: str) -> Dict[int, CommentSummary]:
+        ids = list(set(comment_hn_ids))
+        if not ids:
+            return {}
+        rows = (
+            session.query(CommentSummary)
+            .filter(CommentSummary.comment_hn_id.in_(ids), CommentSummary.model_version == model_version)
+            .all()
+        )
+        return {r.comment_hn_id: r for r in rows}
+
+    def upsert_many(self, session: Session, summaries: Dict[int, SummaryData], model_version: str, model_name: Optional[str] = None) -> Dict[int, CommentSummary]:
+        """Insert or update several comment summaries in one commit; returns rows by comment id."""
+        if not summaries:
+            return {}
+        now = datetime.utcnow()
+        rows = self.fetch_many(session, summaries.keys(), model_version)
+        for comment_hn_id, summary in summaries.items():
+            row = rows.get(comment_hn_id)
+            if row is None:
+                row = CommentSummary(comment_hn_id=comment_hn_id, model_version=model_version, created_at=now)
+                session.add(row)
+                rows[comment_hn_id] = row
+            row.model_name = model_name or row.model_name
+            row.tldr = summary.tldr
+            row.key_points = summary.key_points
+            row.consensus = summary.consensus
+            row.updated_at = now
+        session.commit()
+        for row in rows.values():
+            session.refresh(row)
+        return rows
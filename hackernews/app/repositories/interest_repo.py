@@ -29,6 +29,12 @@ class InterestRepository:
     def get_by_id(self, session: Session, interest_id: int) -> Interest | None:
         return session.query(Interest).filter_by(id=interest_id).one_or_none()
 
+    def get_many(self, session: Session, interest_ids: List[int]) -> Dict[int, Interest]:
+        ids = list({int(i) for i in interest_ids})
+        if not ids:
+            return {}
+        return {r.id: r for r in session.query(Interest).filter(Interest.id.in_(ids)).all()}
+
     def set_user_interests(self, session: Session, user_id: int, interest_ids: List[int]) -> None:
         session.query(UserInterest).filter_by(user_id=user_id).delete()
         session.commit()
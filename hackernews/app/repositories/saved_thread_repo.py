@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import List
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.db.models.saved_thread import SavedThread
@@ -47,6 +48,50 @@ class SavedThreadRepository:
         session.refresh(row)
         return row
 
+    def get_by_idempotency_key(self, session: Session, idempotency_key: str) -> SavedThread | None:
+        return session.query(SavedThread).filter_by(idempotency_key=idempotency_key).one_or_none()
+
+    def create_thread_with_items(
+        self,
+        session: Session,
+        user_id: int,
+        story_hn_id: int,
+        title: str | None,
+        url: str | None,
+        items: List[dict],
+        idempotency_key: str | None = None,
+    ) -> tuple[SavedThread, bool]:
+        """Create a thread and all its items in one commit.
+
+        `items` are SavedThreadItem column values (without the thread id). If a thread
+        with the same `idempotency_key` already exists (e.g. a concurrent redelivery
+        won the race), nothing is written and that thread is returned.
+
+        Returns (thread, created)
+        """
+        now = datetime.utcnow()
+        thread = SavedThread(
+            user_id=user_id,
+            story_hn_id=story_hn_id,
+            title=title,
+            url=url,
+            idempotency_key=idempotency_key,
+            created_at=now,
+        )
+        session.add(thread)
+        try:
+            session.flush()
+            session.add_all(SavedThreadItem(saved_thread_id=thread.id, created_at=now, **item) for item in items)
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            existing = self.get_by_idempotency_key(session, idempotency_key) if idempotency_key else None
+            if existing is None:
+                raise
+            return existing, False
+        session.refresh(thread)
+        return thread, True
+
     def list_threads(self, session: Session, user_id: int) -> List[SavedThread]:
         return (
             session.query(SavedThread)
@@ -2,8 +2,9 @@
 from datetime import datetime
 import hashlib
 import json
-from typing import Tuple, List
+from typing import Tuple, List, Sequence
 
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.db.models.story import Story
@@ -65,6 +66,95 @@ class StoryRepository:
         session.refresh(story)
         return story, False, False
 
+    def upsert_many(self, session: Session, items: Sequence[StoryData]) -> List[Tuple[Story, bool, bool]]:
+        """Upsert a batch of stories in a single transaction.
+
+        Existing rows are loaded with one `IN` query and compared by `content_hash`
+        in memory; new and changed rows are written with a dialect-native
+        `INSERT ... ON CONFLICT` on Postgres/SQLite, and unchanged rows only get
+        `last_fetched_at` bumped. Returns one (story, created, updated) tuple per
+        distinct hn_id, in input order.
+        """
+        now = datetime.utcnow()
+
+        # de-duplicate by hn_id (last payload wins) while preserving first-seen order
+        by_id: dict[int, StoryData] = {}
+        for data in items:
+            by_id[data.hn_id] = data
+        if not by_id:
+            return []
+        hn_ids = list(by_id.keys())
+
+        existing = {s.hn_id: s for s in session.query(Story).filter(Story.hn_id.in_(hn_ids)).all()}
+
+        flags: dict[int, Tuple[bool, bool]] = {}
+        changed_rows: list[dict] = []
+        unchanged_ids: list[int] = []
+        for hn_id, data in by_id.items():
+            content_hash = _compute_content_hash(data.raw_payload or {})
+            row = existing.get(hn_id)
+            if row is not None and (row.content_hash or None) == content_hash:
+                flags[hn_id] = (False, False)
+                unchanged_ids.append(hn_id)
+                continue
+            flags[hn_id] = (row is None, row is not None)
+            changed_rows.append(
+                {
+                    "hn_id": hn_id,
+                    "title": data.title,
+                    "url": data.url,
+                    "raw_payload": data.raw_payload,
+                    "content_hash": content_hash,
+                    "last_fetched_at": now,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+
+        if changed_rows:
+            self._write_changed(session, changed_rows, existing)
+
+        # content identical -> only record fetch time
+        if unchanged_ids:
+            session.query(Story).filter(Story.hn_id.in_(unchanged_ids)).update(
+                {Story.last_fetched_at: now}, synchronize_session=False
+            )
+        session.commit()
+
+        rows = {
+            s.hn_id: s
+            for s in session.query(Story).filter(Story.hn_id.in_(hn_ids)).populate_existing().all()
+        }
+        return [(rows[hn_id], *flags[hn_id]) for hn_id in hn_ids if hn_id in rows]
+
+    def _write_changed(self, session: Session, changed_rows: list[dict], existing: dict[int, Story]) -> None:
+        dialect = session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(Story).values(changed_rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Story.hn_id],
+                set_={
+                    "title": stmt.excluded.title,
+                    "url": stmt.excluded.url,
+                    "raw_payload": stmt.excluded.raw_payload,
+                    "content_hash": stmt.excluded.content_hash,
+                    "last_fetched_at": stmt.excluded.last_fetched_at,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            session.execute(stmt)
+            return
+
+        # other dialects: plain ORM writes, still flushed in one transaction
+        for values in changed_rows:
+            row = existing.get(values["hn_id"])
+            if row is None:
+                session.add(Story(**values))
+                continue
+            for field in ("title", "url", "raw_payload", "content_hash", "last_fetched_at", "updated_at"):
+                setattr(row, field, values[field])
+
     def fetch_latest(self, session: Session, limit: int = 50) -> List[Story]:
         return (
             session.query(Story)
@@ -80,6 +170,12 @@ class StoryRepository:
     def get_by_hn_id(self, session: Session, hn_id: int) -> Story | None:
         return session.query(Story).filter_by(hn_id=hn_id).one_or_none()
 
+    def get_many(self, session: Session, hn_ids: Sequence[int]) -> dict[int, Story]:
+        ids = list({int(i) for i in hn_ids})
+        if not ids:
+            return {}
+        return {s.hn_id: s for s in session.query(Story).filter(Story.hn_id.in_(ids)).all()}
+
     def fetch_latest_ids(self, session: Session, limit: int = 20) -> List[int]:
         rows = (
             session.query(Story.hn_id)
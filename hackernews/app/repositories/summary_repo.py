@@ -2,7 +2,7 @@
 from datetime import datetime
 import hashlib
 import json
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 
 from sqlalchemy.orm import Session
 
@@ -16,9 +16,19 @@ def _compute_content_hash(summary: SummaryData) -> str:
 
 
 class SummaryRepository:
-    def upsert_summary(self, session: Session, story_hn_id: int, summary: SummaryData, model_version: str, model_name: Optional[str] = None) -> tuple[AiSummary, bool, bool]:
+    def upsert_summary(
+        self,
+        session: Session,
+        story_hn_id: int,
+        summary: SummaryData,
+        model_version: str,
+        model_name: Optional[str] = None,
+        comment_ids: Optional[List[int]] = None,
+    ) -> tuple[AiSummary, bool, bool]:
         """Insert or update a summary for a story+model_version.
 
+        `comment_ids` records which comments the summary covers; None leaves it as is.
+
         Returns (summary_row, created, updated)
         """
         now = datetime.utcnow()
@@ -39,6 +49,7 @@ class SummaryRepository:
                 tldr=summary.tldr,
                 key_points=summary.key_points,
                 consensus=summary.consensus,
+                comment_ids=comment_ids,
                 created_at=now,
                 updated_at=now,
             )
@@ -47,12 +58,15 @@ class SummaryRepository:
             session.refresh(row)
             return row, True, False
 
-        if (row.content_hash or None) != content_hash:
+        coverage_changed = comment_ids is not None and comment_ids != row.comment_ids
+        if (row.content_hash or None) != content_hash or coverage_changed:
             row.model_name = model_name or row.model_name
             row.content_hash = content_hash
             row.tldr = summary.tldr
             row.key_points = summary.key_points
             row.consensus = summary.consensus
+            if comment_ids is not None:
+                row.comment_ids = comment_ids
             row.updated_at = now
             session.commit()
             session.refresh(row)
@@ -67,3 +81,14 @@ class SummaryRepository:
             .filter_by(story_hn_id=story_hn_id, model_version=model_version)
             .one_or_none()
         )
+
+    def fetch_many(self, session: Session, story_hn_ids: Iterable[int], model_version: str) -> Dict[int, AiSummary]:
+        ids = list(set(story_hn_ids))
+        if not ids:
+            return {}
+        rows = (
+            session.query(AiSummary)
+            .filter(AiSummary.story_hn_id.in_(ids), AiSummary.model_version == model_version)
+            .all()
+        )
+        return {r.story_hn_id: r for r in rows}
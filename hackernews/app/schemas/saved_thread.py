@@ -12,6 +12,7 @@ class SavedThreadQueueOut(BaseModel):
     status: str
     story_hn_id: int
     comment_count: int
+    idempotency_key: Optional[str] = None
 
 
 class SavedThreadItemOut(BaseModel):
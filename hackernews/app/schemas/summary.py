@@ -12,3 +12,26 @@ class SummaryOut(BaseModel):
     model_name: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+
+
+class SummaryJobOut(BaseModel):
+    job_id: str
+    status: str
+    kind: str
+    hn_id: int
+    model_version: str
+    summary: Optional[SummaryOut] = None
+    error: Optional[str] = None
+
+
+def summary_payload(row) -> dict:
+    """Cache / SSE payload for a stored story or comment summary row."""
+    return {
+        "tldr": row.tldr,
+        "key_points": row.key_points,
+        "consensus": row.consensus,
+        "model_version": row.model_version,
+        "model_name": row.model_name,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+    }
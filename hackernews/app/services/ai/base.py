@@ -1,8 +1,8 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Protocol
+from typing import AsyncIterator, Protocol
 
-from app.services.ai.schemas import SummaryData
+from app.services.ai.schemas import SummaryData, SummaryEvent
 
 
 class AIProvider(ABC):
@@ -12,3 +12,29 @@ class AIProvider(ABC):
     async def summarize_story(self, story_payload: dict) -> SummaryData:
         """Return a deterministic summary for a given story payload."""
         raise NotImplementedError
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the model behind this provider (part of result-cache keys)."""
+        return type(self).__name__
+
+    async def stream_summary(self, story_payload: dict) -> AsyncIterator[SummaryEvent]:
+        """Yield the tldr, then key points and consensus, then 'done' with the full summary.
+
+        Providers without native streaming fall back to one blocking call.
+        """
+        summary = await self.summarize_story(story_payload)
+        for event in summary_events(summary):
+            yield event
+
+    async def aclose(self) -> None:
+        """Release pooled resources (HTTP connections)."""
+        return None
+
+
+def summary_events(summary: SummaryData) -> list[SummaryEvent]:
+    events = [SummaryEvent(kind="tldr", text=summary.tldr)]
+    events.extend(SummaryEvent(kind="key_point", text=kp) for kp in summary.key_points)
+    events.append(SummaryEvent(kind="consensus", text=summary.consensus))
+    events.append(SummaryEvent(kind="done", summary=summary))
+    return events
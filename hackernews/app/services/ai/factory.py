@@ -1,11 +1,83 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
 from app.config import settings
 from app.services.ai.base import AIProvider
 from app.services.ai.mock_provider import MockAIProvider
 from app.services.ai.openai_provider import OpenAIProvider
+from app.services.ai.result_cache import CachingAIProvider
+from app.services.cache.redis import RedisCache
+
+# One provider per process so its connection pool and rate limiter are shared
+_provider: Optional[AIProvider] = None
+_provider_key: Optional[Tuple] = None
+# replaced providers waiting to close once their in-flight calls are done
+_retiring: Dict[asyncio.Task, AIProvider] = {}
+
+logger = logging.getLogger(__name__)
+
+
+def _settings_key() -> Tuple:
+    return (
+        (settings.AI_PROVIDER or "mock").lower(),
+        settings.OPENAI_API_KEY,
+        settings.OPENAI_MODEL,
+        settings.OPENAI_BASE_URL,
+    )
+
+
+def get_ai_provider(redis_cache: Optional[RedisCache] = None) -> AIProvider:
+    """Return the process-wide provider.
+
+    With a `redis_cache` the provider is wrapped in the content-addressed result
+    cache, so identical inputs are only ever sent to the model once.
+    """
+    global _provider, _provider_key
+    key = _settings_key()
+    if _provider is None or _provider_key != key:
+        if _provider is not None:
+            _retire(_provider)
+        provider = key[0]
+        _provider = OpenAIProvider() if provider == "openai" else MockAIProvider()
+        _provider_key = key
+    if redis_cache is not None and settings.AI_RESULT_CACHE_ENABLED:
+        return CachingAIProvider(_provider, redis_cache)
+    return _provider
+
+
+def _retire(old: AIProvider) -> None:
+    """Close a replaced provider's pool after its in-flight requests can have finished."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # no loop (settings changed outside the app); nothing else can be using it
+        try:
+            asyncio.run(old.aclose())
+        except Exception:
+            logger.warning("closing a replaced AI provider failed", exc_info=True)
+        return
+
+    async def _close():
+        await asyncio.sleep(settings.OPENAI_TIMEOUT_SECONDS + settings.OPENAI_STREAM_READ_TIMEOUT_SECONDS)
+        try:
+            await old.aclose()
+        except Exception:
+            logger.warning("closing a replaced AI provider failed", exc_info=True)
+
+    task = loop.create_task(_close())
+    _retiring[task] = old
+    task.add_done_callback(lambda done: _retiring.pop(done, None))
 
 
-def get_ai_provider() -> AIProvider:
-    provider = (settings.AI_PROVIDER or "mock").lower()
-    if provider == "openai":
-        return OpenAIProvider()
-    return MockAIProvider()
+async def close_ai_provider() -> None:
+    global _provider, _provider_key
+    # shutting down: close replaced providers now instead of after their grace period
+    for task, old in list(_retiring.items()):
+        task.cancel()
+        _retiring.pop(task, None)
+        await old.aclose()
+    if _provider is not None:
+        await _provider.aclose()
+    _provider = None
+    _provider_key = None
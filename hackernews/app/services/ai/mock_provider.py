@@ -16,6 +16,10 @@ class MockAIProvider(AIProvider):
       - `consensus` inferred from `score` in payload: >100 positive, >0 mixed, 0 unclear, <0 negative
     """
 
+    @property
+    def model_id(self) -> str:
+        return "mock"
+
     async def summarize_story(self, story_payload: dict) -> SummaryData:
         if story_payload is None:
             raise ValueError("story_payload cannot be None")
@@ -1,23 +1,123 @@
 from __future__ import annotations
+import asyncio
 import json
-from typing import Any, List
+from typing import Any, AsyncIterator, List, Optional, Tuple
 
 import httpx
 
 from app.config import settings
 from app.services.ai.base import AIProvider
-from app.services.ai.schemas import SummaryData
+from app.services.ai.rate_limiter import (
+    RETRYABLE_EXCEPTIONS,
+    AdaptiveRateLimiter,
+    backoff_delay,
+    parse_retry_after,
+)
+from app.services.ai.prompt import build_summary_prompt, estimate_tokens
+from app.services.ai.schemas import SummaryData, SummaryEvent
 
 
 class OpenAIProvider(AIProvider):
-    """OpenAI provider using the Responses API via HTTPX."""
+    """OpenAI provider using the Responses API via HTTPX.
 
-    def __init__(self, api_key: str | None = None, model: str | None = None):
+    - One pooled keep-alive `httpx.AsyncClient` per provider (the factory keeps a
+      single provider per process); `base_url` and `client` can be injected
+    - Every call goes through an `AdaptiveRateLimiter` (RPM/TPM budgets, AIMD
+      concurrency, shared `Retry-After` pause)
+    - 429 / 5xx / network errors are retried with jittered exponential backoff
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str | None = None,
+        base_url: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        limiter: AdaptiveRateLimiter | None = None,
+        max_retries: int | None = None,
+    ):
         self.api_key = api_key or settings.OPENAI_API_KEY
         self.model = model or settings.OPENAI_MODEL or "gpt-5-mini"
+        self.base_url = (base_url or settings.OPENAI_BASE_URL).rstrip("/")
+        self._client = client
+        self._own_client = False
+        self.limiter = limiter or AdaptiveRateLimiter(
+            requests_per_minute=settings.OPENAI_RPM_LIMIT,
+            tokens_per_minute=settings.OPENAI_TPM_LIMIT,
+            max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+        )
+        self.max_retries = max(1, max_retries if max_retries is not None else settings.OPENAI_MAX_RETRIES)
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY is required for OpenAIProvider")
 
+    @property
+    def model_id(self) -> str:
+        return f"openai:{self.model}"
+
+    def _headers(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.OPENAI_TIMEOUT_SECONDS, read=settings.OPENAI_STREAM_READ_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    keepalive_expiry=60.0,
+                ),
+            )
+            self._own_client = True
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._own_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._own_client = False
+
+    def _estimate_tokens(self, prompt: str) -> int:
+        return estimate_tokens(prompt) + settings.OPENAI_EXPECTED_OUTPUT_TOKENS
+
+    def _retry_delay(self, resp: httpx.Response | None, attempt: int, permit=None) -> float | None:
+        """Record a failed attempt; return how long to wait, or None if it is not retryable."""
+        if resp is not None and resp.status_code == 429:
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if permit is not None:
+                permit.on_rate_limited(retry_after)
+            else:
+                self.limiter.on_rate_limited(retry_after)
+            if retry_after is not None:
+                # the limiter already pauses every caller; jitter spreads the restart
+                return backoff_delay(1, settings.OPENAI_BACKOFF_BASE_SECONDS, settings.OPENAI_BACKOFF_MAX_SECONDS)
+        elif resp is not None and resp.status_code < 500:
+            return None
+        return backoff_delay(attempt, settings.OPENAI_BACKOFF_BASE_SECONDS, settings.OPENAI_BACKOFF_MAX_SECONDS)
+
+    async def _post_responses(self, data: dict) -> dict:
+        estimated = self._estimate_tokens(data["input"])
+        for attempt in range(1, self.max_retries + 1):
+            async with self.limiter.slot(estimated) as permit:
+                try:
+                    resp = await self._http().post(f"{self.base_url}/responses", headers=self._headers(), json=data)
+                except RETRYABLE_EXCEPTIONS:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = self._retry_delay(None, attempt)
+                else:
+                    delay = self._retry_delay(resp, attempt, permit) if resp.is_error else None
+                    if delay is None or attempt == self.max_retries:
+                        resp.raise_for_status()
+                        payload = resp.json()
+                        permit.record_usage(_usage_tokens(payload))
+                        self.limiter.on_success()
+                        return payload
+            await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
     async def summarize_story(self, story_payload: dict) -> SummaryData:
         prompt = self._build_prompt(story_payload)
         data = {
@@ -25,29 +125,78 @@ class OpenAIProvider(AIProvider):
             "input": prompt,
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post("https://api.openai.com/v1/responses", headers=headers, json=data)
-            resp.raise_for_status()
-            payload = resp.json()
+        payload = await self._post_responses(data)
 
         text = _extract_output_text(payload)
         summary = _parse_summary_json(text)
         return summary
 
+    async def stream_summary(self, story_payload: dict) -> AsyncIterator[SummaryEvent]:
+        """Stream the Responses API output and emit fields as soon as they are complete.
+
+        Only failures before the stream starts (429 / 5xx / connect errors) are retried.
+        """
+        data = {
+            "model": self.model,
+            "input": self._build_prompt(story_payload),
+            "stream": True,
+        }
+        estimated = self._estimate_tokens(data["input"])
+        parser = _IncrementalSummaryParser()
+        text = ""
+        delay = None
+        for attempt in range(1, self.max_retries + 1):
+            if delay is not None:
+                await asyncio.sleep(delay)
+                delay = None
+            async with self.limiter.slot(estimated) as permit:
+                try:
+                    async with self._http().stream("POST", f"{self.base_url}/responses", headers=self._headers(), json=data) as resp:
+                        if resp.is_error:
+                            delay = self._retry_delay(resp, attempt, permit)
+                            if delay is None or attempt == self.max_retries:
+                                await resp.aread()
+                                resp.raise_for_status()
+                            continue
+                        async for line in resp.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            raw = line[len("data:"):].strip()
+                            if not raw or raw == "[DONE]":
+                                continue
+                            try:
+                                event = json.loads(raw)
+                            except ValueError:
+                                continue
+                            etype = event.get("type")
+                            if etype == "response.output_text.delta":
+                                for out in parser.feed(event.get("delta") or ""):
+                                    yield out
+                            elif etype == "response.completed":
+                                completed = event.get("response") or {}
+                                text = _extract_output_text(completed) or parser.text
+                                permit.record_usage(_usage_tokens(completed))
+                            elif etype in ("error", "response.failed"):
+                                raise RuntimeError(f"OpenAI stream failed: {event}")
+                except (httpx.ConnectError, httpx.ConnectTimeout):
+                    if attempt == self.max_retries:
+                        raise
+                    delay = self._retry_delay(None, attempt)
+                    continue
+                self.limiter.on_success()
+                break
+
+        summary = _parse_summary_json(text or parser.text)
+        # anything the incremental scan could not see (e.g. non-JSON reply) is sent now
+        if not parser.tldr_sent:
+            yield SummaryEvent(kind="tldr", text=summary.tldr)
+        for kp in summary.key_points[parser.key_points_sent:]:
+            yield SummaryEvent(kind="key_point", text=kp)
+        yield SummaryEvent(kind="consensus", text=summary.consensus)
+        yield SummaryEvent(kind="done", summary=summary)
+
     def _build_prompt(self, story_payload: dict) -> str:
-        clean_payload = json.dumps(story_payload, ensure_ascii=False)
-        return (
-            "You are generating a concise Hacker News story summary.\n"
-            "Return JSON ONLY with keys: tldr (string), key_points (list of strings), "
-            "consensus (one of: positive, mixed, unclear, negative).\n"
-            "Keep tldr under 1 sentence and key_points 3-5 bullets.\n"
-            f"Story payload: {clean_payload}"
-        )
+        return build_summary_prompt(story_payload)
 
 
 def _extract_output_text(payload: dict) -> str:
@@ -71,6 +220,16 @@ def _extract_output_text(payload: dict) -> str:
     return ""
 
 
+def _usage_tokens(payload: dict) -> Optional[int]:
+    usage = payload.get("usage") if isinstance(payload, dict) else None
+    if not isinstance(usage, dict):
+        return None
+    total = usage.get("total_tokens")
+    if total is None and ("input_tokens" in usage or "output_tokens" in usage):
+        total = (usage.get("input_tokens") or 0) + (usage.get("output_tokens") or 0)
+    return total
+
+
 def _parse_summary_json(text: str) -> SummaryData:
     if not text:
         return SummaryData(tldr="TL;DR unavailable", key_points=[], consensus="unclear")
@@ -103,3 +262,113 @@ def _parse_summary_json(text: str) -> SummaryData:
         consensus = "unclear"
 
     return SummaryData(tldr=tldr, key_points=key_points, consensus=consensus)
+
+
+def _scan_string(text: str, i: int) -> Tuple[Optional[str], int]:
+    """Decode the JSON string starting at text[i] == '"'. Returns (None, i) if unterminated."""
+    j = i + 1
+    while j < len(text):
+        ch = text[j]
+        if ch == "\\":
+            j += 2
+            continue
+        if ch == '"':
+            try:
+                return json.loads(text[i : j + 1]), j + 1
+            except ValueError:
+                return None, i
+        j += 1
+    return None, i
+
+
+def _skip_ws(text: str, i: int) -> int:
+    while i < len(text) and text[i] in " \t\r\n":
+        i += 1
+    return i
+
+
+def _scan_partial_summary(text: str) -> Tuple[Optional[str], List[str]]:
+    """Best-effort scan of a possibly truncated summary JSON object.
+
+    Returns the tldr once its string is closed, and every key point whose string
+    is closed so far. Other keys/values are skipped.
+    """
+    tldr: Optional[str] = None
+    key_points: List[str] = []
+    i = text.find("{")
+    if i == -1:
+        return tldr, key_points
+    i += 1
+    while True:
+        i = _skip_ws(text, i)
+        if i >= len(text) or text[i] != '"':
+            return tldr, key_points
+        key, i = _scan_string(text, i)
+        if key is None:
+            return tldr, key_points
+        i = _skip_ws(text, i)
+        if i >= len(text) or text[i] != ":":
+            return tldr, key_points
+        i = _skip_ws(text, i + 1)
+        if i >= len(text):
+            return tldr, key_points
+        if text[i] == '"':
+            value, i = _scan_string(text, i)
+            if value is None:
+                return tldr, key_points
+            if key == "tldr":
+                tldr = value
+        elif text[i] == "[":
+            i += 1
+            while True:
+                i = _skip_ws(text, i)
+                if i >= len(text):
+                    return tldr, key_points
+                if text[i] == "]":
+                    i += 1
+                    break
+                if text[i] == ",":
+                    i += 1
+                    continue
+                if text[i] != '"':
+                    return tldr, key_points
+                item, i = _scan_string(text, i)
+                if item is None:
+                    return tldr, key_points
+                if key == "key_points":
+                    key_points.append(item)
+        else:
+            # numbers / literals / nested objects are not needed for streaming
+            while i < len(text) and text[i] not in ",}":
+                i += 1
+        i = _skip_ws(text, i)
+        if i >= len(text) or text[i] == "}":
+            return tldr, key_points
+        if text[i] == ",":
+            i += 1
+
+
+class _IncrementalSummaryParser:
+    """Accumulates streamed text and reports newly completed summary fields."""
+
+    def __init__(self):
+        self.text = ""
+        self.tldr_sent = False
+        self.key_points_sent = 0  # non-empty points emitted (matches SummaryData.key_points)
+        self._key_points_seen = 0
+
+    def feed(self, delta: str) -> List[SummaryEvent]:
+        self.text += delta
+        tldr, key_points = _scan_partial_summary(self.text)
+        events: List[SummaryEvent] = []
+        if tldr is not None and not self.tldr_sent:
+            self.tldr_sent = True
+            events.append(SummaryEvent(kind="tldr", text=tldr.strip()))
+        # hold key points back until the tldr has gone out, so it always leads
+        if self.tldr_sent:
+            for kp in key_points[self._key_points_seen:]:
+                self._key_points_seen += 1
+                if kp.strip():
+                    self.key_points_sent += 1
+                    events.append(SummaryEvent(kind="key_point", text=kp.strip()))
+        return events
@@ -1,8 +1,14 @@
-"""Summary pipeline that uses an AI provider to summarize stories."""
+"""Summary pipelines: single story summaries and map-reduce discussion summaries."""
 from __future__ import annotations
-from typing import Protocol, Any
+import asyncio
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
 
+from app.config import settings
 from app.services.sources.hackernews.fetcher import StoryData
+from app.services.ai.prompt import build_summary_prompt, clip_to_tokens, estimate_tokens, html_to_text
 from app.services.ai.schemas import SummaryData
 
 
@@ -19,3 +25,269 @@ class SummaryPipeline:
         payload = story.raw_payload or {"id": story.hn_id}
         summary = await self.provider.summarize_story(payload)
         return summary
+
+
+# --- Discussion map-reduce ---
+
+
+@dataclass
+class DiscussionChunk:
+    text: str
+    tokens: int
+    comment_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class DiscussionSummary:
+    summary: SummaryData
+    chunks: int
+    llm_calls: int
+    comment_ids: List[int] = field(default_factory=list)
+
+
+def _comment_line(comment: Any, depth: int, max_tokens: int) -> str:
+    text = " ".join(html_to_text(getattr(comment, "text", None)).split()) or "[no text]"
+    author = getattr(comment, "author", None) or "anon"
+    return f"{'  ' * depth}[{author}] {clip_to_tokens(text, max_tokens)}"
+
+
+def _context_line(line: str, max_words: int = 12) -> str:
+    indent = len(line) - len(line.lstrip(" "))
+    words = line.split()
+    suffix = " …" if len(words) > max_words else ""
+    return f"{' ' * indent}{' '.join(words[:max_words])}{suffix}"
+
+
+def chunk_comment_tree(
+    comments: Sequence[Any],
+    chunk_tokens: int = 1200,
+    comment_tokens: int = 250,
+) -> List[DiscussionChunk]:
+    """Split stored comments into token-bounded chunks of whole subtrees.
+
+    Comments are grouped by `parent_hn_id`; each top-level subtree is rendered in
+    reply order with indentation for depth. Small subtrees are packed together,
+    an oversized one is split along its depth-first order and every continuation
+    chunk starts with shortened lines of the nearest ancestors, so replies keep
+    their context.
+    """
+    by_id = {c.comment_hn_id: c for c in comments}
+    children: Dict[Optional[int], List[Any]] = defaultdict(list)
+    roots: List[Any] = []
+    for c in comments:
+        parent = getattr(c, "parent_hn_id", None)
+        if parent in by_id and parent != c.comment_hn_id:
+            children[parent].append(c)
+        else:
+            # top-level (parent is the story) or orphaned by a partial crawl
+            roots.append(c)
+
+    def subtree(root: Any) -> List[Tuple[int, Any]]:
+        out: List[Tuple[int, Any]] = []
+        stack = [(0, root)]
+        seen = set()
+        while stack:
+            depth, node = stack.pop()
+            if node.comment_hn_id in seen:
+                continue
+            seen.add(node.comment_hn_id)
+            out.append((depth, node))
+            stack.extend((depth + 1, kid) for kid in reversed(children.get(node.comment_hn_id, [])))
+        return out
+
+    chunks: List[DiscussionChunk] = []
+    lines: List[str] = []
+    ids: List[int] = []
+    used = 0
+
+    def flush() -> None:
+        nonlocal lines, ids, used
+        if lines:
+            chunks.append(DiscussionChunk(text="\n".join(lines), tokens=used, comment_ids=ids))
+        lines, ids, used = [], [], 0
+
+    for root in roots:
+        nodes = [(d, n, _comment_line(n, d, comment_tokens)) for d, n in subtree(root)]
+        size = sum(estimate_tokens(line) for _, _, line in nodes)
+        if used and used + size > chunk_tokens:
+            flush()
+        ancestors: List[str] = []
+        for depth, node, line in nodes:
+            tokens = estimate_tokens(line)
+            del ancestors[depth:]
+            if used and used + tokens > chunk_tokens:
+                flush()
+                # nearest ancestors first, capped at a quarter of the chunk
+                context: List[str] = []
+                ctx_used = 0
+                for ctx in reversed(ancestors):
+                    ctx_line = _context_line(ctx)
+                    ctx_tokens = estimate_tokens(ctx_line)
+                    if ctx_used + ctx_tokens > chunk_tokens // 4:
+                        break
+                    context.append(ctx_line)
+                    ctx_used += ctx_tokens
+                lines.extend(reversed(context))
+                used += ctx_used
+            lines.append(line)
+            ids.append(node.comment_hn_id)
+            used += tokens
+            ancestors.append(line)
+    flush()
+    return chunks
+
+
+class DiscussionSummarizer:
+    """Map-reduce summarization of a story's comment tree.
+
+    - map: every chunk from `chunk_comment_tree` is summarized concurrently,
+      at most `concurrency` provider calls at a time
+    - reduce: partial summaries are merged in token-bounded groups, level by
+      level, until one thread-level summary remains (the story itself is part
+      of the final merge)
+
+    A thread of N chunks costs about N + N/fan-in calls, and the wall time is a
+    handful of LLM latencies instead of N sequential ones.
+
+    The final merge must fit `prompt_tokens`: the discussion notes always go in
+    whole, and the story's own text is clipped to what they leave over.
+    """
+
+    def __init__(
+        self,
+        provider: ProviderProtocol,
+        chunk_tokens: int = 1200,
+        concurrency: int = 4,
+        comment_tokens: int = 250,
+        prompt_tokens: Optional[int] = None,
+    ):
+        self.provider = provider
+        self.chunk_tokens = chunk_tokens
+        self.comment_tokens = comment_tokens
+        self.prompt_tokens = prompt_tokens
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._calls = 0
+
+    async def _call(self, payload: dict) -> SummaryData:
+        async with self._semaphore:
+            self._calls += 1
+            return await self.provider.summarize_story(payload)
+
+    @staticmethod
+    def _render_partial(summary: SummaryData) -> str:
+        points = "; ".join(summary.key_points)
+        return f"- {summary.tldr} ({summary.consensus}) {points}".strip()
+
+    def _group_partials(self, partials: List[SummaryData]) -> List[List[SummaryData]]:
+        groups: List[List[SummaryData]] = [[]]
+        used = 0
+        for p in partials:
+            tokens = estimate_tokens(self._render_partial(p))
+            if groups[-1] and used + tokens > self.chunk_tokens:
+                groups.append([])
+                used = 0
+            groups[-1].append(p)
+            used += tokens
+        return groups
+
+    async def final_payload(
+        self,
+        story_payload: dict,
+        comments: Sequence[Any],
+        previous: Optional[SummaryData] = None,
+    ) -> Tuple[dict, List[DiscussionChunk]]:
+        """Run the map and intermediate reduce levels; return the payload for the final merge call.
+
+        With `previous`, `comments` are only the new ones and the merge updates that
+        summary; a delta that fits one chunk goes into the merge as-is (one call total).
+        """
+        story_payload = story_payload or {}
+        title = story_payload.get("title")
+        chunks = chunk_comment_tree(comments, self.chunk_tokens, self.comment_tokens)
+        if not chunks:
+            return story_payload, chunks
+
+        if previous is not None and len(chunks) == 1:
+            notes = f"New comments:\n{chunks[0].text}"
+        else:
+            # map
+            partials = list(
+                await asyncio.gather(
+                    *(self._call({"type": "discussion", "title": title, "text": chunk.text}) for chunk in chunks)
+                )
+            )
+
+            # reduce until the notes fit into one final merge
+            groups = self._group_partials(partials)
+            while 1 < len(groups) < len(partials):
+                partials = list(
+                    await asyncio.gather(
+                        *(
+                            self._call({"type": "discussion", "title": title, "text": "\n".join(self._render_partial(p) for p in group)})
+                            for group in groups
+                        )
+                    )
+                )
+                groups = self._group_partials(partials)
+            heading = "New discussion notes" if previous is not None else "Discussion notes"
+            notes = f"{heading}:\n" + "\n".join(self._render_partial(p) for p in partials)
+
+        sections = []
+        if previous is not None:
+            sections.append(f"Current summary (update it with the new comments):\n{self._render_partial(previous)}")
+        sections.append(notes)
+        payload = {"type": "discussion", "title": title, "url": story_payload.get("url"), "text": "\n\n".join(sections)}
+        payload = {k: v for k, v in payload.items() if v}
+
+        story_text = html_to_text(story_payload.get("text"))
+        if story_text:
+            # the story body (e.g. a long Ask HN post) gets what the notes leave of the
+            # budget, and goes last so any final trim cuts the story, not the discussion
+            budget = self.prompt_tokens or settings.AI_PROMPT_TOKEN_BUDGET
+            label = "\n\nStory: "
+            used = estimate_tokens(build_summary_prompt(payload, token_budget=sys.maxsize)) + estimate_tokens(label)
+            if budget > used:
+                payload["text"] += label + clip_to_tokens(story_text, budget - used)
+        return payload, chunks
+
+    async def summarize(self, story_payload: dict, comments: Sequence[Any]) -> DiscussionSummary:
+        self._calls = 0
+        payload, chunks = await self.final_payload(story_payload, comments)
+        summary = await self._call(payload)
+        return DiscussionSummary(
+            summary=summary,
+            chunks=len(chunks),
+            llm_calls=self._calls,
+            comment_ids=[cid for chunk in chunks for cid in chunk.comment_ids],
+        )
+
+    async def update(self, previous: SummaryData, story_payload: dict, new_comments: Sequence[Any]) -> DiscussionSummary:
+        """Fold only `new_comments` into an existing summary instead of re-reading the thread."""
+        self._calls = 0
+        if not new_comments:
+            return DiscussionSummary(summary=previous, chunks=0, llm_calls=0)
+        payload, chunks = await self.final_payload(story_payload, new_comments, previous=previous)
+        summary = await self._call(payload)
+        return DiscussionSummary(
+            summary=summary,
+            chunks=len(chunks),
+            llm_calls=self._calls,
+            comment_ids=[cid for chunk in chunks for cid in chunk.comment_ids],
+        )
+
+
+def discussion_summarizer(provider: ProviderProtocol) -> DiscussionSummarizer:
+    return DiscussionSummarizer(
+        provider,
+        chunk_tokens=settings.DISCUSSION_CHUNK_TOKENS,
+        concurrency=settings.DISCUSSION_CONCURRENCY,
+        prompt_tokens=settings.AI_PROMPT_TOKEN_BUDGET,
+    )
+
+
+async def summarize_story_with_discussion(provider: ProviderProtocol, story_payload: dict, comments: Sequence[Any]) -> DiscussionSummary:
+    """Story-only summary without stored comments, map-reduced discussion summary with them."""
+    if not comments:
+        summary = await provider.summarize_story(story_payload)
+        return DiscussionSummary(summary=summary, chunks=0, llm_calls=1)
+    return await discussion_summarizer(provider).summarize(story_payload, comments)
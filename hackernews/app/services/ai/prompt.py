@@ -0,0 +1,127 @@
+"""Compact prompt construction for story / comment summaries.
+
+HN payloads carry a lot the model never needs (the full `kids` id list, scores,
+timestamps, ids). Only the fields listed below are sent, HTML is flattened to
+plain text, and the prompt is trimmed to a token budget measured with a local
+estimator (no tokenizer dependency).
+"""
+from __future__ import annotations
+
+import html
+import json
+import re
+from typing import Optional
+
+from app.config import settings
+
+STORY_FIELDS = ("title", "url", "text")
+COMMENT_FIELDS = ("by", "text")
+# discussion chunks / merges: `text` is pre-rendered plain text, not HN HTML
+DISCUSSION_FIELDS = ("title", "url", "text")
+
+SUMMARY_INSTRUCTIONS = (
+    "You are generating a concise Hacker News {kind} summary.\n"
+    "Return JSON ONLY with keys: tldr (string), key_points (list of strings), "
+    "consensus (one of: positive, mixed, unclear, negative).\n"
+    "Keep tldr under 1 sentence and key_points 3-5 bullets.\n"
+)
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_PARAGRAPH_RE = re.compile(r"<\s*(p|br)\s*/?>", re.IGNORECASE)
+_LINK_RE = re.compile(r"<a\s[^>]*href=\"([^\"]*)\"[^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACES_RE = re.compile(r"[ \t\r\f\v]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count: words and punctuation, long words split in ~4-char pieces."""
+    if not text:
+        return 0
+    count = 0
+    for m in _TOKEN_RE.finditer(text):
+        count += max(1, (len(m.group(0)) + 3) // 4)
+    return count
+
+
+def html_to_text(value: Optional[str]) -> str:
+    """Flatten HN comment/story HTML (<p>, <a>, <i>, <pre>, entities) to plain text."""
+    if not value:
+        return ""
+    text = _PARAGRAPH_RE.sub("\n", value)
+
+    def _link(m: re.Match) -> str:
+        href, label = html.unescape(m.group(1)), html.unescape(_TAG_RE.sub("", m.group(2)))
+        # HN shortens long link labels with "..."; keep the real URL once
+        return href if label.rstrip(".") in href else f"{label} ({href})"
+
+    text = _LINK_RE.sub(_link, text)
+    text = html.unescape(_TAG_RE.sub("", text))
+    lines = [_SPACES_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+def compact_payload(payload: dict, kind: str = "story") -> dict:
+    """Keep only the fields the model needs, with HTML converted to text."""
+    if kind == "discussion":
+        fields = DISCUSSION_FIELDS
+    else:
+        fields = COMMENT_FIELDS if kind == "comment" else STORY_FIELDS
+    out = {}
+    for field in fields:
+        value = (payload or {}).get(field)
+        if value is None or value == "":
+            continue
+        out[field] = html_to_text(value) if field == "text" and kind != "discussion" else value
+    return out
+
+
+def _clip(text: str, length: int) -> str:
+    if length >= len(text):
+        return text
+    cut = text[:length]
+    space = cut.rfind(" ")
+    if space > length // 2:
+        cut = cut[:space]
+    return cut.rstrip() + " …"
+
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest word-boundary prefix of `text` (plus an ellipsis) within `max_tokens`."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(_clip(text, mid)) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return _clip(text, lo)
+
+
+def build_summary_prompt(payload: dict, kind: Optional[str] = None, token_budget: Optional[int] = None) -> str:
+    """Instructions + compact JSON payload, with `text` trimmed so the whole prompt fits the budget."""
+    if kind is None:
+        ptype = (payload or {}).get("type")
+        kind = ptype if ptype in ("comment", "discussion") else "story"
+    budget = token_budget or settings.AI_PROMPT_TOKEN_BUDGET
+    header = SUMMARY_INSTRUCTIONS.format(kind=kind)
+    compact = compact_payload(payload, kind)
+
+    def render(data: dict) -> str:
+        return f"{header}{kind.capitalize()}: {json.dumps(data, ensure_ascii=False)}"
+
+    prompt = render(compact)
+    text = compact.get("text")
+    if estimate_tokens(prompt) <= budget or not text:
+        return prompt
+    # binary search the longest text prefix whose rendered prompt fits the budget
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(render({**compact, "text": _clip(text, mid)})) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    compact["text"] = _clip(text, lo)
+    return render(compact)
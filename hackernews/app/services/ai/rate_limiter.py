@@ -0,0 +1,183 @@
+"""Adaptive concurrency governor for LLM calls.
+
+Keeps a process within its provider quota:
+- requests-per-minute and tokens-per-minute token buckets (refilled continuously)
+- an AIMD concurrency window: +1 slot after a run of successes, halved on a 429
+  (once per window: 429s from requests started before the last cut don't cut again)
+- a shared pause honouring `Retry-After`, so every caller backs off together
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a `Retry-After` header given in seconds; HTTP dates are ignored."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given 1-based attempt."""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class _Bucket:
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self._clock = clock
+        self._last = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 when it can be taken now)."""
+        self._refill()
+        # a single request larger than the bucket waits for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def give(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AdaptiveRateLimiter:
+    """Gate for outbound LLM requests.
+
+    Use `async with limiter.slot(estimated_tokens) as permit:` around each call, then
+    report the outcome with `permit.record_usage(...)`, `limiter.on_success()` or
+    `permit.on_rate_limited(retry_after)`.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        increase_after: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self._requests = _Bucket(requests_per_minute, clock)
+        self._tokens = _Bucket(tokens_per_minute, clock)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.concurrency = self.max_concurrency
+        self._increase_after = max(1, increase_after)
+        self._successes = 0
+        # bumped on every decrease; permits remember the window they started in
+        self._window = 0
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._cond = asyncio.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _wait_time(self, tokens: int) -> float:
+        now = self._clock()
+        return max(self._paused_until - now, self._requests.wait_time(1), self._tokens.wait_time(tokens))
+
+    async def _acquire(self, tokens: int) -> None:
+        async with self._cond:
+            while True:
+                if self._in_flight >= self.concurrency:
+                    await self._cond.wait()
+                    continue
+                delay = self._wait_time(tokens)
+                if delay <= 0:
+                    self._requests.take(1)
+                    self._tokens.take(tokens)
+                    self._in_flight += 1
+                    return
+                # wake early if a slot is released or the limits change
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 1) -> AsyncIterator["_Permit"]:
+        await self._acquire(estimated_tokens)
+        permit = _Permit(self, estimated_tokens)
+        try:
+            yield permit
+        finally:
+            await self._release()
+
+    def on_success(self) -> None:
+        self._successes += 1
+        if self._successes >= self._increase_after and self.concurrency < self.max_concurrency:
+            self.concurrency += 1
+            self._successes = 0
+
+    def on_rate_limited(self, retry_after: Optional[float] = None, window: Optional[int] = None) -> None:
+        """Halve the window, unless the 429 is from a request started before the last halving."""
+        self._successes = 0
+        if window is None or window >= self._window:
+            self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            self._window += 1
+        if retry_after:
+            self._paused_until = max(self._paused_until, self._clock() + retry_after)
+
+    def snapshot(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self._in_flight,
+            "request_tokens": round(self._requests.tokens, 2),
+            "llm_tokens": round(self._tokens.tokens, 2),
+            "paused_for": round(max(0.0, self._paused_until - self._clock()), 2),
+        }
+
+
+class _Permit:
+    def __init__(self, limiter: AdaptiveRateLimiter, estimated_tokens: int):
+        self._limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.window = limiter._window
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        self._limiter.on_rate_limited(retry_after, window=self.window)
+
+    def record_usage(self, actual_tokens: Optional[int]) -> None:
+        """Reconcile the TPM bucket with the usage the API reported."""
+        if not actual_tokens:
+            return
+        delta = actual_tokens - self.estimated_tokens
+        if delta > 0:
+            self._limiter._tokens.take(delta)
+        elif delta < 0:
+            self._limiter._tokens.give(-delta)
+        self.estimated_tokens = actual_tokens
+
+
+RETRYABLE_EXCEPTIONS = (httpx.NetworkError, httpx.TimeoutException)
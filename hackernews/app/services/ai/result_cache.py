@@ -0,0 +1,113 @@
+"""Content-addressed cache of LLM results.
+
+The key is a sha256 over the provider's model id, the summarization model
+version and the normalized prompt input, so identical inputs hit the provider
+once no matter which path (story, comment, saved thread) asks for them.
+The wrapped provider is sent the same normalized input that was hashed, so a
+cached result always answers exactly the input it was produced from.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import AsyncIterator, Optional
+
+from app.config import settings
+from app.services.ai.base import AIProvider, summary_events
+from app.services.ai.schemas import SummaryData, SummaryEvent
+from app.services.cache.redis import RedisCache
+
+RESULT_KEY_PREFIX = "ai:result:"
+HITS_KEY = "ai:result_cache:hits"
+MISSES_KEY = "ai:result_cache:misses"
+
+# HN counters that change constantly without changing what there is to summarize
+VOLATILE_FIELDS = ("score", "descendants", "kids")
+
+
+def normalize_payload(payload: dict) -> dict:
+    return {k: v for k, v in (payload or {}).items() if k not in VOLATILE_FIELDS and v is not None}
+
+
+def compute_input_hash(model_id: str, model_version: str, payload: dict) -> str:
+    s = json.dumps(
+        {"model": model_id, "version": model_version, "input": normalize_payload(payload)},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+class CachingAIProvider(AIProvider):
+    """Wraps a provider and memoizes results in Redis by input hash.
+
+    Hits and misses are counted in-process and in Redis (shared by API and worker).
+    Without Redis every call is a miss and goes straight to the wrapped provider.
+    """
+
+    def __init__(self, inner: AIProvider, redis_cache: RedisCache, model_version: Optional[str] = None, ttl: Optional[int] = None):
+        self.inner = inner
+        self.redis = redis_cache
+        self.model_version = model_version or settings.SUMMARIZATION_MODEL_VERSION
+        self.ttl = ttl or settings.AI_RESULT_CACHE_TTL_SECONDS
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model_id(self) -> str:
+        return self.inner.model_id
+
+    def cache_key(self, payload: dict) -> str:
+        return RESULT_KEY_PREFIX + compute_input_hash(self.model_id, self.model_version, payload)
+
+    async def _lookup(self, key: str) -> Optional[SummaryData]:
+        cached = await self.redis.get_json(key)
+        if cached is not None:
+            try:
+                summary = SummaryData(**cached)
+            except (TypeError, ValueError):
+                summary = None
+            if summary is not None:
+                self.hits += 1
+                await self.redis.incr(HITS_KEY)
+                return summary
+        self.misses += 1
+        await self.redis.incr(MISSES_KEY)
+        return None
+
+    async def _store(self, key: str, summary: SummaryData) -> None:
+        await self.redis.set_json(key, summary.dict(), ex=self.ttl)
+
+    async def summarize_story(self, story_payload: dict) -> SummaryData:
+        key = self.cache_key(story_payload)
+        summary = await self._lookup(key)
+        if summary is not None:
+            return summary
+        summary = await self.inner.summarize_story(normalize_payload(story_payload))
+        await self._store(key, summary)
+        return summary
+
+    async def stream_summary(self, story_payload: dict) -> AsyncIterator[SummaryEvent]:
+        key = self.cache_key(story_payload)
+        summary = await self._lookup(key)
+        if summary is not None:
+            for event in summary_events(summary):
+                yield event
+            return
+        async for event in self.inner.stream_summary(normalize_payload(story_payload)):
+            if event.kind == "done" and event.summary is not None:
+                await self._store(key, event.summary)
+            yield event
+
+
+async def result_cache_stats(redis_cache: RedisCache) -> dict:
+    """Cluster-wide hit/miss counters and hit rate (None until the first lookup)."""
+    hits = int(await redis_cache.get_json(HITS_KEY) or 0)
+    misses = int(await redis_cache.get_json(MISSES_KEY) or 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else None,
+    }
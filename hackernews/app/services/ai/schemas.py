@@ -1,8 +1,19 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 class SummaryData(BaseModel):
     tldr: str
     key_points: List[str]
     consensus: str  # one of: 'positive', 'mixed', 'unclear', 'negative'
+
+
+class SummaryEvent(BaseModel):
+    """One increment of a streamed summary.
+
+    kind is 'tldr', 'key_point', 'consensus' or 'done'; `summary` is set on 'done'.
+    """
+
+    kind: str
+    text: Optional[str] = None
+    summary: Optional[SummaryData] = None
@@ -1,13 +1,16 @@
 """Caching helpers for AI comment summaries keyed by comment and model version."""
-from typing import Optional
+from typing import Dict, Optional
 
 from app.services.cache.redis import RedisCache
+from app.services.cache.early_expiry import read_through, unwrap, wrap
 from app.config import settings
+from app.db.session import run_db
 from app.repositories.comment_summary_repo import CommentSummaryRepository
+from app.schemas.summary import summary_payload
 
 
 def _comment_summary_key(comment_hn_id: int, model_version: str) -> str:
-    return f"summary:comment:{comment_hn_id}:model:{model_version}"
+    return f"summary:v2:comment:{comment_hn_id}:model:{model_version}"
 
 
 class CommentSummaryCache:
@@ -17,32 +20,29 @@ class CommentSummaryCache:
 
     async def get(self, comment_hn_id: int, model_version: str) -> Optional[dict]:
         key = _comment_summary_key(comment_hn_id, model_version)
-        data = await self.redis.get_json(key)
-        if data is not None:
-            return data
-        return None
+        payload, _exp, _delta = unwrap(await self.redis.get_json(key))
+        return payload
 
     async def set(self, comment_hn_id: int, model_version: str, payload: dict) -> None:
         key = _comment_summary_key(comment_hn_id, model_version)
-        await self.redis.set_json(key, payload, ex=settings.SUMMARY_TTL_SECONDS)
+        envelope, ttl = wrap(payload, settings.SUMMARY_TTL_SECONDS)
+        await self.redis.set_json(key, envelope, ex=ttl)
+
+    async def set_many(self, payloads: Dict[int, dict], model_version: str) -> None:
+        """Write several comment summaries in one pipelined round trip (TTLs jittered per key)."""
+        wrapped = {_comment_summary_key(cid, model_version): wrap(payload, settings.SUMMARY_TTL_SECONDS) for cid, payload in payloads.items()}
+        await self.redis.set_many(
+            {key: envelope for key, (envelope, _ttl) in wrapped.items()},
+            ex={key: ttl for key, (_envelope, ttl) in wrapped.items()},
+        )
 
     async def get_or_db(self, session, comment_hn_id: int, model_version: str) -> Optional[dict]:
-        cached = await self.get(comment_hn_id, model_version)
-        if cached is not None:
-            return cached
-
-        row = self.repo.fetch_latest(session, comment_hn_id, model_version)
-        if row is None:
-            return None
-
-        payload = {
-            "tldr": row.tldr,
-            "key_points": row.key_points,
-            "consensus": row.consensus,
-            "model_version": row.model_version,
-            "model_name": row.model_name,
-            "created_at": row.created_at.isoformat() if row.created_at else None,
-            "updated_at": row.updated_at.isoformat() if row.updated_at else None,
-        }
-        await self.set(comment_hn_id, model_version, payload)
-        return payload
+        """Cached summary, refilled from the DB by one reader at a time (early, before expiry)."""
+
+        async def _load() -> Optional[dict]:
+            row = await run_db(self.repo.fetch_latest, session, comment_hn_id, model_version)
+            if row is None:
+                return None
+            return summary_payload(row)
+
+        return await read_through(self.redis, _comment_summary_key(comment_hn_id, model_version), _load, settings.SUMMARY_TTL_SECONDS)
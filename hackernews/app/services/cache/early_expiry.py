@@ -0,0 +1,88 @@
+"""Stampede protection for read-through caches (summary and comment-summary).
+
+Values are stored in a small envelope `{"payload": ..., "exp": unix_ts, "delta": s}`,
+under `summary:v2:` keys so replicas still reading bare payloads from the old
+`summary:story:` / `summary:comment:` keys never see one:
+- `exp` is the logical expiry. The Redis TTL is longer by a grace window, so a
+  logically expired value can still be served while one reader refills it.
+- `delta` is how long the last refill took. Each reader may decide to refill
+  early with probability rising as `exp` nears: `now - delta * beta * ln(rand) >= exp`
+  (XFetch, Vattani et al.), which spreads refills out instead of syncing them on expiry.
+- TTLs get random jitter so keys written in bulk don't expire together.
+- A per-key fill lock (`RedisCache.lock`, so token-owned) lets exactly one reader
+  refill; the others serve the stale value, or wait briefly for the refill when
+  there is nothing to serve.
+"""
+import asyncio
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from app.config import settings
+from app.services.cache.redis import LockTimeout, RedisCache
+
+_POLL_SECONDS = 0.05
+
+
+def jittered_ttl(ttl: int, jitter: Optional[float] = None) -> int:
+    """`ttl` spread uniformly by ±`jitter` (a fraction), at least 1 second."""
+    jitter = settings.SUMMARY_TTL_JITTER if jitter is None else jitter
+    return max(1, int(ttl * random.uniform(1 - jitter, 1 + jitter)))
+
+
+def wrap(payload: Any, ttl: int, delta: float = 0.0) -> tuple[dict, int]:
+    """Envelope for `payload` plus the Redis TTL (logical TTL + stale grace) to store it with."""
+    logical = jittered_ttl(ttl)
+    envelope = {"payload": payload, "exp": time.time() + logical, "delta": round(delta, 6)}
+    return envelope, logical + settings.SUMMARY_STALE_GRACE_SECONDS
+
+
+def unwrap(data: Any) -> tuple[Optional[Any], Optional[float], float]:
+    """(payload, exp, delta); values written before envelopes never expire logically."""
+    if isinstance(data, dict) and "payload" in data and "exp" in data:
+        return data["payload"], data["exp"], float(data.get("delta") or 0.0)
+    return data, None, 0.0
+
+
+def should_refresh(exp: Optional[float], delta: float, beta: Optional[float] = None, now: Optional[float] = None) -> bool:
+    if exp is None:
+        return False
+    beta = settings.SUMMARY_XFETCH_BETA if beta is None else beta
+    now = time.time() if now is None else now
+    # 1 - random() is in (0, 1], so the log is finite
+    return now - delta * beta * math.log(1.0 - random.random()) >= exp
+
+
+async def read_through(
+    redis_cache: RedisCache,
+    key: str,
+    load: Callable[[], Awaitable[Optional[Any]]],
+    ttl: int,
+) -> Optional[Any]:
+    """Return the cached payload for `key`, refilling it from `load()` with stampede protection."""
+    payload, exp, delta = unwrap(await redis_cache.get_json(key))
+    if payload is not None and not should_refresh(exp, delta):
+        return payload
+
+    # a token-owned lock: a filler that outlives it can't release the next filler's lock
+    try:
+        async with redis_cache.lock(f"fill:{key}", timeout=settings.SUMMARY_FILL_LOCK_SECONDS, blocking_timeout=0):
+            started = time.monotonic()
+            fresh = await load()
+            if fresh is None:
+                return payload
+            envelope, redis_ttl = wrap(fresh, ttl, time.monotonic() - started)
+            await redis_cache.set_json(key, envelope, ex=redis_ttl)
+            return fresh
+    except LockTimeout:
+        if payload is not None:
+            return payload
+        # nothing to serve yet: give the filler a moment, then read the source ourselves
+        deadline = time.monotonic() + settings.SUMMARY_FILL_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_POLL_SECONDS)
+            filled, _exp, _delta = unwrap(await redis_cache.get_json(key))
+            if filled is not None:
+                return filled
+        return await load()
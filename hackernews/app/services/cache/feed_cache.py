@@ -1,63 +1,93 @@
-"""Top stories cache helpers for global list priming and reads."""
-from typing import List, Dict
+"""Top stories cache: versioned snapshots behind an atomically swapped pointer.
+
+Layout:
+- `top:global:v2` (FEED_KEY) -> {"version": n, "built_at": unix_ts}
+- `top:global:v2:snap:<n>`   -> the serialized feed for version n (immutable)
+
+`top:global:v1` held the bare list before snapshots existed. It is left to
+older replicas still reading it during a rollout and expires on its own TTL.
+
+A refresh writes a new snapshot first and then swaps the pointer, so readers
+see either the old list or the new one, never a gap. The previous snapshot
+lingers briefly for readers that fetched the old pointer. Snapshots outlive
+the soft TTL by a wide margin: a reader that finds a soft-expired snapshot
+still serves it and starts one background rebuild instead of querying the DB.
+"""
+import asyncio
+import logging
+import time
+from typing import List, Dict, Optional
 
 from app.services.cache.redis import RedisCache
 from app.repositories.top_story_repo import TopStoryRepository
 
 from app.config import settings
+from app.db.session import get_session, run_db
+
+FEED_KEY = "top:global:v2"
+LOCK_KEY = "lock:top:global:v2"
+VERSION_KEY = "meta:top:global:v2:version"
+REFRESH_FLAG_KEY = "lock:top:global:v2:refresh"
+
+logger = logging.getLogger(__name__)
 
-FEED_KEY = "top:global:v1"
-LOCK_KEY = "lock:top:global:v1"
+# strong references to in-flight background refreshes (one per process)
+_refreshing: set = set()
+
+
+def _snapshot_key(version: int) -> str:
+    return f"{FEED_KEY}:snap:{version}"
 
 
 class FeedCache:
-    def __init__(self, redis_cache: RedisCache, repo: TopStoryRepository):
+    def __init__(self, redis_cache: RedisCache, repo: TopStoryRepository, SessionLocal=None):
         self.redis = redis_cache
         self.repo = repo
+        # needed only for background refreshes triggered by reads
+        self.SessionLocal = SessionLocal
 
-    async def read_feed(self) -> List[Dict]:
-        """Read feed from Redis. If missing, caller should fallback to DB using `fallback_to_db`."""
-        data = await self.redis.get_json(FEED_KEY)
-        return data if data is not None else []
+    async def _read_snapshot(self) -> tuple[Optional[List[Dict]], Optional[dict]]:
+        pointer = await self.redis.get_json(FEED_KEY)
+        if not isinstance(pointer, dict) or pointer.get("version") is None:
+            return None, None
+        data = await self.redis.get_json(_snapshot_key(pointer["version"]))
+        return data, pointer
 
-    async def prime_feed(self, session, limit: int | None = None) -> List[Dict]:
-        """Prime the top stories cache by reading from DB and writing atomically to Redis.
+    async def read_feed(self) -> List[Dict]:
+        """Read the current snapshot. If missing, caller should fallback using `read_or_fallback`.
 
-        Uses a Redis lock to avoid stampede.
-        Returns the serialized feed written to cache.
+        A soft-expired snapshot is still returned; a background rebuild is started.
         """
-        limit = limit or settings.TOP_STORIES_LIMIT
-        async with self.redis.lock(LOCK_KEY, timeout=10):
-            # Re-check cache after acquiring lock to avoid double work
-            existing = await self.redis.get_json(FEED_KEY)
-            if existing is not None:
-                return existing
-
-            rows = self.repo.list_top_stories(session, limit=limit)
-
-            serialized = [
-                {
-                    "hn_id": r.hn_id,
-                    "title": r.title,
-                    "url": r.url,
-                    "score": (r.raw_payload or {}).get("score"),
-                    "time": (r.raw_payload or {}).get("time"),
-                }
-                for r in rows
-            ]
-
-            # Atomic write (set with TTL)
-            await self.redis.set_json(FEED_KEY, serialized, ex=settings.FEED_TTL_SECONDS)
-            return serialized
+        data, pointer = await self._read_snapshot()
+        if data is None:
+            return []
+        if time.time() - (pointer.get("built_at") or 0) > settings.FEED_TTL_SECONDS:
+            await self._refresh_in_background()
+        return data
 
-    async def read_or_fallback(self, session) -> List[Dict]:
-        """Read feed from cache, fallback to DB if empty (without priming cache)."""
-        data = await self.read_feed()
-        if data:
-            return data
+    async def _refresh_in_background(self) -> None:
+        if self.SessionLocal is None or _refreshing:
+            return
+        # one rebuild across replicas per window (always allowed without Redis)
+        claimed = await self.redis.set_json(REFRESH_FLAG_KEY, 1, ex=30, nx=True)
+        if claimed is False:
+            return
+
+        async def _refresh():
+            try:
+                with get_session(self.SessionLocal) as session:
+                    await self.prime_feed(session)
+            except Exception:
+                logger.exception("Background top-stories refresh failed")
+            finally:
+                await self.redis.delete(REFRESH_FLAG_KEY)
 
-        # fallback to DB (serialize same shape)
-        rows = self.repo.list_top_stories(session, limit=settings.TOP_STORIES_LIMIT)
+        task = asyncio.create_task(_refresh())
+        _refreshing.add(task)
+        task.add_done_callback(_refreshing.discard)
+
+    async def _build(self, session, limit: int) -> List[Dict]:
+        rows = await run_db(self.repo.list_top_stories, session, limit=limit)
         return [
             {
                 "hn_id": r.hn_id,
@@ -68,3 +98,40 @@ class FeedCache:
             }
             for r in rows
         ]
+
+    async def prime_feed(self, session, limit: int | None = None) -> List[Dict]:
+        """Build a new snapshot from the DB and swap the pointer to it.
+
+        Always publishes fresh data (the worker calls this right after writing rows);
+        the Redis lock keeps concurrent primes from interleaving.
+        Returns the serialized feed written to cache.
+        """
+        async with self.redis.lock(LOCK_KEY, timeout=10):
+            return await self._publish(session, limit or settings.TOP_STORIES_LIMIT)
+
+    async def _publish(self, session, limit: int) -> List[Dict]:
+        serialized = await self._build(session, limit)
+        if not self.redis.enabled():
+            return serialized
+
+        previous = await self.redis.get_json(FEED_KEY)
+        version = await self.redis.incr(VERSION_KEY)
+        await self.redis.set_json(_snapshot_key(version), serialized, ex=settings.FEED_SNAPSHOT_TTL_SECONDS)
+        # the swap: a single SET, so readers see the old or the new version
+        await self.redis.set_json(FEED_KEY, {"version": version, "built_at": time.time()})
+        if isinstance(previous, dict) and previous.get("version") is not None:
+            await self.redis.expire(_snapshot_key(previous["version"]), settings.FEED_PREVIOUS_SNAPSHOT_TTL_SECONDS)
+        return serialized
+
+    async def read_or_fallback(self, session) -> List[Dict]:
+        """Read the snapshot; on a cold cache build one (once, under the lock) and serve it."""
+        data = await self.read_feed()
+        if data:
+            return data
+
+        async with self.redis.lock(LOCK_KEY, timeout=10):
+            # another request may have built it while we waited
+            data, _pointer = await self._read_snapshot()
+            if data is not None:
+                return data
+            return await self._publish(session, settings.TOP_STORIES_LIMIT)
@@ -0,0 +1,25 @@
+"""Cache for the interests catalog list served by `GET /interests`."""
+import hashlib
+import json
+from typing import Any, Optional
+
+from app.services.cache.redis import RedisCache
+from app.services.interests.catalog import INTEREST_GROUPS
+from app.config import settings
+
+# The list only changes when the static catalog does; keying on its hash retires
+# the cached copy on deploy without an explicit invalidation.
+_CATALOG_VERSION = hashlib.sha256(json.dumps(INTEREST_GROUPS, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+INTERESTS_LIST_KEY = f"interests:list:{_CATALOG_VERSION}"
+
+
+class InterestListCache:
+    def __init__(self, redis_cache: RedisCache):
+        self.redis = redis_cache
+
+    async def get(self) -> Optional[list[dict[str, Any]]]:
+        data = await self.redis.get_json(INTERESTS_LIST_KEY)
+        return data if isinstance(data, list) else None
+
+    async def set(self, payload: list[dict[str, Any]]) -> None:
+        await self.redis.set_json(INTERESTS_LIST_KEY, payload, ex=settings.INTERESTS_LIST_TTL_SECONDS)
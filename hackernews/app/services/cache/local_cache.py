@@ -0,0 +1,137 @@
+"""In-process L1 cache in front of Redis for hot, slowly-changing keys.
+
+Only keys under a configured namespace (key prefix) are held locally, each
+namespace with its own TTL. Memory is bounded by entry count and by the size
+of the serialized values; the least recently used entries are evicted first.
+
+Replicas stay coherent through invalidation messages on a Redis pub/sub
+channel: every write to an L1 namespace (from the API or the worker) publishes
+the key, and each subscribed process drops its local copy. The TTL bounds
+staleness if a message is missed.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Optional
+
+from app.config import settings
+
+INVALIDATION_CHANNEL = "cache:l1:invalidate"
+
+
+def l1_namespaces() -> dict[str, float]:
+    """Key prefix -> local TTL (seconds) for keys worth holding in-process."""
+    return {
+        "top:global:": settings.CACHE_L1_FEED_TTL_SECONDS,
+        "summary:v2:story:": settings.CACHE_L1_SUMMARY_TTL_SECONDS,
+        "interests:list:": settings.CACHE_L1_INTERESTS_TTL_SECONDS,
+    }
+
+
+def match_namespace(key: str, namespaces: dict[str, float]) -> Optional[str]:
+    for prefix in namespaces:
+        if key.startswith(prefix):
+            return prefix
+    return None
+
+
+class LocalTTLCache:
+    """Bounded LRU map with per-namespace TTLs.
+
+    Values are shared, not copied: callers must treat what `get` returns as read-only.
+    `token()` / `set(..., token=)` guard fills against a concurrent invalidation: a
+    value read from Redis before an invalidation arrived is not stored afterwards.
+    """
+
+    def __init__(
+        self,
+        namespaces: Optional[dict[str, float]] = None,
+        max_entries: int = 2048,
+        max_bytes: int = 32 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.namespaces = dict(namespaces if namespaces is not None else l1_namespaces())
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self._clock = clock
+        # key -> (expires_at, size, value), oldest first
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def handles(self, key: str) -> bool:
+        ns = match_namespace(key, self.namespaces)
+        return ns is not None and self.namespaces[ns] > 0
+
+    def token(self) -> int:
+        return self._generation
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[0] <= self._clock():
+            self._drop(key)
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, key: str, value: Any, size: int = 0, token: Optional[int] = None) -> bool:
+        ns = match_namespace(key, self.namespaces)
+        if ns is None or self.namespaces[ns] <= 0:
+            return False
+        if token is not None and token != self._generation:
+            return False
+        if size > self.max_bytes:
+            self._drop(key)
+            return False
+        self._drop(key)
+        self._entries[key] = (self._clock() + self.namespaces[ns], size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+        return True
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        self._generation += 1
+        for key in keys:
+            self._drop(key)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+def local_cache_from_settings() -> Optional[LocalTTLCache]:
+    if not settings.CACHE_L1_ENABLED:
+        return None
+    return LocalTTLCache(max_entries=settings.CACHE_L1_MAX_ENTRIES, max_bytes=settings.CACHE_L1_MAX_BYTES)
@@ -1,35 +1,169 @@
 """Redis cache helpers for MVP v1."""
 import json
 import logging
+import uuid
+import zlib
 from typing import Any, Optional
 import asyncio
 
 import redis.asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from app.config import settings
+from app.services.cache.local_cache import INVALIDATION_CHANNEL, LocalTTLCache, l1_namespaces, match_namespace
+
+logger = logging.getLogger(__name__)
+
+# Signal streams (consumed by worker replicas through consumer groups)
+INTEREST_SIGNAL_STREAM = "interest_fetch_stream"
+INTEREST_SIGNAL_PENDING = "pending_interests_set"
+COMMENT_SIGNAL_STREAM = "comment_fetch_stream"
+COMMENT_SIGNAL_PENDING = "pending_comments_set"
+# LISTs the signals used before streams; consumers drain them into the streams
+INTEREST_SIGNAL_LEGACY_LIST = "interest_fetch_queue"
+COMMENT_SIGNAL_LEGACY_LIST = "comment_fetch_queue"
+
+
+def _decode(value: Any) -> Any:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _stream_entry(entry) -> tuple[str, Any]:
+    """Turn a raw (id, {field: value}) stream entry into (id, decoded payload)."""
+    entry_id, fields = entry
+    fields = {_decode(k): _decode(v) for k, v in (fields or {}).items()}
+    data = fields.get("data")
+    try:
+        payload = json.loads(data) if data is not None else None
+    except Exception:
+        payload = data
+    return _decode(entry_id), payload
+
+
+# --- Value codec ---
+#
+# Legacy values are plain JSON text. Framed values start with a version byte
+# (never the first byte of JSON text), then a flags byte: the low nibble names
+# the serializer, 0x10 marks a zlib-compressed body. Readers accept both forms,
+# so a rollout is: deploy everywhere, then switch REDIS_CODEC on the writers.
+
+CODEC_VERSION = 1
+_SERIALIZERS = {"json": 0, "orjson": 1, "msgpack": 2}
+_COMPRESSED = 0x10
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+
+class CodecError(ValueError):
+    """A stored value this process cannot decode (e.g. written by a newer codec version)."""
+
+
+def _json_loads(data: Any) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN, which stdlib json accepts
+    return json.loads(data)
+
+
+class RedisCodec:
+    """Serializes cache values; `serializer="json"` without compression keeps the legacy format."""
+
+    def __init__(self, serializer: str = "json", compress_min_bytes: int = 0, compress_level: int = 1):
+        if serializer not in _SERIALIZERS:
+            raise ValueError(f"unknown redis codec {serializer!r}")
+        missing = (serializer == "orjson" and orjson is None) or (serializer == "msgpack" and msgpack is None)
+        if missing:
+            logging.getLogger(__name__).warning("%s is not installed; writing legacy JSON instead", serializer)
+            serializer = "json"
+        self.serializer = serializer
+        self.compress_min_bytes = max(0, compress_min_bytes)
+        self.compress_level = compress_level
+
+    def encode(self, value: Any) -> bytes | str:
+        if self.serializer == "json":
+            text = json.dumps(value)
+            if not self.compress_min_bytes or len(text) < self.compress_min_bytes:
+                return text
+            body = text.encode("utf-8")
+        elif self.serializer == "orjson":
+            body = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            body = msgpack.packb(value, use_bin_type=True)
+        flags = _SERIALIZERS[self.serializer]
+        if self.compress_min_bytes and len(body) >= self.compress_min_bytes:
+            body = zlib.compress(body, self.compress_level)
+            flags |= _COMPRESSED
+        return bytes((CODEC_VERSION, flags)) + body
+
+    def decode(self, raw: bytes | str) -> Any:
+        # bytes 0x00-0x08 never start JSON text (whitespace is 0x09 and up)
+        if isinstance(raw, str) or not raw or raw[0] > 0x08:
+            # legacy JSON text (or a bare INCR counter)
+            return _json_loads(raw)
+        if raw[0] != CODEC_VERSION or len(raw) < 2:
+            raise CodecError(f"unsupported codec version {raw[0]}")
+        flags, body = raw[1], raw[2:]
+        if flags & _COMPRESSED:
+            body = zlib.decompress(body)
+        kind = flags & 0x0F
+        if kind == _SERIALIZERS["msgpack"]:
+            if msgpack is None:
+                raise CodecError("msgpack value but msgpack is not installed")
+            return msgpack.unpackb(body, raw=False, strict_map_key=False)
+        if kind in (_SERIALIZERS["json"], _SERIALIZERS["orjson"]):
+            return _json_loads(body)
+        raise CodecError(f"unknown serializer {kind}")
+
+
+def codec_from_settings() -> RedisCodec:
+    return RedisCodec(settings.REDIS_CODEC, settings.REDIS_COMPRESS_MIN_BYTES)
 
 
 class RedisCache:
     """Async Redis cache wrapper.
 
     - Supports injection of a redis client for testing (`client=`).
-    - Provides simple JSON get/set and a lock context manager for stampede protection.
+    - Provides simple JSON get/set (through a `RedisCodec`) and a lock context manager for stampede protection.
+    - Optionally serves hot keys from an in-process `LocalTTLCache` (`local=`), kept
+      coherent across processes by invalidations on a pub/sub channel.
     """
 
-    def __init__(self, url: Optional[str] = None, client: Optional[Any] = None):
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        client: Optional[Any] = None,
+        local: Optional[LocalTTLCache] = None,
+        codec: Optional[RedisCodec] = None,
+    ):
         self._url = url
         self._client = client
+        self.codec = codec or codec_from_settings()
         self._own_client = False
+        self._local = local
+        # L1 is only trusted while subscribed to invalidations
+        self._local_ready = False
+        self._listener: Optional[asyncio.Task] = None
+        self._origin = uuid.uuid4().hex
 
     async def init(self):
-        if self._url is None:
+        if self._url is None and self._client is None:
             # Redis disabled (local dev)
-            self._client = None
             return
 
         if self._client is None:
             try:
-                self._client = aioredis.from_url(
-                    self._url, encoding="utf-8", decode_responses=True
-                )
+                # raw bytes: framed codec values are binary
+                self._client = aioredis.from_url(self._url)
                 # Validate connection early to avoid runtime failures
                 await self._client.ping()
                 self._own_client = True
@@ -41,31 +175,184 @@ class RedisCache:
                 self._client = None
                 self._own_client = False
 
-
+        if self._client is not None and self._local is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen_invalidations())
 
     async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
         if self._own_client and self._client:
             await self._client.close()
 
     def enabled(self) -> bool:
         return self._client is not None
 
-    async def set_json(self, key: str, value: Any, ex: Optional[int] = None) -> None:
-        if not self._client:
+    # --- L1 (in-process) layer ---
+
+    def local_stats(self) -> Optional[dict]:
+        if self._local is None:
+            return None
+        return {**self._local.stats(), "subscribed": self._local_ready}
+
+    def _local_get(self, key: str) -> Optional[Any]:
+        if not self._local_ready or not self._local.handles(key):
+            return None
+        return self._local.get(key)
+
+    def _local_fill(self, key: str, raw: Any, value: Any, token: Optional[int]) -> None:
+        if self._local_ready and value is not None and self._local.handles(key):
+            self._local.set(key, value, size=len(raw), token=token)
+
+    async def _after_write(self, keys: list[str], written: Optional[dict[str, tuple[str, Any]]] = None) -> None:
+        """Refresh/drop local copies and tell other processes to drop theirs."""
+        namespaces = self._local.namespaces if self._local is not None else l1_namespaces()
+        keys = [k for k in keys if match_namespace(k, namespaces) is not None]
+        if not keys:
             return
-        payload = json.dumps(value)
-        await self._client.set(key, payload, ex=ex)
+        if self._local is not None:
+            self._local.invalidate(keys)
+            for key, (raw, value) in (written or {}).items():
+                self._local_fill(key, raw, value, None)
+        if self._local is not None or settings.CACHE_L1_ENABLED:
+            try:
+                await self._client.publish(INVALIDATION_CHANNEL, json.dumps({"origin": self._origin, "keys": keys}))
+            except Exception:
+                logger.warning("Failed publishing L1 invalidation for %s", keys, exc_info=True)
+
+    def _apply_invalidation(self, data: Any) -> None:
+        try:
+            message = json.loads(_decode(data))
+        except Exception:
+            return
+        if not isinstance(message, dict) or message.get("origin") == self._origin:
+            return
+        self._local.invalidate(message.get("keys") or [])
+
+    async def _listen_invalidations(self) -> None:
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # anything published while unsubscribed was missed
+                self._local.clear()
+                self._local_ready = True
+                while True:
+                    msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if msg and msg.get("type") == "message":
+                        self._apply_invalidation(msg.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("L1 invalidation subscription lost; retrying", exc_info=True)
+                await asyncio.sleep(1.0)
+            finally:
+                self._local_ready = False
+                self._local.clear()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    # --- JSON values ---
+
+    def _load(self, key: str, raw: Any) -> Optional[Any]:
+        if raw is None:
+            return None
+        try:
+            return self.codec.decode(raw)
+        except CodecError as exc:
+            # e.g. written by a newer deploy: treat as a miss so the caller recomputes
+            logger.warning("Unreadable cached value for %s: %s", key, exc)
+            return None
+
+    async def set_json(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        """SET a JSON value. With nx=True, returns whether the key was written."""
+        if not self._client:
+            return None
+        payload = self.codec.encode(value)
+        res = await self._client.set(key, payload, ex=ex, nx=nx)
+        if res:
+            await self._after_write([key], {key: (payload, value)})
+        return bool(res)
 
     async def get_json(self, key: str) -> Optional[Any]:
         if not self._client:
             return None
+        cached = self._local_get(key)
+        if cached is not None:
+            return cached
+        token = self._local.token() if self._local is not None else None
         data = await self._client.get(key)
-        return json.loads(data) if data is not None else None
+        value = self._load(key, data)
+        if value is not None:
+            self._local_fill(key, data, value, token)
+        return value
+
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        """MGET several JSON keys in one round trip; missing keys come back as None."""
+        if not self._client or not keys:
+            return [None] * len(keys)
+        out: list[Optional[Any]] = [self._local_get(k) for k in keys]
+        missing = [i for i, v in enumerate(out) if v is None]
+        if not missing:
+            return out
+        token = self._local.token() if self._local is not None else None
+        values = await self._client.mget([keys[i] for i in missing])
+        for i, raw in zip(missing, values):
+            out[i] = self._load(keys[i], raw)
+            if out[i] is not None:
+                self._local_fill(keys[i], raw, out[i], token)
+        return out
+
+    async def set_many(self, mapping: dict[str, Any], ex: Optional[int | dict[str, Optional[int]]] = None) -> None:
+        """Pipeline several JSON SETs in one round trip.
+
+        `ex` is one TTL for every key, or a per-key mapping (keys absent from it get no TTL).
+        """
+        if not self._client or not mapping:
+            return
+        written = {key: (self.codec.encode(value), value) for key, value in mapping.items()}
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, (payload, _value) in written.items():
+                pipe.set(key, payload, ex=ex.get(key) if isinstance(ex, dict) else ex)
+            await pipe.execute()
+        await self._after_write(list(written), written)
 
     async def delete(self, key: str) -> None:
         if not self._client:
             return
         await self._client.delete(key)
+        await self._after_write([key])
+
+    async def delete_many(self, keys: list[str]) -> None:
+        """Pipeline one DEL per key (cluster-safe, unlike a multi-key DEL)."""
+        if not self._client or not keys:
+            return
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.delete(key)
+            await pipe.execute()
+        await self._after_write(list(keys))
+
+    def pipeline(self, transaction: bool = False):
+        """Raw command pipeline: `async with cache.pipeline() as pipe: ...; await pipe.execute()`.
+
+        Without Redis every queued command is accepted and `execute()` returns one None per command.
+        Writes made through it bypass the L1 cache, so use it for non-L1 keys.
+        """
+        if not self._client:
+            return _NoOpPipeline()
+        return self._client.pipeline(transaction=transaction)
+
+    async def expire(self, key: str, seconds: int) -> None:
+        if not self._client:
+            return
+        await self._client.expire(key, seconds)
 
     async def incr(self, key: str, ex: Optional[int] = None) -> Optional[int]:
         if not self._client:
@@ -73,66 +360,170 @@ class RedisCache:
         val = await self._client.incr(key)
         if ex:
             await self._client.expire(key, ex)
+        await self._after_write([key])
         return int(val)
 
     # --- Reactive Signaling ---
 
     async def signal_interest_fetch(self, interest_id: int) -> None:
         """Signal the worker to fetch new stories for a specific interest."""
-        if not self._client:
+        await self.signal_interest_fetches([interest_id])
+
+    async def signal_interest_fetches(self, interest_ids: list[int]) -> None:
+        """Signal several interests at once (one pipelined SADD round, one XADD round)."""
+        # Use a Set to avoid duplicate signals for the same interest in the stream
+        # This acts as a "de-bouncer"; the consumer clears the member on delivery
+        await self._signal_many(INTEREST_SIGNAL_PENDING, INTEREST_SIGNAL_STREAM, interest_ids)
+
+    async def signal_comment_fetch(self, hn_id: int) -> None:
+        """Signal the worker to fetch comments for a specific story."""
+        await self._signal_many(COMMENT_SIGNAL_PENDING, COMMENT_SIGNAL_STREAM, [hn_id])
+
+    async def _signal_many(self, pending_set: str, stream: str, ids: list[int]) -> None:
+        if not self._client or not ids:
+            return
+        ids = list(dict.fromkeys(ids))
+        async with self._client.pipeline(transaction=False) as pipe:
+            for i in ids:
+                pipe.sadd(pending_set, str(i))
+            added = await pipe.execute()
+        fresh = [i for i, new in zip(ids, added) if new]
+        if not fresh:
+            return
+        async with self._client.pipeline(transaction=False) as pipe:
+            for i in fresh:
+                pipe.xadd(stream, {"data": json.dumps(i)}, maxlen=None, approximate=True)
+            await pipe.execute()
+
+    async def srem(self, key: str, *members: Any) -> None:
+        if not self._client or not members:
             return
-        # Use a Set to avoid duplicate signals for the same interest in the queue
-        # This acts as a "de-bouncer"
-        already_queued = await self._client.sismember("pending_interests_set", str(interest_id))
-        if not already_queued:
-            await self._client.sadd("pending_interests_set", str(interest_id))
-            await self._client.lpush("interest_fetch_queue", str(interest_id))
+        await self._client.srem(key, *[str(m) for m in members])
+
+    # --- Pub/Sub (fire-and-forget notifications) ---
 
-    async def get_next_interest_signal(self, timeout: int = 5) -> Optional[int]:
-        """Worker: Wait for a signal to fetch an interest."""
+    async def publish(self, channel: str, value: Any) -> Optional[int]:
+        """Publish a JSON message; returns the number of subscribers reached."""
         if not self._client:
             return None
-        res = await self._client.brpop("interest_fetch_queue", timeout=timeout)
-        if res:
-            _, iid_str = res
-            await self._client.srem("pending_interests_set", iid_str)
-            return int(iid_str)
-        return None
+        return int(await self._client.publish(channel, json.dumps(value)))
 
-    async def signal_comment_fetch(self, hn_id: int) -> None:
-        """Signal the worker to fetch comments for a specific story."""
+    def pubsub(self):
+        """Raw PubSub handle for subscribers (None when Redis is disabled)."""
+        if not self._client:
+            return None
+        return self._client.pubsub()
+
+    # --- Streams (consumer-group job queues) ---
+
+    async def xadd(self, stream: str, value: Any, maxlen: Optional[int] = None) -> Optional[str]:
+        """Append a JSON payload to a stream; maxlen trims approximately."""
+        if not self._client:
+            return None
+        entry_id = await self._client.xadd(stream, {"data": json.dumps(value)}, maxlen=maxlen, approximate=True)
+        return _decode(entry_id)
+
+    async def ensure_group(self, stream: str, group: str) -> None:
+        """Create the consumer group (and stream) if missing."""
         if not self._client:
             return
-        already_queued = await self._client.sismember("pending_comments_set", str(hn_id))
-        if not already_queued:
-            await self._client.sadd("pending_comments_set", str(hn_id))
-            await self._client.lpush("comment_fetch_queue", str(hn_id))
+        try:
+            await self._client.xgroup_create(stream, group, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
 
-    async def get_next_comment_signal(self, timeout: int = 5) -> Optional[int]:
-        """Worker: Wait for a signal to fetch comments."""
+    async def xreadgroup(self, stream: str, group: str, consumer: str, count: int = 1, block_ms: Optional[int] = None) -> list[tuple[str, Any]]:
+        """Read never-delivered entries for this consumer; [] on timeout."""
+        if not self._client:
+            return []
+        res = await self._client.xreadgroup(group, consumer, {stream: ">"}, count=count, block=block_ms)
+        entries: list[tuple[str, Any]] = []
+        for _name, items in res or []:
+            entries.extend(_stream_entry(e) for e in items if e and e[1] is not None)
+        return entries
+
+    async def xautoclaim(self, stream: str, group: str, consumer: str, min_idle_ms: int, count: int = 10) -> list[tuple[str, Any]]:
+        """Take over entries another consumer left pending for at least min_idle_ms."""
+        if not self._client:
+            return []
+        res = await self._client.xautoclaim(stream, group, consumer, min_idle_time=min_idle_ms, start_id="0-0", count=count)
+        claimed = res[1] if res and len(res) > 1 else []
+        return [_stream_entry(e) for e in claimed if e and e[1] is not None]
+
+    async def xpending_deliveries(self, stream: str, group: str, entry_ids: list[str]) -> dict[str, int]:
+        """Delivery counts for pending entries, keyed by entry id."""
+        if not self._client or not entry_ids:
+            return {}
+        counts: dict[str, int] = {}
+        for entry_id in entry_ids:
+            rows = await self._client.xpending_range(stream, group, min=entry_id, max=entry_id, count=1)
+            for row in rows or []:
+                counts[_decode(row["message_id"])] = int(row["times_delivered"])
+        return counts
+
+    async def xack(self, stream: str, group: str, *entry_ids: str) -> int:
+        if not self._client or not entry_ids:
+            return 0
+        return int(await self._client.xack(stream, group, *entry_ids))
+
+    async def xlen(self, stream: str) -> Optional[int]:
         if not self._client:
             return None
-        res = await self._client.brpop("comment_fetch_queue", timeout=timeout)
-        if res:
-            _, hn_id_str = res
-            await self._client.srem("pending_comments_set", hn_id_str)
-            return int(hn_id_str)
-        return None
+        return int(await self._client.xlen(stream))
 
     # --- Watermarking ---
 
     async def set_interest_watermark(self, interest_id: int, hn_id: int) -> None:
         """Store the latest hn_id fetched for this interest."""
-        if not self._client:
-            return
-        await self._client.hset("interest_watermarks", str(interest_id), str(hn_id))
+        await self.set_interest_watermarks({interest_id: hn_id})
 
     async def get_interest_watermark(self, interest_id: int) -> int:
         """Get the latest hn_id fetched for this interest."""
+        return (await self.get_interest_watermarks([interest_id]))[interest_id]
+
+    async def set_interest_watermarks(self, watermarks: dict[int, int]) -> None:
+        """Store several watermarks in one HSET."""
+        if not self._client or not watermarks:
+            return
+        await self._client.hset("interest_watermarks", mapping={str(k): str(v) for k, v in watermarks.items()})
+
+    async def get_interest_watermarks(self, interest_ids: list[int]) -> dict[int, int]:
+        """Watermarks for several interests in one HMGET (0 when unset)."""
+        if not self._client or not interest_ids:
+            return {i: 0 for i in interest_ids}
+        values = await self._client.hmget("interest_watermarks", [str(i) for i in interest_ids])
+        return {i: int(v) if v else 0 for i, v in zip(interest_ids, values)}
+
+    # --- Interest Shelves (pre-ranked) ---
+
+    async def set_interest_shelf(self, interest_id: int, scores: dict[int, float], ex: Optional[int] = None) -> None:
+        """Atomically replace the ranked shelf (ZSET of hn_id -> score) for an interest."""
         if not self._client:
-            return 0
-        val = await self._client.hget("interest_watermarks", str(interest_id))
-        return int(val) if val else 0
+            return
+        key = f"interest:shelf:{interest_id}"
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if scores:
+                pipe.zadd(key, {str(hn_id): score for hn_id, score in scores.items()})
+                if ex:
+                    pipe.expire(key, ex)
+            await pipe.execute()
+
+    async def get_interest_shelf(self, interest_id: int, limit: Optional[int] = None) -> Optional[list[int]]:
+        """Read shelf ids best-first. Returns None when no ranked shelf is cached."""
+        return (await self.get_interest_shelves([interest_id], limit=limit))[interest_id]
+
+    async def get_interest_shelves(self, interest_ids: list[int], limit: Optional[int] = None) -> dict[int, Optional[list[int]]]:
+        """Read several shelves in one pipelined round trip (None for uncached shelves)."""
+        if not self._client or not interest_ids:
+            return {i: None for i in interest_ids}
+        end = (limit - 1) if limit else -1
+        async with self._client.pipeline(transaction=False) as pipe:
+            for interest_id in interest_ids:
+                pipe.zrevrange(f"interest:shelf:{interest_id}", 0, end)
+            results = await pipe.execute()
+        return {i: [int(x) for x in ids] if ids else None for i, ids in zip(interest_ids, results)}
 
     # --- Active User Tracking ---
 
@@ -178,29 +569,37 @@ class RedisCache:
         return int(await self._client.llen(key))
 
     
-    def lock(self, name: str, timeout: int = 10):
+    def lock(self, name: str, timeout: int = 10, blocking_timeout: Optional[float] = None):
+        """Distributed lock; `timeout` auto-expires it, `blocking_timeout` bounds the wait."""
         if not self._client:
             return _NoOpLock()
-        return _RedisLock(self._client, name, timeout)
+        return _RedisLock(self._client, name, timeout, blocking_timeout)
 
     
 
+class LockTimeout(RuntimeError):
+    """Raised when a lock could not be acquired within its blocking timeout."""
+
+
 class _RedisLock:
-    def __init__(self, client, name: str, timeout: int = 10):
+    def __init__(self, client, name: str, timeout: int = 10, blocking_timeout: Optional[float] = None):
         self._client = client
         self._name = name
         self._timeout = timeout
         # redis-py provides an asyncio-compatible Lock via client.lock
-        self._lock = client.lock(name, timeout=timeout)
+        self._lock = client.lock(name, timeout=timeout, blocking_timeout=blocking_timeout)
 
     async def __aenter__(self):
-        # Acquire the lock, waiting until it's available.
+        # Acquire the lock, waiting until it's available (or blocking_timeout passes).
         acquired = await self._lock.acquire()
         if not acquired:
-            # If acquire returned False for whatever reason, raise
-            raise RuntimeError("Failed to acquire redis lock")
+            raise LockTimeout(f"Failed to acquire redis lock {self._name}")
         return self
 
+    async def extend(self) -> None:
+        """Reset the lock's expiry to a full `timeout` (for holders doing long work)."""
+        await self._lock.extend(self._timeout, replace_ttl=True)
+
     async def __aexit__(self, exc_type, exc, tb):
         try:
             await self._lock.release()
@@ -208,10 +607,37 @@ class _RedisLock:
             # best-effort release
             pass
 
+class _NoOpPipeline:
+    """Stand-in pipeline when Redis is disabled: queues nothing, returns Nones."""
+
+    def __init__(self):
+        self._queued = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    def __getattr__(self, name: str):
+        def _queue(*args, **kwargs):
+            self._queued += 1
+            return self
+
+        return _queue
+
+    async def execute(self) -> list:
+        results, self._queued = [None] * self._queued, 0
+        return results
+
+
 class _NoOpLock:
     async def __aenter__(self):
         return self
 
+    async def extend(self) -> None:
+        return None
+
     async def __aexit__(self, exc_type, exc, tb):
         return False
 
@@ -0,0 +1,85 @@
+"""Single-flight de-duplication for expensive work (e.g. LLM summary generation).
+
+Concurrent callers for the same key queue behind one lock: a per-process asyncio
+lock first, then a Redis lock shared by every API/worker process. Whoever holds
+the lock re-checks for a stored result before producing one, so only the first
+caller runs `produce` and everyone behind it picks up the persisted result.
+
+The Redis lock's timeout only bounds how long a crashed holder blocks others:
+while `produce` runs, the holder keeps extending it, so long generations
+(map-reduce plus rate-limiter retries) never let a second producer in.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.config import settings
+from app.services.cache.redis import RedisCache, LockTimeout
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_local_locks: Dict[str, asyncio.Lock] = {}
+_local_waiters: Dict[str, int] = {}
+
+
+def summary_flight_key(kind: str, hn_id: int, model_version: str) -> str:
+    return f"flight:summary:{kind}:{hn_id}:{model_version}"
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        redis_cache: RedisCache,
+        lock_timeout: Optional[int] = None,
+        wait_timeout: Optional[float] = None,
+    ):
+        self.redis = redis_cache
+        self.lock_timeout = lock_timeout or settings.SUMMARY_FLIGHT_LOCK_SECONDS
+        self.wait_timeout = wait_timeout or settings.SUMMARY_FLIGHT_WAIT_SECONDS
+
+    async def run(
+        self,
+        key: str,
+        check: Callable[[], Awaitable[Optional[T]]],
+        produce: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Return `check()` if a result exists, else `produce()` it exactly once per key."""
+        lock = _local_locks.setdefault(key, asyncio.Lock())
+        _local_waiters[key] = _local_waiters.get(key, 0) + 1
+        try:
+            async with lock:
+                try:
+                    async with self.redis.lock(f"lock:{key}", timeout=self.lock_timeout, blocking_timeout=self.wait_timeout) as held:
+                        renew = asyncio.create_task(self._keep_alive(held, key))
+                        try:
+                            return await self._check_or_produce(check, produce)
+                        finally:
+                            renew.cancel()
+                except LockTimeout:
+                    # holder is stuck or very slow; don't block the caller forever
+                    logger.warning("single-flight wait timed out for %s; producing locally", key)
+                    return await self._check_or_produce(check, produce)
+        finally:
+            _local_waiters[key] -= 1
+            if _local_waiters[key] <= 0:
+                _local_waiters.pop(key, None)
+                _local_locks.pop(key, None)
+
+    async def _keep_alive(self, held, key: str) -> None:
+        while True:
+            await asyncio.sleep(self.lock_timeout / 3)
+            try:
+                await held.extend()
+            except Exception:
+                logger.warning("could not extend single-flight lock for %s", key, exc_info=True)
+                return
+
+    @staticmethod
+    async def _check_or_produce(check, produce):
+        # Re-check after acquiring the lock; the previous holder may have produced it
+        existing = await check()
+        if existing is not None:
+            return existing
+        return await produce()
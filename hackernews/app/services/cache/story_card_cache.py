@@ -0,0 +1,48 @@
+"""Compact per-story cards used to hydrate feed pages (Redis MGET, then one DB IN query)."""
+from typing import Dict, Iterable
+
+from app.services.cache.redis import RedisCache
+from app.config import settings
+from app.db.models.story import Story
+from app.db.session import run_db
+from app.repositories.story_repo import StoryRepository
+
+
+def _story_card_key(hn_id: int) -> str:
+    return f"story:card:{hn_id}"
+
+
+def story_card(story: Story) -> dict:
+    return {
+        "hn_id": story.hn_id,
+        "title": story.title,
+        "url": story.url,
+        "score": (story.raw_payload or {}).get("score"),
+        "time": (story.raw_payload or {}).get("time"),
+    }
+
+
+class StoryCardCache:
+    def __init__(self, redis_cache: RedisCache, repo: StoryRepository):
+        self.redis = redis_cache
+        self.repo = repo
+
+    async def get_many(self, session, hn_ids: Iterable[int]) -> Dict[int, dict]:
+        """Return cards keyed by hn_id; ids missing from both Redis and the DB are omitted."""
+        ids = list(dict.fromkeys(int(i) for i in hn_ids))
+        if not ids:
+            return {}
+
+        cached = await self.redis.get_many([_story_card_key(i) for i in ids])
+        cards: Dict[int, dict] = {i: c for i, c in zip(ids, cached) if c is not None}
+
+        misses = [i for i in ids if i not in cards]
+        if misses:
+            rows = await run_db(self.repo.get_many, session, misses)
+            filled = {hn_id: story_card(row) for hn_id, row in rows.items()}
+            cards.update(filled)
+            await self.redis.set_many(
+                {_story_card_key(hn_id): card for hn_id, card in filled.items()},
+                ex=settings.STORY_CARD_TTL_SECONDS,
+            )
+        return cards
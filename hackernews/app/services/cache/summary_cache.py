@@ -1,13 +1,17 @@
 """Caching helpers for AI summaries keyed by story and model version."""
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
 from app.services.cache.redis import RedisCache
+from app.services.cache.early_expiry import read_through, should_refresh, unwrap, wrap
 from app.config import settings
+from app.db.session import run_db
 from app.repositories.summary_repo import SummaryRepository
+from app.schemas.summary import summary_payload
+from app.services.queue.story_events import publish_story_event, SUMMARY_READY
 
 
 def _summary_key(hn_id: int, model_version: str) -> str:
-    return f"summary:story:{hn_id}:model:{model_version}"
+    return f"summary:v2:story:{hn_id}:model:{model_version}"
 
 
 class SummaryCache:
@@ -17,39 +21,60 @@ class SummaryCache:
 
     async def get(self, hn_id: int, model_version: str) -> Optional[dict]:
         key = _summary_key(hn_id, model_version)
-        data = await self.redis.get_json(key)
-        if data is not None:
-            return data
-        return None
+        payload, _exp, _delta = unwrap(await self.redis.get_json(key))
+        return payload
 
-    async def set(self, hn_id: int, model_version: str, payload: dict) -> None:
+    async def set(self, hn_id: int, model_version: str, payload: dict, notify: bool = True) -> None:
         key = _summary_key(hn_id, model_version)
-        await self.redis.set_json(key, payload, ex=settings.SUMMARY_TTL_SECONDS)
+        envelope, ttl = wrap(payload, settings.SUMMARY_TTL_SECONDS)
+        await self.redis.set_json(key, envelope, ex=ttl)
+        if notify:
+            # wake SSE subscribers waiting on this story
+            await publish_story_event(self.redis, hn_id, SUMMARY_READY, {"model_version": model_version, "summary": payload})
 
     async def delete(self, hn_id: int, model_version: str) -> None:
         key = _summary_key(hn_id, model_version)
         await self.redis.delete(key)
 
     async def get_or_db(self, session, hn_id: int, model_version: str) -> Optional[dict]:
-        # Try cache
-        cached = await self.get(hn_id, model_version)
-        if cached is not None:
-            return cached
-
-        # Fallback to DB
-        row = self.repo.fetch_latest(session, hn_id, model_version)
-        if row is None:
-            return None
-
-        payload = {
-            "tldr": row.tldr,
-            "key_points": row.key_points,
-            "consensus": row.consensus,
-            "model_version": row.model_version,
-            "model_name": row.model_name,
-            "created_at": row.created_at.isoformat() if row.created_at else None,
-            "updated_at": row.updated_at.isoformat() if row.updated_at else None,
-        }
-        # Populate cache for quicker reads
-        await self.set(hn_id, model_version, payload)
-        return payload
+        """Cached summary, refilled from the DB by one reader at a time (early, before expiry)."""
+
+        async def _load() -> Optional[dict]:
+            row = await run_db(self.repo.fetch_latest, session, hn_id, model_version)
+            return summary_payload(row) if row is not None else None
+
+        return await read_through(self.redis, _summary_key(hn_id, model_version), _load, settings.SUMMARY_TTL_SECONDS)
+
+    async def get_many(self, hn_ids: Iterable[int], model_version: str) -> Dict[int, dict]:
+        """Cached summaries for several stories in one MGET; misses are omitted."""
+        return {hn_id: payload for hn_id, (payload, _due) in (await self._cached_many(hn_ids, model_version)).items()}
+
+    async def _cached_many(self, hn_ids: Iterable[int], model_version: str) -> Dict[int, tuple]:
+        ids = list(dict.fromkeys(int(i) for i in hn_ids))
+        if not ids:
+            return {}
+        cached = await self.redis.get_many([_summary_key(i, model_version) for i in ids])
+        out = {}
+        for hn_id, data in zip(ids, cached):
+            payload, exp, delta = unwrap(data)
+            if payload is not None:
+                out[hn_id] = (payload, should_refresh(exp, delta))
+        return out
+
+    async def get_many_or_db(self, session, hn_ids: Iterable[int], model_version: str) -> Dict[int, dict]:
+        """Summaries for a page of stories: one MGET, one DB query for misses (and entries due
+        for early refresh), one pipelined backfill with jittered TTLs."""
+        ids = list(dict.fromkeys(int(i) for i in hn_ids))
+        cached = await self._cached_many(ids, model_version)
+        found = {hn_id: payload for hn_id, (payload, _due) in cached.items()}
+        refill = [i for i in ids if i not in cached or cached[i][1]]
+        if refill:
+            rows = await run_db(self.repo.fetch_many, session, refill, model_version)
+            filled = {hn_id: summary_payload(row) for hn_id, row in rows.items()}
+            found.update(filled)
+            wrapped = {_summary_key(hn_id, model_version): wrap(payload, settings.SUMMARY_TTL_SECONDS) for hn_id, payload in filled.items()}
+            await self.redis.set_many(
+                {key: envelope for key, (envelope, _ttl) in wrapped.items()},
+                ex={key: ttl for key, (_envelope, ttl) in wrapped.items()},
+            )
+        return found
@@ -0,0 +1,48 @@
+"""Per-user materialized interest feed pages, invalidated by user actions and shelf rotation."""
+from typing import List, Dict, Optional, Tuple
+
+from app.services.cache.redis import RedisCache
+from app.config import settings
+
+SHELF_EPOCH_KEY = "feed:shelf_epoch"
+
+
+def _user_feed_key(user_id: int) -> str:
+    return f"feed:user:{user_id}"
+
+
+class UserFeedCache:
+    """Caches a user's full feed page tagged with the shelf epoch it was built from.
+
+    The worker bumps the global epoch whenever shelves rotate, which retires every
+    cached page at once; user actions (seen/dismiss/read/interest changes) drop just
+    that user's page. A read is a single MGET of the page and the current epoch;
+    the epoch it returns is what a rebuilt page must be stored under, so a shelf
+    rotation that lands mid-build leaves the page already retired.
+    """
+
+    def __init__(self, redis_cache: RedisCache):
+        self.redis = redis_cache
+
+    async def get(self, user_id: int) -> Tuple[Optional[List[Dict]], int]:
+        """(cached items or None, current shelf epoch)."""
+        page, epoch = await self.redis.get_many([_user_feed_key(user_id), SHELF_EPOCH_KEY])
+        epoch = epoch or 0
+        if not isinstance(page, dict) or page.get("epoch") != epoch:
+            return None, epoch
+        return page.get("items"), epoch
+
+    async def set(self, user_id: int, items: List[Dict], epoch: int) -> None:
+        """Store a page built from shelves read at `epoch` (as returned by `get`)."""
+        await self.redis.set_json(
+            _user_feed_key(user_id),
+            {"epoch": epoch, "items": items},
+            ex=settings.USER_FEED_TTL_SECONDS,
+        )
+
+    async def invalidate(self, user_id: int) -> None:
+        await self.redis.delete(_user_feed_key(user_id))
+
+    async def bump_epoch(self) -> Optional[int]:
+        """Worker: retire every cached page after shelves change."""
+        return await self.redis.incr(SHELF_EPOCH_KEY)
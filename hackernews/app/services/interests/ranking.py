@@ -0,0 +1,22 @@
+"""Shelf ranking shared by the worker (which precomputes shelves) and the feed API."""
+import math
+from datetime import datetime, timezone
+from typing import Dict, Iterable
+
+from app.db.models.interest_story import InterestStory
+
+
+def rank_interest_story(points: int | None, time_val: int | None, read_count: int | None) -> float:
+    p = points or 0
+    rc = read_count or 0
+    if time_val:
+        age_hours = max(0.0, (datetime.now(timezone.utc).timestamp() - time_val) / 3600.0)
+        recency = max(0.0, 1.0 - (age_hours / 72.0))
+    else:
+        recency = 0.0
+    return 0.6 * math.log1p(p) + 0.3 * recency - 0.1 * math.log1p(rc)
+
+
+def shelf_scores(rows: Iterable[InterestStory]) -> Dict[int, float]:
+    """Map story_hn_id -> rank score for one interest shelf."""
+    return {r.story_hn_id: rank_interest_story(r.points, r.time, r.read_count) for r in rows}
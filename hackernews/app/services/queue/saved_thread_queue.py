@@ -1,21 +1,45 @@
 from __future__ import annotations
+import hashlib
 from datetime import datetime, timezone
 from typing import Optional
 
 from app.services.cache.redis import RedisCache
+from app.services.queue.streams import StreamQueue
 
-QUEUE_KEY = "saved_thread:queue"
+QUEUE_KEY = "saved_thread:stream"
+# the LIST this queue used before it moved to a stream; drained by consumers
+LEGACY_QUEUE_KEY = "saved_thread:queue"
 
 
-async def enqueue_saved_thread(redis_cache: RedisCache, user_id: int, story_hn_id: int, comment_hn_ids: list[int]) -> Optional[int]:
+def saved_thread_queue(redis_cache: RedisCache, consumer: Optional[str] = None) -> StreamQueue:
+    return StreamQueue(redis_cache, QUEUE_KEY, consumer=consumer, legacy_list=LEGACY_QUEUE_KEY)
+
+
+def saved_thread_idempotency_key(user_id: int, story_hn_id: int, comment_hn_ids: list[int], client_key: Optional[str] = None) -> str:
+    """Key under which the worker creates the thread at most once.
+
+    A client-supplied `Idempotency-Key` wins; otherwise the same user saving the
+    same story + comment selection maps to the same key.
+    """
+    if client_key:
+        basis = f"client:{user_id}:{client_key}"
+    else:
+        basis = f"auto:{user_id}:{story_hn_id}:{','.join(str(c) for c in sorted(set(comment_hn_ids)))}"
+    return hashlib.sha256(basis.encode("utf-8")).hexdigest()
+
+
+async def enqueue_saved_thread(
+    redis_cache: RedisCache,
+    user_id: int,
+    story_hn_id: int,
+    comment_hn_ids: list[int],
+    idempotency_key: Optional[str] = None,
+) -> Optional[str]:
     payload = {
         "user_id": user_id,
         "story_hn_id": story_hn_id,
         "comment_hn_ids": comment_hn_ids,
+        "idempotency_key": idempotency_key or saved_thread_idempotency_key(user_id, story_hn_id, comment_hn_ids),
         "requested_at": datetime.now(timezone.utc).isoformat(),
     }
-    return await redis_cache.lpush(QUEUE_KEY, payload)
-
-
-async def dequeue_saved_thread(redis_cache: RedisCache) -> Optional[dict]:
-    return await redis_cache.rpop(QUEUE_KEY)
+    return await saved_thread_queue(redis_cache).publish(payload)
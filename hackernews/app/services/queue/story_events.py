@@ -0,0 +1,173 @@
+"""Per-story notifications over Redis pub/sub (fanned out to clients as SSE).
+
+Each API process holds one pattern subscription (`StoryEventHub`) for every
+story channel and hands messages to per-client in-memory queues, so open SSE
+connections don't each cost a Redis connection.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from app.services.cache.redis import RedisCache
+
+SUMMARY_READY = "summary_ready"
+COMMENTS_READY = "comments_ready"
+
+STORY_CHANNEL_PREFIX = "events:story:"
+# events a slow client may fall behind by before newer ones are dropped for it
+CLIENT_QUEUE_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+
+def story_channel(hn_id: int) -> str:
+    return f"{STORY_CHANNEL_PREFIX}{hn_id}"
+
+
+async def publish_story_event(redis_cache: RedisCache, hn_id: int, event: str, data: Optional[dict] = None) -> None:
+    await redis_cache.publish(story_channel(hn_id), {"event": event, "hn_id": hn_id, **(data or {})})
+
+
+def _decode_event(data: Any) -> Optional[dict]:
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    try:
+        event = json.loads(data)
+    except Exception:
+        return None
+    return event if isinstance(event, dict) else None
+
+
+class StoryEventHub:
+    """One PSUBSCRIBE per process, fanned out to the queues of subscribed clients."""
+
+    def __init__(self, redis_cache: RedisCache):
+        self.redis = redis_cache
+        self._queues: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running and self.redis.enabled():
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Start if needed and wait until the pattern subscription is live."""
+        self.start()
+        if not self.running:
+            return False
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def register(self, hn_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._queues[hn_id].add(queue)
+        return queue
+
+    def unregister(self, hn_id: int, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(hn_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                self._queues.pop(hn_id, None)
+
+    def subscribers(self, hn_id: int) -> int:
+        return len(self._queues.get(hn_id, ()))
+
+    def _dispatch(self, event: dict) -> None:
+        try:
+            hn_id = int(event.get("hn_id"))
+        except (TypeError, ValueError):
+            return
+        for queue in list(self._queues.get(hn_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("Dropping story %s event for a slow SSE client", hn_id)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            if pubsub is None:
+                return
+            try:
+                await pubsub.psubscribe(f"{STORY_CHANNEL_PREFIX}*")
+                self._ready.set()
+                while True:
+                    msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if msg and msg.get("type") == "pmessage":
+                        event = _decode_event(msg.get("data"))
+                        if event is not None:
+                            self._dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Story event subscription lost; retrying", exc_info=True)
+                await asyncio.sleep(1.0)
+            finally:
+                self._ready.clear()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+class StorySubscription:
+    """Async context manager yielding events for one story.
+
+    Subscribe before checking current state so nothing published in between is lost.
+    """
+
+    def __init__(self, hub: StoryEventHub, hn_id: int, ready_timeout: float = 2.0):
+        self.hub = hub
+        self.hn_id = hn_id
+        self.ready_timeout = ready_timeout
+        self._queue: Optional[asyncio.Queue] = None
+
+    @property
+    def active(self) -> bool:
+        return self._queue is not None
+
+    async def __aenter__(self) -> "StorySubscription":
+        if await self.hub.wait_ready(self.ready_timeout):
+            self._queue = self.hub.register(self.hn_id)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._queue is not None:
+            self.hub.unregister(self.hn_id, self._queue)
+            self._queue = None
+        return False
+
+    async def next_event(self, timeout: float) -> Optional[dict]:
+        """Wait up to `timeout` seconds; None means no event (send a heartbeat)."""
+        if self._queue is None:
+            return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
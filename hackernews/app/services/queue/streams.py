@@ -0,0 +1,136 @@
+"""Redis Streams job queue with consumer groups, pending-entry reclaim and a dead-letter stream.
+
+Every worker replica joins the same consumer group, so each job is delivered to
+exactly one consumer. Jobs stay in the group's pending list until acked: if a
+worker dies mid-job, another replica reclaims it with XAUTOCLAIM once it has been
+idle for `claim_idle_ms`. Jobs delivered more than `max_deliveries` times are moved
+to `{stream}:dead` instead of being retried forever.
+
+Queues that used to be Redis LISTs (LPUSH / RPOP) use new stream names, since
+XADD on a key holding a list fails with WRONGTYPE. Jobs still sitting in the old
+list (or pushed there by replicas that have not been upgraded yet) are moved onto
+the stream, oldest first, before each read.
+"""
+from __future__ import annotations
+
+import os
+import socket
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+from app.config import settings
+from app.services.cache.redis import RedisCache
+
+DEFAULT_GROUP = "workers"
+
+
+def default_consumer_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def dead_letter_stream(stream: str) -> str:
+    return f"{stream}:dead"
+
+
+@dataclass
+class StreamJob:
+    id: str
+    payload: Any
+    deliveries: int = 1
+
+
+class StreamQueue:
+    def __init__(
+        self,
+        redis_cache: RedisCache,
+        stream: str,
+        *,
+        group: str = DEFAULT_GROUP,
+        consumer: Optional[str] = None,
+        pending_set: Optional[str] = None,
+        max_deliveries: Optional[int] = None,
+        claim_idle_ms: Optional[int] = None,
+        legacy_list: Optional[str] = None,
+    ):
+        self.redis = redis_cache
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer or default_consumer_name()
+        # optional de-dup set whose members are cleared once delivered (signals)
+        self.pending_set = pending_set
+        self.max_deliveries = max_deliveries or settings.STREAM_MAX_DELIVERIES
+        self.claim_idle_ms = claim_idle_ms or settings.STREAM_CLAIM_IDLE_MS
+        self.legacy_list = legacy_list
+        self._group_ready = False
+
+    async def _ensure_group(self) -> None:
+        if not self._group_ready:
+            await self.redis.ensure_group(self.stream, self.group)
+            self._group_ready = self.redis.enabled()
+
+    async def publish(self, payload: Any) -> Optional[str]:
+        return await self.redis.xadd(self.stream, payload, maxlen=settings.STREAM_MAXLEN)
+
+    async def read(self, count: int = 1, block_ms: Optional[int] = None) -> List[StreamJob]:
+        """Reclaim stale pending jobs first, then block for new ones."""
+        if not self.redis.enabled():
+            return []
+        await self._ensure_group()
+        if self.legacy_list:
+            await self.drain_legacy_list()
+
+        jobs: List[StreamJob] = []
+        claimed = await self.redis.xautoclaim(self.stream, self.group, self.consumer, self.claim_idle_ms, count=count)
+        if claimed:
+            deliveries = await self.redis.xpending_deliveries(self.stream, self.group, [i for i, _ in claimed])
+            for entry_id, payload in claimed:
+                job = StreamJob(entry_id, payload, deliveries.get(entry_id, 1))
+                if job.deliveries > self.max_deliveries:
+                    await self.dead_letter(job, "max_deliveries_exceeded")
+                    continue
+                jobs.append(job)
+
+        if len(jobs) < count:
+            fresh = await self.redis.xreadgroup(
+                self.stream,
+                self.group,
+                self.consumer,
+                count=count - len(jobs),
+                block_ms=None if jobs else (block_ms if block_ms is not None else settings.STREAM_BLOCK_MS),
+            )
+            jobs.extend(StreamJob(entry_id, payload) for entry_id, payload in fresh)
+
+        if self.pending_set and jobs:
+            await self.redis.srem(self.pending_set, *[j.payload for j in jobs])
+        return jobs
+
+    async def drain_legacy_list(self) -> int:
+        """Move jobs left in the pre-streams list onto the stream; returns how many moved."""
+        moved = 0
+        # RPOP is atomic, so concurrent replicas never move the same job twice
+        while (payload := await self.redis.rpop(self.legacy_list)) is not None:
+            await self.publish(payload)
+            moved += 1
+        return moved
+
+    async def ack(self, job: StreamJob) -> None:
+        await self.redis.xack(self.stream, self.group, job.id)
+
+    async def dead_letter(self, job: StreamJob, reason: str) -> None:
+        """Park a poison job on the dead-letter stream and drop it from the group."""
+        await self.redis.xadd(
+            dead_letter_stream(self.stream),
+            {
+                "id": job.id,
+                "payload": job.payload,
+                "deliveries": job.deliveries,
+                "reason": reason,
+                "failed_at": datetime.now(timezone.utc).isoformat(),
+            },
+            maxlen=settings.STREAM_MAXLEN,
+        )
+        await self.ack(job)
+
+    async def length(self) -> Optional[int]:
+        return await self.redis.xlen(self.stream)
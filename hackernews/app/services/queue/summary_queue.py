@@ -1,24 +1,108 @@
 from __future__ import annotations
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
+from app.config import settings
 from app.services.cache.redis import RedisCache
+from app.services.queue.streams import StreamQueue
 
-QUEUE_KEY = "summary:queue"
+QUEUE_KEY = "summary:stream"
+# the LIST this queue used before it moved to a stream; drained by consumers
+LEGACY_QUEUE_KEY = "summary:queue"
 
+JOB_KINDS = ("story", "comment")
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
 
-async def enqueue_summary(redis_cache: RedisCache, hn_id: int, user_id: int) -> Optional[int]:
+
+def summary_queue(redis_cache: RedisCache, consumer: Optional[str] = None) -> StreamQueue:
+    return StreamQueue(redis_cache, QUEUE_KEY, consumer=consumer, legacy_list=LEGACY_QUEUE_KEY)
+
+
+def summary_job_id(kind: str, hn_id: int, model_version: str) -> str:
+    """Job handles are deterministic, so repeat requests map onto the same job."""
+    return f"{kind}:{hn_id}:{model_version}"
+
+
+def parse_summary_job_id(job_id: str) -> Optional[Tuple[str, int, str]]:
+    parts = job_id.split(":", 2)
+    if len(parts) != 3 or parts[0] not in JOB_KINDS:
+        return None
+    try:
+        return parts[0], int(parts[1]), parts[2]
+    except ValueError:
+        return None
+
+
+def async_generation_enabled(redis_cache: Optional[RedisCache]) -> bool:
+    # jobs need the stream + status keys, so fall back to inline generation without Redis
+    return settings.SUMMARY_ASYNC_GENERATION and redis_cache is not None and redis_cache.enabled()
+
+
+def _job_status_key(job_id: str) -> str:
+    return f"summary:job:{job_id}"
+
+
+async def enqueue_summary(
+    redis_cache: RedisCache,
+    hn_id: int,
+    user_id: Optional[int],
+    kind: str = "story",
+    model_version: Optional[str] = None,
+    refresh: bool = False,
+) -> Optional[str]:
+    """Publish a generation job.
+
+    `refresh` jobs update an existing summary with newly crawled comments; they
+    carry no job id, so they never touch the status a client may be polling.
+    """
+    model_version = model_version or settings.SUMMARIZATION_MODEL_VERSION
     payload = {
+        "kind": kind,
         "hn_id": hn_id,
+        "model_version": model_version,
         "user_id": user_id,
         "requested_at": datetime.now(timezone.utc).isoformat(),
     }
-    return await redis_cache.lpush(QUEUE_KEY, payload)
+    if refresh:
+        payload["refresh"] = True
+    else:
+        payload["job_id"] = summary_job_id(kind, hn_id, model_version)
+    return await summary_queue(redis_cache).publish(payload)
+
+
+async def submit_summary_job(redis_cache: RedisCache, kind: str, hn_id: int, user_id: int, model_version: str) -> Tuple[str, str]:
+    """Enqueue a generation job unless an identical one is queued or running.
+
+    Returns (job_id, status). The status key doubles as the de-dup guard: only
+    the caller that creates it (or replaces a failed one) publishes to the stream.
+    """
+    job_id = summary_job_id(kind, hn_id, model_version)
+    status = {"status": JOB_QUEUED, "requested_at": datetime.now(timezone.utc).isoformat()}
+    key = _job_status_key(job_id)
+    created = await redis_cache.set_json(key, status, ex=settings.SUMMARY_JOB_TTL_SECONDS, nx=True)
+    if not created:
+        current = await redis_cache.get_json(key) or {}
+        # a finished job whose summary is missing again is stale, so re-run it too
+        if current.get("status") not in (JOB_FAILED, JOB_DONE):
+            return job_id, current.get("status", JOB_QUEUED)
+        await redis_cache.set_json(key, status, ex=settings.SUMMARY_JOB_TTL_SECONDS)
+    await enqueue_summary(redis_cache, hn_id, user_id, kind=kind, model_version=model_version)
+    return job_id, JOB_QUEUED
+
+
+async def set_job_status(redis_cache: RedisCache, job_id: str, status: str, error: Optional[str] = None) -> None:
+    value = {"status": status, "updated_at": datetime.now(timezone.utc).isoformat()}
+    if error:
+        value["error"] = error
+    await redis_cache.set_json(_job_status_key(job_id), value, ex=settings.SUMMARY_JOB_TTL_SECONDS)
 
 
-async def dequeue_summary(redis_cache: RedisCache) -> Optional[dict]:
-    return await redis_cache.rpop(QUEUE_KEY)
+async def get_job_status(redis_cache: RedisCache, job_id: str) -> Optional[dict]:
+    return await redis_cache.get_json(_job_status_key(job_id))
 
 
 async def queue_length(redis_cache: RedisCache) -> Optional[int]:
-    return await redis_cache.llen(QUEUE_KEY)
+    return await summary_queue(redis_cache).length()
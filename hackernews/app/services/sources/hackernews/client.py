@@ -8,6 +8,33 @@ from typing import Optional, Any, Callable
 import httpx
 
 
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_hn_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> "AsyncHNClient":
+    """Build a client configured from settings (shared per process).
+
+    `transport` replaces the network transport of the pooled client (tests).
+    """
+    from app.config import settings
+
+    return AsyncHNClient(
+        base_url=str(settings.HN_API_URL),
+        rate_limit_per_sec=settings.HN_RATE_LIMIT_PER_SEC,
+        max_concurrency=settings.HN_MAX_CONCURRENCY,
+        http2=settings.HN_HTTP2,
+        max_connections=settings.HN_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HN_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HN_KEEPALIVE_EXPIRY_SECONDS,
+        transport=transport,
+    )
+
+
 class AsyncHNClient:
     """Thin async HTTP client for Hacker News.
 
@@ -16,6 +43,10 @@ class AsyncHNClient:
     - Semaphore for concurrency limiting
     - Exponential backoff retries for network/5xx errors
     - Accepts an injected `httpx.AsyncClient` for testing
+    - Pooled keep-alive connections, HTTP/2 when the `h2` package is installed
+
+    The API process shares one instance (`app.state.hn_client`) so the connection
+    pool and token bucket are per-process rather than per-request.
     """
 
     def __init__(
@@ -27,6 +58,11 @@ class AsyncHNClient:
         max_retries: int = 3,
         backoff_factor: float = 0.5,
         client: Optional[httpx.AsyncClient] = None,
+        http2: bool = False,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self._rate = float(rate_limit_per_sec)
@@ -41,15 +77,30 @@ class AsyncHNClient:
         self._client = client
         self._own_client = False
         self._timeout = timeout
+        self._transport = transport
+        self._http2 = http2 and _h2_available()
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
 
     async def init(self):
         if self._client is None:
-            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self._timeout)
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self._timeout,
+                limits=self._limits,
+                http2=self._http2,
+                transport=self._transport,
+            )
             self._own_client = True
 
     async def close(self):
         if self._own_client and self._client is not None:
             await self._client.aclose()
+            self._client = None
+            self._own_client = False
 
     async def _acquire_token(self):
         # token-bucket algorithm
@@ -0,0 +1,125 @@
+"""Parallel, prioritised comment-tree crawler on top of AsyncHNClient."""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Iterable, Optional
+
+from app.services.sources.hackernews.client import AsyncHNClient
+
+logger = logging.getLogger(__name__)
+
+Persister = Callable[[list[dict]], Awaitable[Any]]
+
+
+@dataclass
+class CrawlStats:
+    fetched: int = 0
+    persisted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    max_depth: int = 0
+
+
+def _is_live_comment(raw: Any) -> bool:
+    return isinstance(raw, dict) and raw.get("type") == "comment" and not raw.get("dead") and not raw.get("deleted")
+
+
+class CommentTreeCrawler:
+    """Crawl a story's comment tree with a fixed pool of fetch workers.
+
+    - A priority queue orders pending ids by (depth, -parent reply count, discovery
+      order): top-level comments first, then children of the busiest branches.
+    - `workers` coroutines pull from the queue continuously, so the client's
+      concurrency limit stays saturated instead of waiting on fixed batches.
+    - At most `budget` items are fetched; lower-priority leftovers are dropped.
+    - Parsed comments are buffered in a deque and handed to `persist` in batches
+      of `flush_size` while the crawl is still running.
+    """
+
+    def __init__(
+        self,
+        client: AsyncHNClient,
+        persist: Persister,
+        *,
+        budget: int = 500,
+        workers: int = 5,
+        flush_size: int = 50,
+        max_depth: Optional[int] = None,
+    ) -> None:
+        self.client = client
+        self.persist = persist
+        self.budget = budget
+        self.workers = max(1, workers)
+        self.flush_size = max(1, flush_size)
+        self.max_depth = max_depth
+
+    async def crawl(self, root_kids: Iterable[int]) -> CrawlStats:
+        stats = CrawlStats()
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        seq = itertools.count()
+        seen: set[int] = set()
+        buffer: Deque[dict] = deque()
+        flush_lock = asyncio.Lock()
+        started = 0
+
+        def schedule(ids: Iterable[int], depth: int, parent_replies: int) -> None:
+            if self.max_depth is not None and depth > self.max_depth:
+                return
+            for item_id in ids:
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+                queue.put_nowait((depth, -parent_replies, next(seq), item_id))
+
+        async def flush(force: bool = False) -> None:
+            async with flush_lock:
+                while buffer and (force or len(buffer) >= self.flush_size):
+                    batch = [buffer.popleft() for _ in range(min(self.flush_size, len(buffer)))]
+                    try:
+                        await self.persist(batch)
+                        stats.persisted += len(batch)
+                    except Exception:
+                        logger.exception("Failed persisting %d crawled comments", len(batch))
+
+        async def worker() -> None:
+            nonlocal started
+            while True:
+                depth, _prio, _seq, item_id = await queue.get()
+                try:
+                    if started >= self.budget:
+                        continue
+                    started += 1
+                    try:
+                        raw = await self.client.fetch_item(item_id)
+                    except Exception:
+                        stats.failed += 1
+                        continue
+                    stats.fetched += 1
+                    if not _is_live_comment(raw):
+                        stats.skipped += 1
+                        continue
+
+                    stats.max_depth = max(stats.max_depth, depth)
+                    kids = raw.get("kids")
+                    if kids and isinstance(kids, list):
+                        schedule(kids, depth + 1, len(kids))
+                    buffer.append(raw)
+                    if len(buffer) >= self.flush_size:
+                        await flush()
+                finally:
+                    queue.task_done()
+
+        schedule(list(root_kids or []), 0, 0)
+        tasks = [asyncio.create_task(worker()) for _ in range(self.workers)]
+        try:
+            await queue.join()
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await flush(force=True)
+        return stats
@@ -7,7 +7,7 @@ from app.services.sources.hackernews.fetcher import HNFetcher, StoryData
 from app.repositories.story_repo import StoryRepository
 from app.repositories.top_story_repo import TopStoryRepository
 from app.services.cache.feed_cache import FeedCache
-from app.db.session import get_session
+from app.db.session import get_session, run_db
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +28,7 @@ async def run_fetch_once(
     """Run a single top-stories refresh cycle:
     - fetch top ids
     - fetch and normalize story payloads (concurrently)
-    - upsert into DB
+    - upsert into DB (one batched statement set)
     - replace top_stories list
     - prime top-stories cache
 
@@ -57,60 +57,62 @@ async def run_fetch_once(
 
     # persist synchronously using session context manager
     with get_session(SessionLocal) as session:
-        for sd in results:
+        try:
+            upserted = await run_db(repo.upsert_many, session, [sd for sd in results if sd is not None])
+        except Exception:
+            logger.exception("Failed to upsert %d stories", len(results))
+            await run_db(session.rollback)
+            upserted = []
+
+        for story, created, was_updated in upserted:
+            if created:
+                inserted += 1
+            if was_updated:
+                updated += 1
+
+            # schedule summarization if enabled and provider/repo/cache supplied
             try:
-                story, created, was_updated = repo.upsert(session, sd)
-                if created:
-                    inserted += 1
-                if was_updated:
-                    updated += 1
-
-                # schedule summarization if enabled and provider/repo/cache supplied
-                try:
-                    if (created or was_updated) and settings.ENABLE_SUMMARIZATION and provider and summary_repo and summary_cache:
-                        mv = model_version or settings.SUMMARIZATION_MODEL_VERSION
-
-                        # background task: create its own session and call the hook
-                        async def _background_summary(sd_local: StoryData, mv_local: str):
-                            try:
-                                from app.db.session import get_session as _get_session
-
-                                # open independent session for background work
-                                with _get_session(SessionLocal) as bg_session:
-                                    # create a minimal story_row object expected by the hook
-                                    class StoryRow:
-                                        def __init__(self, sd):
-                                            self.hn_id = sd.hn_id
-                                            self.raw_payload = sd.raw_payload
-
-                                    story_row = StoryRow(sd_local)
-                                    res = await run_summary_for_story_if_enabled(bg_session, story_row, provider, summary_repo, summary_cache, mv_local)
-
-                                    if res is None:
-                                        logger.info("summary_skipped", extra={"hn_id": sd_local.hn_id, "model_version": mv_local})
+                if (created or was_updated) and settings.ENABLE_SUMMARIZATION and provider and summary_repo and summary_cache:
+                    mv = model_version or settings.SUMMARIZATION_MODEL_VERSION
+
+                    # background task: create its own session and call the hook
+                    async def _background_summary(hn_id: int, raw_payload: dict | None, mv_local: str):
+                        try:
+                            from app.db.session import get_session as _get_session
+
+                            # open independent session for background work
+                            with _get_session(SessionLocal) as bg_session:
+                                # create a minimal story_row object expected by the hook
+                                class StoryRow:
+                                    def __init__(self, hn_id, raw_payload):
+                                        self.hn_id = hn_id
+                                        self.raw_payload = raw_payload
+
+                                story_row = StoryRow(hn_id, raw_payload)
+                                res = await run_summary_for_story_if_enabled(bg_session, story_row, provider, summary_repo, summary_cache, mv_local)
+
+                                if res is None:
+                                    logger.info("summary_skipped", extra={"hn_id": hn_id, "model_version": mv_local})
+                                else:
+                                    _, created_s, updated_s = res
+                                    if created_s:
+                                        logger.info("summary_created", extra={"hn_id": hn_id, "model_version": mv_local})
+                                    elif updated_s:
+                                        logger.info("summary_updated", extra={"hn_id": hn_id, "model_version": mv_local})
                                     else:
-                                        _, created_s, updated_s = res
-                                        if created_s:
-                                            logger.info("summary_created", extra={"hn_id": sd_local.hn_id, "model_version": mv_local})
-                                        elif updated_s:
-                                            logger.info("summary_updated", extra={"hn_id": sd_local.hn_id, "model_version": mv_local})
-                                        else:
-                                            logger.info("summary_skipped", extra={"hn_id": sd_local.hn_id, "model_version": mv_local})
-                            except Exception:
-                                logger.exception("summary_failed", exc_info=True, extra={"hn_id": getattr(sd, "hn_id", None)})
-
-                        # schedule background execution and don't await
-                        asyncio.create_task(_background_summary(sd, mv))
-                except Exception:
-                    # ensure summarization errors don't block persistence loop
-                    logger.exception("Error scheduling summarization for %s", getattr(sd, "hn_id", None))
+                                        logger.info("summary_skipped", extra={"hn_id": hn_id, "model_version": mv_local})
+                        except Exception:
+                            logger.exception("summary_failed", exc_info=True, extra={"hn_id": hn_id})
 
+                    # schedule background execution and don't await
+                    asyncio.create_task(_background_summary(story.hn_id, story.raw_payload, mv))
             except Exception:
-                logger.exception("Failed to upsert story %s", getattr(sd, "hn_id", None))
+                # ensure summarization errors don't block persistence loop
+                logger.exception("Error scheduling summarization for %s", story.hn_id)
 
         # replace top stories list
         if top_story_repo is not None:
-            top_story_repo.replace_top_stories(session, top_ids)
+            await run_db(top_story_repo.replace_top_stories, session, top_ids)
 
         # prime the cache after DB upserts
         await feed_cache.prime_feed(session, limit=limit)
@@ -124,6 +126,7 @@ from app.config import settings
 from app.services.ai.base import AIProvider
 from app.repositories.summary_repo import SummaryRepository
 from app.services.cache.summary_cache import SummaryCache
+from app.schemas.summary import summary_payload
 
 
 async def run_summary_for_story_if_enabled(session, story_row, provider: AIProvider, summary_repo: SummaryRepository, summary_cache: SummaryCache, model_version: str, model_name: str | None = None):
@@ -139,18 +142,10 @@ async def run_summary_for_story_if_enabled(session, story_row, provider: AIProvi
     summary = await provider.summarize_story(story_row.raw_payload or {"id": story_row.hn_id})
 
     # Upsert into DB
-    row, created, updated = summary_repo.upsert_summary(session, story_row.hn_id, summary, model_version, model_name)
+    row, created, updated = await run_db(summary_repo.upsert_summary, session, story_row.hn_id, summary, model_version, model_name)
 
     # Populate cache
-    payload = {
-        "tldr": row.tldr,
-        "key_points": row.key_points,
-        "consensus": row.consensus,
-        "model_version": row.model_version,
-        "model_name": row.model_name,
-        "created_at": row.created_at.isoformat() if row.created_at else None,
-        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
-    }
+    payload = summary_payload(row)
     await summary_cache.set(story_row.hn_id, model_version, payload)
 
     return row, created, updated
@@ -0,0 +1,157 @@
+"""Concurrent job scheduler for the background worker.
+
+Each job family (top stories, interest refresh, signals, queues, cleanup) runs as
+its own long-lived asyncio task group with its own concurrency and cadence, so a
+slow comment crawl never delays summary jobs. Per-family metrics are kept in
+memory, logged periodically and published to Redis for the admin endpoint.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.services.cache.redis import RedisCache
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "worker:metrics"
+
+
+@dataclass
+class JobFamily:
+    """A unit of background work.
+
+    `run` performs one tick and returns how many items it handled; a falsy result
+    means the family is idle and its runners sleep `interval` seconds before the
+    next tick. Periodic jobs return 0 so they run once per `interval`; queue
+    consumers return the number of jobs drained so they keep going while busy.
+    """
+
+    name: str
+    run: Callable[[], Awaitable[Optional[int]]]
+    interval: float
+    concurrency: int = 1
+    error_backoff: float = 5.0
+
+
+@dataclass
+class FamilyMetrics:
+    runs: int = 0
+    items: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    last_duration_ms: Optional[float] = None
+    last_run_at: Optional[float] = None
+    last_error: Optional[str] = None
+    in_flight: int = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "runs": self.runs,
+            "items": self.items,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "last_duration_ms": self.last_duration_ms,
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error,
+            "in_flight": self.in_flight,
+        }
+
+
+@dataclass
+class Scheduler:
+    families: List[JobFamily]
+    redis_cache: Optional[RedisCache] = None
+    metrics_interval: float = 60.0
+    metrics: Dict[str, FamilyMetrics] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for fam in self.families:
+            self.metrics.setdefault(fam.name, FamilyMetrics())
+
+    async def _tick(self, fam: JobFamily) -> Optional[int]:
+        m = self.metrics[fam.name]
+        m.in_flight += 1
+        started = time.perf_counter()
+        completed = False
+        try:
+            handled = await fam.run()
+            completed = True
+            m.items += int(handled or 0)
+            return handled
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            completed = True
+            m.errors += 1
+            m.last_error = repr(exc)
+            raise
+        finally:
+            m.in_flight -= 1
+            # ticks interrupted by shutdown are not counted as runs
+            if completed:
+                elapsed = time.perf_counter() - started
+                m.runs += 1
+                m.busy_seconds += elapsed
+                m.last_duration_ms = round(elapsed * 1000, 2)
+                m.last_run_at = time.time()
+
+    async def _runner(self, fam: JobFamily, slot: int) -> None:
+        while True:
+            try:
+                handled = await self._tick(fam)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job family %s (slot %d) failed", fam.name, slot)
+                await asyncio.sleep(fam.error_backoff)
+                continue
+            if not handled:
+                await asyncio.sleep(fam.interval)
+
+    def snapshot(self) -> dict:
+        return {name: m.snapshot() for name, m in self.metrics.items()}
+
+    async def publish_metrics(self) -> None:
+        snap = self.snapshot()
+        for name, data in snap.items():
+            logger.info(
+                "worker_metrics family=%s runs=%d items=%d errors=%d busy_s=%.2f last_ms=%s",
+                name,
+                data["runs"],
+                data["items"],
+                data["errors"],
+                data["busy_seconds"],
+                data["last_duration_ms"],
+            )
+        if self.redis_cache is not None:
+            await self.redis_cache.set_json(METRICS_KEY, {"updated_at": time.time(), "families": snap})
+
+    async def _metrics_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            try:
+                await self.publish_metrics()
+            except Exception:
+                logger.exception("Failed publishing worker metrics")
+
+    async def run(self) -> None:
+        """Run every family until cancelled; cancellation tears down all runners."""
+        tasks: List[asyncio.Task] = []
+        for fam in self.families:
+            for slot in range(max(1, fam.concurrency)):
+                tasks.append(asyncio.create_task(self._runner(fam, slot), name=f"{fam.name}:{slot}"))
+        tasks.append(asyncio.create_task(self._metrics_loop(), name="metrics"))
+        logger.info(
+            "Scheduler started: %s",
+            ", ".join(f"{f.name}x{max(1, f.concurrency)}@{f.interval}s" for f in self.families),
+        )
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
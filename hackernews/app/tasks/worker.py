@@ -1,32 +1,55 @@
-"""Simple loop-based worker for MVP.
+"""Background worker.
 
-This worker initializes resources (DB engine/session, Redis), creates a fetcher and repository
-and runs a periodic fetch cycle that persists data and primes the cache.
+This worker initializes resources (DB engine/session, Redis), creates a fetcher and repositories
+and hands every job family to the concurrent scheduler in app.tasks.scheduler.
 
 Graceful shutdown is handled via cancellation and signal handlers.
 """
 import asyncio
 import logging
 import signal
-import math
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 from typing import Optional
 import sys
 from app.config import settings
-from app.db.session import get_engine, init_sessionmaker, get_session
-from app.services.cache.redis import RedisCache
+from app.db.session import get_engine, init_sessionmaker, get_session, run_db, shutdown_db_executor
+from app.services.cache.redis import (
+    RedisCache,
+    INTEREST_SIGNAL_STREAM,
+    INTEREST_SIGNAL_PENDING,
+    COMMENT_SIGNAL_STREAM,
+    COMMENT_SIGNAL_PENDING,
+    INTEREST_SIGNAL_LEGACY_LIST,
+    COMMENT_SIGNAL_LEGACY_LIST,
+)
 from app.repositories.story_repo import StoryRepository
 from app.repositories.top_story_repo import TopStoryRepository
 from app.services.cache.feed_cache import FeedCache
-from app.services.sources.hackernews.client import AsyncHNClient
-from app.services.sources.hackernews.fetcher import HNFetcher
+from app.services.cache.user_feed_cache import UserFeedCache
+from app.services.sources.hackernews.client import AsyncHNClient, create_hn_client
+from app.services.sources.hackernews.comment_crawler import CommentTreeCrawler
+from app.services.sources.hackernews.fetcher import HNFetcher, StoryData
 from app.tasks.fetch_jobs import run_fetch_once
+from app.tasks.scheduler import JobFamily, Scheduler
 from app.repositories.summary_repo import SummaryRepository
 from app.services.cache.summary_cache import SummaryCache
-from app.services.ai.factory import get_ai_provider
-from app.services.queue.summary_queue import dequeue_summary
+from app.schemas.summary import summary_payload
+from app.services.cache.single_flight import SingleFlight, summary_flight_key
+from app.services.queue.story_events import publish_story_event, COMMENTS_READY
+from app.services.ai.factory import close_ai_provider, get_ai_provider
+from app.services.ai.schemas import SummaryData
+from app.services.ai.pipeline import discussion_summarizer, summarize_story_with_discussion
+from app.services.queue.summary_queue import (
+    summary_queue as summary_stream,
+    enqueue_summary,
+    set_job_status,
+    JOB_RUNNING,
+    JOB_DONE,
+    JOB_FAILED,
+)
+from app.services.queue.streams import StreamQueue, default_consumer_name
 from app.repositories.comment_repo import CommentRepository
-from app.services.queue.saved_thread_queue import dequeue_saved_thread
+from app.services.queue.saved_thread_queue import saved_thread_queue as saved_thread_stream
 from app.repositories.saved_thread_repo import SavedThreadRepository
 from app.db.models.comment import Comment
 from app.db.models.story import Story
@@ -40,6 +63,7 @@ from app.services.cache.comment_summary_cache import CommentSummaryCache
 from app.repositories.interest_repo import InterestRepository
 from app.services.sources.hackernews.search_client import HNSearchClient
 from app.services.interests.catalog import INTEREST_GROUPS
+from app.services.interests.ranking import rank_interest_story, shelf_scores
 from app.repositories.search_query_repo import SearchQueryRepository
 from sqlalchemy import or_
 
@@ -47,18 +71,11 @@ from sqlalchemy import or_
 logger = logging.getLogger(__name__)
 
 
-def _rank_interest(points: int | None, time_val: int | None, read_count: int | None) -> float:
-    p = points or 0
-    rc = read_count or 0
-    if time_val:
-        age_hours = max(0.0, (datetime.now(timezone.utc).timestamp() - time_val) / 3600.0)
-        recency = max(0.0, 1.0 - (age_hours / 72.0))
-    else:
-        recency = 0.0
-    return 0.6 * math.log1p(p) + 0.3 * recency - 0.1 * math.log1p(rc)
+async def _cleanup_stories(SessionLocal):
+    await run_db(_cleanup_stories_sync, SessionLocal)
 
 
-async def _cleanup_stories(SessionLocal):
+def _cleanup_stories_sync(SessionLocal):
     retention_days = settings.CLEANUP_RETENTION_DAYS
     cutoff = datetime.utcnow() - timedelta(days=retention_days)
     search_repo = SearchQueryRepository()
@@ -93,44 +110,152 @@ async def _cleanup_stories(SessionLocal):
             logger.info("cleanup_deleted_stories=%d", deleted)
 
 
-async def _process_summary_queue(SessionLocal, redis_cache: RedisCache, story_repo: StoryRepository):
+async def _summarize_queued_story(SessionLocal, story_repo: StoryRepository, summary_repo: SummaryRepository, summary_cache: SummaryCache, provider, model_version: str, model_name: str, job) -> bool:
+    """Handle one story job; False when the story it names does not exist."""
+    hn_id = job.get("hn_id") if isinstance(job, dict) else None
+    if hn_id is None:
+        return False
+
+    with get_session(SessionLocal) as session:
+        story = await run_db(story_repo.get_by_hn_id, session, int(hn_id))
+        if story is None:
+            return False
+
+        existing = await run_db(summary_repo.fetch_latest, session, story.hn_id, model_version)
+        if existing is not None:
+            if job.get("refresh"):
+                await _refresh_story_summary(session, story, existing, summary_repo, summary_cache, provider, model_version, model_name)
+            return True
+        if job.get("refresh"):
+            # refreshes only maintain summaries someone already asked for
+            return True
+
+        # Shares the API's flight key, so a user-triggered generation isn't repeated here
+        async def _check():
+            return await run_db(summary_repo.fetch_latest, session, story.hn_id, model_version)
+
+        async def _produce():
+            comments = await run_db(CommentRepository().fetch_uncovered_for_story, session, story.hn_id, (), settings.DISCUSSION_MAX_COMMENTS)
+            result = await summarize_story_with_discussion(provider, story.raw_payload or {"id": story.hn_id, "title": story.title}, comments)
+            saved, _created, _updated = await run_db(
+                summary_repo.upsert_summary, session, story.hn_id, result.summary, model_version, model_name, result.comment_ids
+            )
+            return saved
+
+        row = await SingleFlight(summary_cache.redis).run(summary_flight_key("story", story.hn_id, model_version), _check, _produce)
+
+        payload = summary_payload(row)
+        await summary_cache.set(story.hn_id, model_version, payload)
+    return True
+
+
+async def _refresh_story_summary(session, story, existing, summary_repo: SummaryRepository, summary_cache: SummaryCache, provider, model_version: str, model_name: str) -> None:
+    """Fold comments that arrived since `existing` was written into it (delta re-summarization)."""
+    covered = set(existing.comment_ids or [])
+    new_comments = await run_db(CommentRepository().fetch_uncovered_for_story, session, story.hn_id, covered, settings.DISCUSSION_MAX_COMMENTS)
+    if len(new_comments) < settings.SUMMARY_DELTA_MIN_NEW_COMMENTS:
+        return
+    new_ids = {c.comment_hn_id for c in new_comments}
+
+    async def _check():
+        row = await run_db(summary_repo.fetch_latest, session, story.hn_id, model_version)
+        # another worker already folded these comments in
+        return row if row is not None and new_ids <= set(row.comment_ids or []) else None
+
+    async def _produce():
+        # re-read under the lock: a concurrent refresh may have moved the baseline
+        current = await run_db(summary_repo.fetch_latest, session, story.hn_id, model_version) or existing
+        current_ids = set(current.comment_ids or [])
+        delta = [c for c in new_comments if c.comment_hn_id not in current_ids]
+        previous = SummaryData(tldr=current.tldr or "", key_points=current.key_points or [], consensus=current.consensus or "unclear")
+        result = await discussion_summarizer(provider).update(previous, story.raw_payload or {"id": story.hn_id, "title": story.title}, delta)
+        saved, _created, _updated = await run_db(
+            summary_repo.upsert_summary, session, story.hn_id, result.summary, model_version, model_name, sorted(current_ids | new_ids)
+        )
+        logger.info(
+            "Summary delta for story %d: +%d comments in %d calls (%d chunks)",
+            story.hn_id,
+            len(delta),
+            result.llm_calls,
+            result.chunks,
+        )
+        return saved
+
+    row = await SingleFlight(summary_cache.redis).run(summary_flight_key("story", story.hn_id, model_version), _check, _produce)
+    await summary_cache.set(
+        story.hn_id,
+        model_version,
+        summary_payload(row),
+    )
+
+
+async def _summarize_queued_comment(SessionLocal, comment_repo: CommentRepository, summary_repo: CommentSummaryRepository, summary_cache: CommentSummaryCache, provider, model_version: str, model_name: str, job) -> bool:
+    """Handle one comment job; False when the comment it names does not exist."""
+    hn_id = job.get("hn_id") if isinstance(job, dict) else None
+    if hn_id is None:
+        return False
+
+    with get_session(SessionLocal) as session:
+        comment = await run_db(comment_repo.get_by_hn_id, session, int(hn_id))
+        if comment is None:
+            return False
+
+        async def _check():
+            return await run_db(summary_repo.fetch_latest, session, comment.comment_hn_id, model_version)
+
+        async def _produce():
+            summary = await provider.summarize_story(comment.raw_payload or {"id": comment.comment_hn_id, "text": comment.text})
+            saved, _created, _updated = await run_db(summary_repo.upsert, session, comment.comment_hn_id, summary, model_version, model_name)
+            return saved
+
+        row = await SingleFlight(summary_cache.redis).run(summary_flight_key("comment", comment.comment_hn_id, model_version), _check, _produce)
+
+        payload = summary_payload(row)
+        await summary_cache.set(comment.comment_hn_id, model_version, payload)
+    return True
+
+
+async def _process_summary_queue(SessionLocal, redis_cache: RedisCache, story_repo: StoryRepository, queue: StreamQueue) -> int:
     summary_repo = SummaryRepository()
     summary_cache = SummaryCache(redis_cache, summary_repo)
-    provider = get_ai_provider()
-    model_version = settings.SUMMARIZATION_MODEL_VERSION
+    comment_repo = CommentRepository()
+    comment_summary_repo = CommentSummaryRepository()
+    comment_summary_cache = CommentSummaryCache(redis_cache, comment_summary_repo)
+    provider = get_ai_provider(redis_cache)
     model_name = settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else "mock"
 
+    handled = 0
     for _ in range(settings.SUMMARY_QUEUE_MAX_PER_TICK):
-        job = await dequeue_summary(redis_cache)
-        if not job:
+        jobs = await queue.read(count=1)
+        if not jobs:
             break
-
-        hn_id = job.get("hn_id") if isinstance(job, dict) else None
-        if hn_id is None:
+        job = jobs[0]
+        payload = job.payload if isinstance(job.payload, dict) else {}
+        model_version = payload.get("model_version") or settings.SUMMARIZATION_MODEL_VERSION
+        job_id = payload.get("job_id")
+        try:
+            if job_id:
+                await set_job_status(redis_cache, job_id, JOB_RUNNING)
+            kind = "comment" if payload.get("kind") == "comment" else "story"
+            if kind == "comment":
+                found = await _summarize_queued_comment(SessionLocal, comment_repo, comment_summary_repo, comment_summary_cache, provider, model_version, model_name, payload)
+            else:
+                found = await _summarize_queued_story(SessionLocal, story_repo, summary_repo, summary_cache, provider, model_version, model_name, payload)
+        except Exception as exc:
+            # left pending: another consumer reclaims it, then it is dead-lettered
+            logger.exception("Summary job %s failed (delivery %d)", job.id, job.deliveries)
+            if job_id:
+                await set_job_status(redis_cache, job_id, JOB_FAILED, error=str(exc) or exc.__class__.__name__)
             continue
-
-        with get_session(SessionLocal) as session:
-            story = story_repo.get_by_hn_id(session, int(hn_id))
-            if story is None:
-                continue
-
-            existing = summary_repo.fetch_latest(session, story.hn_id, model_version)
-            if existing is not None:
-                continue
-
-            summary = await provider.summarize_story(story.raw_payload or {"id": story.hn_id, "title": story.title})
-            row, _created, _updated = summary_repo.upsert_summary(session, story.hn_id, summary, model_version, model_name)
-
-            payload = {
-                "tldr": row.tldr,
-                "key_points": row.key_points,
-                "consensus": row.consensus,
-                "model_version": row.model_version,
-                "model_name": row.model_name,
-                "created_at": row.created_at.isoformat() if row.created_at else None,
-                "updated_at": row.updated_at.isoformat() if row.updated_at else None,
-            }
-            await summary_cache.set(story.hn_id, model_version, payload)
+        if job_id:
+            # a missing story/comment won't appear on retry, so fail the job for good
+            if found:
+                await set_job_status(redis_cache, job_id, JOB_DONE)
+            else:
+                await set_job_status(redis_cache, job_id, JOB_FAILED, error=f"{kind} not found")
+        await queue.ack(job)
+        handled += 1
+    return handled
 
 
 async def _ingest_comments(SessionLocal, client: AsyncHNClient, story_repo: StoryRepository):
@@ -138,11 +263,11 @@ async def _ingest_comments(SessionLocal, client: AsyncHNClient, story_repo: Stor
     limit = settings.COMMENTS_FETCH_LIMIT
 
     with get_session(SessionLocal) as session:
-        story_ids = story_repo.fetch_latest_ids(session, limit=settings.FEED_LIMIT)
+        story_ids = await run_db(story_repo.fetch_latest_ids, session, limit=settings.FEED_LIMIT)
 
     for hn_id in story_ids:
         with get_session(SessionLocal) as session:
-            story = story_repo.get_by_hn_id(session, hn_id)
+            story = await run_db(story_repo.get_by_hn_id, session, hn_id)
             if story is None or not story.raw_payload:
                 continue
             kids = story.raw_payload.get("kids") or []
@@ -159,27 +284,73 @@ async def _ingest_comments(SessionLocal, client: AsyncHNClient, story_repo: Stor
             continue
 
         # persist comments
+        raws = [
+            raw
+            for raw in results
+            if isinstance(raw, dict) and raw.get("type") == "comment" and not raw.get("dead") and not raw.get("deleted")
+        ]
         with get_session(SessionLocal) as session:
-            for raw in results:
-                if not isinstance(raw, dict):
-                    continue
-                if raw.get("type") != "comment":
-                    continue
-                if raw.get("dead") or raw.get("deleted"):
-                    continue
-                try:
-                    comment_repo.upsert(session, hn_id, raw)
-                except Exception:
-                    logger.exception("Failed upserting comment %s", raw.get("id"))
+            try:
+                await run_db(comment_repo.upsert_many, session, hn_id, raws)
+            except Exception:
+                logger.exception("Failed upserting %d comments for story %s", len(raws), hn_id)
+
+def _seed_interests(session, interest_repo: InterestRepository):
+    for group in INTEREST_GROUPS:
+        for item in group["items"]:
+            interest_repo.upsert_interest(session, group["group"], item["name"], item["keywords"])
+    return interest_repo.list_interests(session)
+
+
+def _hits_to_story_data(hits: list[dict]) -> list[StoryData]:
+    """Build minimal StoryData rows from HN search hits, skipping malformed ones."""
+    stories: list[StoryData] = []
+    for h in hits:
+        try:
+            hn_id = int(h.get("objectID"))
+        except Exception:
+            continue
+        title = h.get("title")
+        url = h.get("url")
+        points = h.get("points")
+        time_val = h.get("created_at_i")
+        raw_payload = {"id": hn_id, "title": title, "url": url, "score": points, "time": time_val}
+        stories.append(
+            StoryData(
+                hn_id=hn_id,
+                title=title,
+                url=url,
+                score=points,
+                time=time_val,
+                descendants=None,
+                raw_payload=raw_payload,
+            )
+        )
+    return stories
+
+
+def _persist_interest_hits(session, interest_id: int, hits: list[dict], interest_repo: InterestRepository, story_repo: StoryRepository) -> dict[int, float]:
+    stories = _hits_to_story_data(hits)
+    story_repo.upsert_many(session, stories)
+    for sd in stories:
+        interest_repo.upsert_interest_story(session, interest_id, sd.hn_id, sd.score, sd.time)
+
+    # prune to top N by rank
+    rows = interest_repo.list_interest_stories(session, interest_id)
+    ranked = sorted(rows, key=lambda r: rank_interest_story(r.points, r.time, r.read_count), reverse=True)
+    kept = ranked[: settings.INTEREST_STORY_LIMIT]
+    top_ids = [r.story_hn_id for r in kept]
+    if top_ids:
+        interest_repo.delete_interest_story_not_in(session, interest_id, top_ids)
+    return shelf_scores(kept)
 
-async def _refresh_interest_stories(SessionLocal, search_client: HNSearchClient, interest_repo: InterestRepository, story_repo: StoryRepository):
+
+async def _refresh_interest_stories(SessionLocal, redis_cache: RedisCache, search_client: HNSearchClient, interest_repo: InterestRepository, story_repo: StoryRepository):
     # ensure interests seeded
     with get_session(SessionLocal) as session:
-        for group in INTEREST_GROUPS:
-            for item in group["items"]:
-                interest_repo.upsert_interest(session, group["group"], item["name"], item["keywords"])
-        interests = interest_repo.list_interests(session)
+        interests = await run_db(_seed_interests, session, interest_repo)
 
+    latest: dict[int, int] = {}
     for interest in interests:
         # query by keywords (space-separated)
         keywords = interest.keywords or []
@@ -192,329 +363,423 @@ async def _refresh_interest_stories(SessionLocal, search_client: HNSearchClient,
             logger.exception("Interest search failed: %s", interest.name)
             continue
 
-        keep_ids: list[int] = []
         with get_session(SessionLocal) as session:
-            for h in hits:
-                try:
-                    hn_id = int(h.get("objectID"))
-                except Exception:
-                    continue
-                title = h.get("title")
-                url = h.get("url")
-                points = h.get("points")
-                time_val = h.get("created_at_i")
-
-                # upsert minimal story
-                raw_payload = {"id": hn_id, "title": title, "url": url, "score": points, "time": time_val}
-                from app.services.sources.hackernews.fetcher import StoryData
-
-                sd = StoryData(
-                    hn_id=hn_id,
-                    title=title,
-                    url=url,
-                    score=points,
-                    time=time_val,
-                    descendants=None,
-                    raw_payload=raw_payload,
-                )
-                story_repo.upsert(session, sd)
-
-                interest_repo.upsert_interest_story(session, interest.id, hn_id, points, time_val)
-                keep_ids.append(hn_id)
-
-            # prune to top N by rank
-            rows = interest_repo.list_interest_stories(session, interest.id)
-            ranked = sorted(rows, key=lambda r: _rank_interest(r.points, r.time, r.read_count), reverse=True)
-            top_ids = [r.story_hn_id for r in ranked[: settings.INTEREST_STORY_LIMIT]]
-            if top_ids:
-                interest_repo.delete_interest_story_not_in(session, interest.id, top_ids)
-
-async def _process_saved_thread_queue(SessionLocal, redis_cache: RedisCache, story_repo: StoryRepository, comment_repo: CommentRepository, fetcher: HNFetcher, client: AsyncHNClient):
-    provider = get_ai_provider()
-    model_version = settings.SUMMARIZATION_MODEL_VERSION
-    model_name = settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else "mock"
-    repo = SavedThreadRepository()
-    comment_summary_repo = CommentSummaryRepository()
-    comment_summary_cache = CommentSummaryCache(redis_cache, comment_summary_repo)
+            scores = await run_db(_persist_interest_hits, session, interest.id, hits, interest_repo, story_repo)
+        await redis_cache.set_interest_shelf(interest.id, scores, ex=settings.INTEREST_SHELF_TTL_SECONDS)
+        latest[interest.id] = max([0] + [h.get("created_at_i") or 0 for h in hits])
+
+    # a full refresh also advances the watermarks pressure signals search from (one HMGET + one HSET)
+    if latest:
+        current = await redis_cache.get_interest_watermarks(list(latest))
+        advanced = {iid: ts for iid, ts in latest.items() if ts > current.get(iid, 0)}
+        await redis_cache.set_interest_watermarks(advanced)
+
+    # shelves changed -> retire every cached user feed page
+    await UserFeedCache(redis_cache).bump_epoch()
+
+def _persist_signal_hits(session, interest_id: int, hits: list[dict], interest_repo: InterestRepository, story_repo: StoryRepository) -> tuple[int, dict[int, float]]:
+    stories = _hits_to_story_data(hits)
+    story_repo.upsert_many(session, stories)
+    inserted = 0
+    for sd in stories:
+        try:
+            interest_repo.upsert_interest_story(session, interest_id, sd.hn_id, sd.score, sd.time or 0)
+            inserted += 1
+        except Exception:
+            logger.exception(
+                "Failed upserting interest story interest_id=%s hn_id=%s",
+                interest_id,
+                sd.hn_id,
+            )
+            session.rollback()
 
-    for _ in range(settings.SAVED_THREAD_QUEUE_MAX_PER_TICK):
-        job = await dequeue_saved_thread(redis_cache)
-        if not job:
-            break
+    # Rotate shelf to keep it at 50
+    interest_repo.rotate_shelf(session, interest_id, max_size=settings.INTEREST_STORY_LIMIT)
+    return inserted, shelf_scores(interest_repo.list_interest_stories(session, interest_id))
 
-        user_id = job.get("user_id")
-        story_hn_id = job.get("story_hn_id")
-        comment_hn_ids = job.get("comment_hn_ids") or []
-        if user_id is None or story_hn_id is None:
-            continue
 
+async def _handle_interest_signal(SessionLocal, redis_cache: RedisCache, search_client: HNSearchClient, interest_repo: InterestRepository, story_repo: StoryRepository, interest_id: int):
+    logger.info("Pressure signal received for interest_id=%d", interest_id)
+    with get_session(SessionLocal) as session:
+        interest = await run_db(interest_repo.get_by_id, session, interest_id)
+        if not interest:
+            return
+
+        # Use watermark for efficient fetch
+        watermark = await redis_cache.get_interest_watermark(interest_id)
+        keywords = " ".join((interest.keywords or [])[:5])
+        hits = await search_client.search(
+            keywords,
+            settings.INTEREST_BACKLOG_LIMIT,
+            min_timestamp=watermark,
+        )
+        if not hits and watermark > 0:
+            # Fallback to a full search if watermark is too high or stale.
+            logger.info(
+                "No hits with watermark=%s for interest_id=%s, retrying without watermark",
+                watermark,
+                interest_id,
+            )
+            hits = await search_client.search(
+                keywords,
+                settings.INTEREST_BACKLOG_LIMIT,
+                min_timestamp=0,
+            )
+
+        max_ts = max([watermark] + [h.get("created_at_i") or 0 for h in hits])
+        inserted, scores = await run_db(_persist_signal_hits, session, interest.id, hits, interest_repo, story_repo)
+        await redis_cache.set_interest_shelf(interest.id, scores, ex=settings.INTEREST_SHELF_TTL_SECONDS)
+        await UserFeedCache(redis_cache).bump_epoch()
+
+        # Update watermark
+        await redis_cache.set_interest_watermark(interest_id, max_ts)
+        logger.info(
+            "Interest refresh done interest_id=%s inserted=%s watermark=%s",
+            interest_id,
+            inserted,
+            max_ts,
+        )
+
+
+async def _crawl_story_comments(SessionLocal, redis_cache: RedisCache, client: AsyncHNClient, story_repo: StoryRepository, comment_repo: CommentRepository, story_hn_id: int):
+    logger.info("Comment signal received for story_hn_id=%d", story_hn_id)
+    with get_session(SessionLocal) as session:
+        story = await run_db(story_repo.get_by_hn_id, session, story_hn_id)
+        if not story or not story.raw_payload:
+            return
+        kids = story.raw_payload.get("kids") or []
+        if not kids:
+            return
+
+    created_total = 0
+    updated_total = 0
+
+    async def persist(batch: list[dict]):
+        nonlocal created_total, updated_total
         with get_session(SessionLocal) as session:
-            story = story_repo.get_by_hn_id(session, int(story_hn_id))
-            if story is None:
-                try:
-                    sd = await fetcher.fetch_and_normalize(int(story_hn_id))
-                    story, _c, _u = story_repo.upsert(session, sd)
-                except Exception:
-                    logger.exception("Failed fetching story %s", story_hn_id)
-                    continue
+            created_ids, updated_ids = await run_db(comment_repo.upsert_many, session, story_hn_id, batch)
+        created_total += len(created_ids)
+        updated_total += len(updated_ids)
+
+    crawler = CommentTreeCrawler(
+        client,
+        persist,
+        budget=settings.COMMENT_CRAWL_BUDGET,
+        workers=settings.COMMENT_CRAWL_WORKERS,
+        flush_size=settings.COMMENT_CRAWL_FLUSH_SIZE,
+    )
+    logger.info("Starting comment crawl for story %d (budget=%d)", story_hn_id, settings.COMMENT_CRAWL_BUDGET)
+    stats = await crawler.crawl(kids)
+    await publish_story_event(redis_cache, story_hn_id, COMMENTS_READY, {"persisted": stats.persisted})
+    if created_total:
+        # the summary worker checks the story's total uncovered comments against
+        # SUMMARY_DELTA_MIN_NEW_COMMENTS, so small crawls still add up to a refresh
+        await enqueue_summary(redis_cache, story_hn_id, None, kind="story", refresh=True)
+    logger.info(
+        "Comment crawl complete for story %d: fetched=%d persisted=%d depth=%d (created=%d updated=%d)",
+        story_hn_id,
+        stats.fetched,
+        stats.persisted,
+        stats.max_depth,
+        created_total,
+        updated_total,
+    )
+
+
+async def _build_saved_thread(SessionLocal, story_repo: StoryRepository, comment_repo: CommentRepository, fetcher: HNFetcher, client: AsyncHNClient, repo: SavedThreadRepository, comment_summary_repo: CommentSummaryRepository, comment_summary_cache: CommentSummaryCache, provider, model_version: str, model_name: str, job) -> None:
+    if not isinstance(job, dict):
+        return
+    user_id = job.get("user_id")
+    story_hn_id = job.get("story_hn_id")
+    # de-duplicate while preserving the user's order
+    comment_hn_ids = list(dict.fromkeys(int(c) for c in job.get("comment_hn_ids") or []))
+    idempotency_key = job.get("idempotency_key")
+    if user_id is None or story_hn_id is None:
+        return
+
+    semaphore = asyncio.Semaphore(max(1, settings.SAVED_THREAD_CONCURRENCY))
 
-            thread = repo.create_thread(session, int(user_id), story.hn_id, story.title, url=story.url)
+    async def _bounded(coro):
+        async with semaphore:
+            return await coro
 
-            # Story summary
+    async def _fetch_live_comment(cid: int):
+        try:
+            raw = await client.fetch_item(cid)
+        except Exception:
+            logger.exception("Failed fetching comment %s", cid)
+            return None
+        if raw and isinstance(raw, dict) and raw.get("type") == "comment" and not raw.get("dead") and not raw.get("deleted"):
+            return raw
+        return None
+
+    with get_session(SessionLocal) as session:
+        if idempotency_key:
+            done = await run_db(repo.get_by_idempotency_key, session, idempotency_key)
+            if done is not None:
+                logger.info("Saved thread %s already built for key %s; skipping", done.id, idempotency_key[:12])
+                return
+
+        story = await run_db(story_repo.get_by_hn_id, session, int(story_hn_id))
+        if story is None:
+            try:
+                sd = await fetcher.fetch_and_normalize(int(story_hn_id))
+                story, _c, _u = await run_db(story_repo.upsert, session, sd)
+            except Exception:
+                # leave the job pending so it is retried (and eventually dead-lettered)
+                logger.exception("Failed fetching story %s", story_hn_id)
+                raise
+
+        # One bulk lookup for stored comments; fetch the rest concurrently
+        comments = await run_db(comment_repo.get_many_by_hn_ids, session, comment_hn_ids)
+        missing = [cid for cid in comment_hn_ids if cid not in comments]
+        if missing:
+            raws = await asyncio.gather(*(_bounded(_fetch_live_comment(cid)) for cid in missing))
+            raws = [raw for raw in raws if raw is not None]
+            if raws:
+                await run_db(comment_repo.upsert_many, session, story.hn_id, raws)
+                comments.update(await run_db(comment_repo.get_many_by_hn_ids, session, [raw["id"] for raw in raws]))
+
+        # One bulk lookup for existing summaries; generate the rest (and the story's) concurrently
+        comment_summaries = await run_db(comment_summary_repo.fetch_many, session, comments.keys(), model_version)
+        to_summarize = [comments[cid] for cid in comment_hn_ids if cid in comments and cid not in comment_summaries]
+        stored = await run_db(SummaryRepository().fetch_latest, session, story.hn_id, model_version)
+
+        async def _story_summary() -> dict:
+            if stored is not None:
+                return {"tldr": stored.tldr, "key_points": stored.key_points, "consensus": stored.consensus}
             story_payload = story.raw_payload or {"id": story.hn_id, "title": story.title}
-            story_summary = await provider.summarize_story(story_payload)
-            repo.add_item(
+            return (await _bounded(provider.summarize_story(story_payload))).dict()
+
+        story_summary, *generated = await asyncio.gather(
+            _story_summary(),
+            *(
+                _bounded(provider.summarize_story(c.raw_payload or {"id": c.comment_hn_id, "text": c.text}))
+                for c in to_summarize
+            ),
+        )
+
+        if generated:
+            new_rows = await run_db(
+                comment_summary_repo.upsert_many,
                 session,
-                thread.id,
-                "story",
-                story.hn_id,
-                story.title,
-                story_summary.dict(),
+                {c.comment_hn_id: summary for c, summary in zip(to_summarize, generated)},
+                model_version,
                 model_name,
+            )
+            comment_summaries.update(new_rows)
+            await comment_summary_cache.set_many(
+                {
+                    cid: summary_payload(row)
+                    for cid, row in new_rows.items()
+                },
                 model_version,
             )
 
-            # Comment summaries
-            for cid in comment_hn_ids:
-                comment = session.query(Comment).filter_by(comment_hn_id=int(cid)).one_or_none()
-                if comment is None:
-                    try:
-                        raw = await client.fetch_item(int(cid))
-                        if raw and isinstance(raw, dict) and raw.get("type") == "comment" and not raw.get("dead") and not raw.get("deleted"):
-                            comment, _c, _u = comment_repo.upsert(session, story.hn_id, raw)
-                        else:
-                            continue
-                    except Exception:
-                        logger.exception("Failed fetching comment %s", cid)
-                        continue
-                existing = comment_summary_repo.fetch_latest(session, comment.comment_hn_id, model_version)
-                if existing is None:
-                    comment_payload = comment.raw_payload or {"id": comment.comment_hn_id, "text": comment.text}
-                    comment_summary = await provider.summarize_story(comment_payload)
-                    existing, _c, _u = comment_summary_repo.upsert(session, comment.comment_hn_id, comment_summary, model_version, model_name)
-                    await comment_summary_cache.set(
-                        comment.comment_hn_id,
-                        model_version,
-                        {
-                            "tldr": existing.tldr,
-                            "key_points": existing.key_points,
-                            "consensus": existing.consensus,
-                            "model_version": existing.model_version,
-                            "model_name": existing.model_name,
-                            "created_at": existing.created_at.isoformat() if existing.created_at else None,
-                            "updated_at": existing.updated_at.isoformat() if existing.updated_at else None,
-                        },
-                    )
-                comment_summary = existing
-                repo.add_item(
-                    session,
-                    thread.id,
-                    "comment",
-                    comment.comment_hn_id,
-                    comment.text,
-                    {
-                        "tldr": comment_summary.tldr,
-                        "key_points": comment_summary.key_points,
-                        "consensus": comment_summary.consensus,
+        items = [
+            {
+                "item_type": "story",
+                "hn_id": story.hn_id,
+                "raw_text": story.title,
+                "ai_summary": story_summary,
+                "model_name": model_name,
+                "model_version": model_version,
+            }
+        ]
+        for cid in comment_hn_ids:
+            comment = comments.get(cid)
+            summary_row = comment_summaries.get(cid)
+            if comment is None or summary_row is None:
+                continue
+            items.append(
+                {
+                    "item_type": "comment",
+                    "hn_id": cid,
+                    "raw_text": comment.text,
+                    "ai_summary": {
+                        "tldr": summary_row.tldr,
+                        "key_points": summary_row.key_points,
+                        "consensus": summary_row.consensus,
                     },
-                    model_name,
-                    model_version,
-                )
+                    "model_name": model_name,
+                    "model_version": model_version,
+                }
+            )
 
-async def _run_loop(SessionLocal, redis_cache: RedisCache):
-    client = AsyncHNClient(base_url=str(settings.HN_API_URL))
-    await client.init()
+        # thread + items land in one commit, so a retry either finds the thread or redoes it all
+        thread, created = await run_db(
+            repo.create_thread_with_items,
+            session,
+            int(user_id),
+            story.hn_id,
+            story.title,
+            story.url,
+            items,
+            idempotency_key,
+        )
+        if not created:
+            logger.info("Saved thread %s was created concurrently for key %s", thread.id, idempotency_key[:12])
+
+
+async def _process_saved_thread_queue(SessionLocal, redis_cache: RedisCache, story_repo: StoryRepository, comment_repo: CommentRepository, fetcher: HNFetcher, client: AsyncHNClient, queue: StreamQueue) -> int:
+    provider = get_ai_provider(redis_cache)
+    model_version = settings.SUMMARIZATION_MODEL_VERSION
+    model_name = settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else "mock"
+    repo = SavedThreadRepository()
+    comment_summary_repo = CommentSummaryRepository()
+    comment_summary_cache = CommentSummaryCache(redis_cache, comment_summary_repo)
+
+    handled = 0
+    for _ in range(settings.SAVED_THREAD_QUEUE_MAX_PER_TICK):
+        jobs = await queue.read(count=1)
+        if not jobs:
+            break
+        job = jobs[0]
+        try:
+            await _build_saved_thread(
+                SessionLocal,
+                story_repo,
+                comment_repo,
+                fetcher,
+                client,
+                repo,
+                comment_summary_repo,
+                comment_summary_cache,
+                provider,
+                model_version,
+                model_name,
+                job.payload,
+            )
+        except Exception:
+            logger.exception("Saved-thread job %s failed (delivery %d)", job.id, job.deliveries)
+            continue
+        await queue.ack(job)
+        handled += 1
+    return handled
+
+
+def _build_families(SessionLocal, redis_cache: RedisCache, client: AsyncHNClient, search_client: HNSearchClient) -> list[JobFamily]:
     fetcher = HNFetcher(client)
     story_repo = StoryRepository()
     top_story_repo = TopStoryRepository()
     feed_cache = FeedCache(redis_cache, top_story_repo)
     comment_repo = CommentRepository()
     interest_repo = InterestRepository()
+    poll = settings.WORKER_QUEUE_POLL_SECONDS
+
+    # One consumer per process; replicas share each stream's consumer group
+    consumer = default_consumer_name()
+    summaries = summary_stream(redis_cache, consumer)
+    saved_threads = saved_thread_stream(redis_cache, consumer)
+    interest_signals_q = StreamQueue(
+        redis_cache, INTEREST_SIGNAL_STREAM, consumer=consumer, pending_set=INTEREST_SIGNAL_PENDING, legacy_list=INTEREST_SIGNAL_LEGACY_LIST
+    )
+    comment_signals_q = StreamQueue(
+        redis_cache, COMMENT_SIGNAL_STREAM, consumer=consumer, pending_set=COMMENT_SIGNAL_PENDING, legacy_list=COMMENT_SIGNAL_LEGACY_LIST
+    )
+
+    async def _claim_periodic(name: str, interval: float) -> bool:
+        """Only one replica runs a periodic job per interval (always true without Redis)."""
+        claimed = await redis_cache.set_json(f"worker:periodic:{name}", consumer, ex=max(1, int(interval)), nx=True)
+        return claimed is not False
+
+    async def _consume_one(queue: StreamQueue, handler) -> int:
+        jobs = await queue.read(count=1)
+        if not jobs:
+            return 0
+        job = jobs[0]
+        try:
+            await handler(job.payload)
+        except Exception:
+            logger.exception("%s job %s failed (delivery %d)", queue.stream, job.id, job.deliveries)
+            return 0
+        await queue.ack(job)
+        return 1
+
+    # --- Top Stories (The Daily Newspaper) ---
+    async def top_stories():
+        if not await _claim_periodic("top_stories", settings.TOP_STORIES_REFRESH_SECONDS):
+            return 0
+        logger.info("Fetching Daily Edition (Top Stories)")
+        await run_fetch_once(
+            SessionLocal,
+            fetcher,
+            story_repo,
+            feed_cache,
+            limit=settings.TOP_STORIES_LIMIT,
+            top_story_repo=top_story_repo,
+        )
+        return 0
+
+    # --- Periodic Interest Refresh (Backfill shelves) ---
+    async def interest_refresh():
+        if not await _claim_periodic("interest_refresh", settings.INTEREST_REFRESH_SECONDS):
+            return 0
+        logger.info("Refreshing interest shelves")
+        await _refresh_interest_stories(SessionLocal, redis_cache, search_client, interest_repo, story_repo)
+        return 0
+
+    # --- Interest Signaling (Pressure Hook) ---
+    async def interest_signals():
+        async def handle(interest_id):
+            await _handle_interest_signal(SessionLocal, redis_cache, search_client, interest_repo, story_repo, int(interest_id))
+
+        return await _consume_one(interest_signals_q, handle)
+
+    # --- Comment Signaling (Predictive Discussion) ---
+    async def comment_signals():
+        async def handle(story_hn_id):
+            await _crawl_story_comments(SessionLocal, redis_cache, client, story_repo, comment_repo, int(story_hn_id))
+
+        return await _consume_one(comment_signals_q, handle)
+
+    async def summary_queue():
+        return await _process_summary_queue(SessionLocal, redis_cache, story_repo, summaries)
+
+    async def saved_thread_queue():
+        return await _process_saved_thread_queue(SessionLocal, redis_cache, story_repo, comment_repo, fetcher, client, saved_threads)
+
+    async def cleanup():
+        if not await _claim_periodic("cleanup", settings.CLEANUP_INTERVAL_SECONDS):
+            return 0
+        await _cleanup_stories(SessionLocal)
+        return 0
+
+    return [
+        JobFamily("top_stories", top_stories, interval=settings.TOP_STORIES_REFRESH_SECONDS),
+        JobFamily("interest_refresh", interest_refresh, interval=settings.INTEREST_REFRESH_SECONDS),
+        JobFamily("interest_signals", interest_signals, interval=poll, concurrency=settings.WORKER_INTEREST_SIGNAL_CONCURRENCY),
+        JobFamily("comment_signals", comment_signals, interval=poll, concurrency=settings.WORKER_COMMENT_CONCURRENCY),
+        JobFamily("summary_queue", summary_queue, interval=poll, concurrency=settings.WORKER_SUMMARY_CONCURRENCY),
+        JobFamily("saved_thread_queue", saved_thread_queue, interval=poll, concurrency=settings.WORKER_SAVED_THREAD_CONCURRENCY),
+        JobFamily("cleanup", cleanup, interval=settings.CLEANUP_INTERVAL_SECONDS),
+    ]
+
+
+async def _run_loop(SessionLocal, redis_cache: RedisCache):
+    client = create_hn_client()
+    await client.init()
     search_client = HNSearchClient()
-    last_interest_refresh = -settings.INTEREST_REFRESH_SECONDS
-    last_top_refresh = -settings.TOP_STORIES_REFRESH_SECONDS
-    last_cleanup = 0.0
 
-    interval = 1.0  # Check signals every 1s
+    scheduler = Scheduler(
+        _build_families(SessionLocal, redis_cache, client, search_client),
+        redis_cache=redis_cache,
+        metrics_interval=settings.WORKER_METRICS_INTERVAL_SECONDS,
+    )
 
-    logger.info("Worker entering reactive signal loop")
+    logger.info("Worker entering concurrent scheduler")
 
     try:
-        while True:
-            try:
-                # --- 1. Top Stories (The Daily Newspaper) ---
-                # Check if it has been 24 hours
-                now_ts = asyncio.get_event_loop().time()
-                if now_ts - last_top_refresh >= settings.TOP_STORIES_REFRESH_SECONDS:
-                    logger.info("Fetching Daily Edition (Top Stories)")
-                    await run_fetch_once(
-                        SessionLocal,
-                        fetcher,
-                        story_repo,
-                        feed_cache,
-                        limit=settings.TOP_STORIES_LIMIT,
-                        top_story_repo=top_story_repo,
-                    )
-                    last_top_refresh = now_ts
-
-                # --- 1b. Periodic Interest Refresh (Backfill shelves) ---
-                if now_ts - last_interest_refresh >= settings.INTEREST_REFRESH_SECONDS:
-                    logger.info("Refreshing interest shelves")
-                    await _refresh_interest_stories(
-                        SessionLocal,
-                        search_client,
-                        interest_repo,
-                        story_repo,
-                    )
-                    last_interest_refresh = now_ts
-
-                # --- 2. Interest Signaling (Pressure Hook) ---
-                # Listen for pressure signals from API
-                interest_id = await redis_cache.get_next_interest_signal(timeout=1)
-                if interest_id:
-                    logger.info("Pressure signal received for interest_id=%d", interest_id)
-                    from app.db.models.interest import Interest
-                    with get_session(SessionLocal) as session:
-                        interest = session.query(Interest).filter_by(id=interest_id).one_or_none()
-                        if interest:
-                            # Use watermark for efficient fetch
-                            watermark = await redis_cache.get_interest_watermark(interest_id)
-                            keywords = " ".join((interest.keywords or [])[:5])
-                            hits = await search_client.search(
-                                keywords,
-                                settings.INTEREST_BACKLOG_LIMIT,
-                                min_timestamp=watermark,
-                            )
-                            if not hits and watermark > 0:
-                                # Fallback to a full search if watermark is too high or stale.
-                                logger.info(
-                                    "No hits with watermark=%s for interest_id=%s, retrying without watermark",
-                                    watermark,
-                                    interest_id,
-                                )
-                                hits = await search_client.search(
-                                    keywords,
-                                    settings.INTEREST_BACKLOG_LIMIT,
-                                    min_timestamp=0,
-                                )
-                            
-                            max_ts = watermark
-                            inserted = 0
-                            for h in hits:
-                                try:
-                                    hn_id = int(h.get("objectID"))
-                                    ts = h.get("created_at_i") or 0
-                                    max_ts = max(max_ts, ts)
-                                    
-                                    # Upsert story
-                                    raw = {"id": hn_id, "title": h.get("title"), "url": h.get("url"), "score": h.get("points"), "time": ts}
-                                    from app.services.sources.hackernews.fetcher import StoryData
-                                    sd = StoryData(hn_id=hn_id, title=h.get("title"), url=h.get("url"), score=h.get("points"), time=ts, raw_payload=raw)
-                                    story_repo.upsert(session, sd)
-                                    interest_repo.upsert_interest_story(
-                                        session,
-                                        interest.id,
-                                        hn_id,
-                                        h.get("points"),
-                                        ts,
-                                    )
-                                    inserted += 1
-                                except Exception:
-                                    logger.exception(
-                                        "Failed upserting interest story interest_id=%s hn_id=%s",
-                                        interest.id,
-                                        h.get("objectID"),
-                                    )
-                                    continue
-                            
-                            # Rotate shelf to keep it at 50
-                            interest_repo.rotate_shelf(session, interest.id, max_size=settings.INTEREST_STORY_LIMIT)
-                            # Update watermark
-                            await redis_cache.set_interest_watermark(interest_id, max_ts)
-                            logger.info(
-                                "Interest refresh done interest_id=%s inserted=%s watermark=%s",
-                                interest_id,
-                                inserted,
-                                max_ts,
-                            )
-
-                # --- 3. Comment Signaling (Predictive Discussion) ---
-                # --- 3. Comment Signaling (Predictive Discussion) ---
-                story_hn_id = await redis_cache.get_next_comment_signal(timeout=1)
-                if story_hn_id:
-                    logger.info("Comment signal received for story_hn_id=%d", story_hn_id)
-                    with get_session(SessionLocal) as session:
-                        story = story_repo.get_by_hn_id(session, story_hn_id)
-                        if story and story.raw_payload:
-                            kids = story.raw_payload.get("kids") or []
-                            if kids:
-                                # Fetch deep discussion (BFS)
-                                # Limit total comments to prevent explosion (e.g. 50-100)
-                                total_limit = settings.COMMENTS_FETCH_LIMIT * 5
-                                
-                                # BFS state
-                                queue = list(kids)
-                                seen = set(kids)
-                                fetched_count = 0
-                                
-                                logger.info("Starting recursive fetch for story %d (limit=%d)", story_hn_id, total_limit)
-                                
-                                while queue and fetched_count < total_limit:
-                                    # Batch fetch for concurrency
-                                    batch_size = 10
-                                    batch = queue[:batch_size]
-                                    queue = queue[batch_size:]
-                                    
-                                    coros = [client.fetch_item(k) for k in batch]
-                                    try:
-                                        results = await asyncio.gather(*coros, return_exceptions=True)
-                                        
-                                        for res in results:
-                                            if isinstance(res, Exception):
-                                                continue
-                                            
-                                            raw = res
-                                            if not isinstance(raw, dict):
-                                                continue
-                                                
-                                            # Validate item type
-                                            if raw.get("type") != "comment" or raw.get("dead") or raw.get("deleted"):
-                                                continue
-                                                
-                                            # Upsert
-                                            comment_repo.upsert(session, story_hn_id, raw)
-                                            fetched_count += 1
-                                            
-                                            # Enqueue kids
-                                            item_kids = raw.get("kids")
-                                            if item_kids and isinstance(item_kids, list):
-                                                for k in item_kids:
-                                                    if k not in seen:
-                                                        seen.add(k)
-                                                        queue.append(k)
-                                                        
-                                    except Exception:
-                                        logger.exception("Batch fetch failed for story %d", story_hn_id)
-                                        
-                                logger.info("Recursive fetch complete. Fetched %d comments for story %d", fetched_count, story_hn_id)
-
-                # --- 4. Background Tasks ---
-                await _process_summary_queue(SessionLocal, redis_cache, story_repo)
-                await _process_saved_thread_queue(SessionLocal, redis_cache, story_repo, comment_repo, fetcher, client)
-
-                if now_ts - last_cleanup >= settings.CLEANUP_INTERVAL_SECONDS:
-                    await _cleanup_stories(SessionLocal)
-                    last_cleanup = now_ts
-                    
-                # Pause briefly to prevent CPU spinning if no signals
-                if interest_id is None:
-                    await asyncio.sleep(interval)
-            except Exception:
-                logger.exception("Error in fetch cycle")
-                await asyncio.sleep(5)
+        await scheduler.run()
     finally:
+        try:
+            await scheduler.publish_metrics()
+        except Exception:
+            logger.exception("Failed publishing final worker metrics")
         await client.close()
         await search_client.close()
+        await close_ai_provider()
+        shutdown_db_executor()
 
 
 def _run_worker_blocking():
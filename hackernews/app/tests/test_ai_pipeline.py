@@ -27,3 +27,113 @@ async def test_pipeline_uses_provider():
     assert summary.tldr.startswith("TL;DR:" )
     assert isinstance(summary.key_points, list)
     assert summary.consensus == "mixed"
+
+
+def _comment(cid, parent, text, author="u"):
+    from types import SimpleNamespace
+
+    return SimpleNamespace(comment_hn_id=cid, parent_hn_id=parent, author=author, text=text)
+
+
+def _thread(story_id=1, roots=6, replies=5, words=40):
+    comments = []
+    cid = 100
+    for r in range(roots):
+        root_id = cid
+        comments.append(_comment(root_id, story_id, f"root {r} " + "opinion " * words))
+        cid += 1
+        parent = root_id
+        for _ in range(replies):
+            comments.append(_comment(cid, parent, "<p>reply " + "detail " * words))
+            parent = cid
+            cid += 1
+    return comments
+
+
+def test_chunks_respect_budget_and_keep_subtree_context():
+    from app.services.ai.pipeline import chunk_comment_tree
+    from app.services.ai.prompt import estimate_tokens
+
+    comments = _thread()
+    chunks = chunk_comment_tree(comments, chunk_tokens=120, comment_tokens=50)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c.text) <= 120 + 50 for c in chunks)
+    # every comment lands in exactly one chunk
+    assert sorted(cid for c in chunks for cid in c.comment_ids) == sorted(c.comment_hn_id for c in comments)
+    # a continuation chunk of a deep chain opens with its (shortened) parent line
+    continued = [c for c in chunks if c.text.startswith(" ") and c.text.splitlines()[0].endswith("…")]
+    assert continued
+
+    # small subtrees are packed together
+    packed = chunk_comment_tree(_thread(roots=4, replies=0, words=3), chunk_tokens=500)
+    assert len(packed) == 1
+
+
+@pytest.mark.asyncio
+async def test_discussion_summarizer_map_reduce_is_bounded():
+    import asyncio
+    from app.services.ai.pipeline import DiscussionSummarizer
+
+    class SlowProvider(MockAIProvider):
+        def __init__(self):
+            self.active = 0
+            self.peak = 0
+
+        async def summarize_story(self, payload):
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            return await super().summarize_story(payload)
+
+    provider = SlowProvider()
+    summarizer = DiscussionSummarizer(provider, chunk_tokens=150, concurrency=3, comment_tokens=50)
+    result = await summarizer.summarize({"id": 1, "title": "Big thread"}, _thread(roots=10))
+
+    assert result.chunks > 3
+    assert provider.peak == 3
+    # map calls + at most a few merge levels, never one call per comment
+    assert result.chunks + 1 <= result.llm_calls < result.chunks * 2
+    assert result.summary.tldr.startswith("TL;DR: Big thread")
+    assert len(result.comment_ids) == 60
+
+    # no comments -> plain story summary, one call
+    empty = await summarizer.summarize({"id": 1, "title": "Quiet"}, [])
+    assert (empty.chunks, empty.llm_calls) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_long_self_post_never_crowds_out_the_discussion_notes():
+    import json
+    from app.services.ai.pipeline import DiscussionSummarizer
+    from app.services.ai.prompt import build_summary_prompt, estimate_tokens
+    from app.services.ai.schemas import SummaryData
+
+    class PartialProvider:
+        def __init__(self):
+            self.calls = 0
+
+        async def summarize_story(self, payload):
+            self.calls += 1
+            return SummaryData(tldr=f"partial {self.calls}", key_points=["a point about backups"], consensus="mixed")
+
+    # an Ask HN post of ~1,600 words and 39 stored comments
+    body = "<p>".join(f"Paragraph {i} of my question about running postgres on a tiny vps. " * 4 for i in range(40))
+    story = {"id": 1, "type": "story", "title": "Ask HN: How do you run small databases?", "text": body}
+    comments = _thread(roots=13, replies=2, words=30)
+    assert len(comments) == 39
+
+    provider = PartialProvider()
+    summarizer = DiscussionSummarizer(provider, chunk_tokens=400, comment_tokens=100, prompt_tokens=1500)
+    payload, chunks = await summarizer.final_payload(story, comments)
+    prompt = build_summary_prompt(payload, token_budget=1500)
+
+    assert estimate_tokens(prompt) <= 1500
+    notes, story_part = payload["text"].split("\n\nStory: ")
+    assert notes.startswith("Discussion notes:")
+    # the notes reach the model whole; the story body is what gets clipped
+    assert json.dumps(notes, ensure_ascii=False)[1:-1] in prompt
+    assert all(f"partial {n}" in notes for n in range(1, len(chunks) + 1))
+    assert story_part.startswith("Paragraph 0") and story_part.endswith("…")
+    assert sum(len(c.comment_ids) for c in chunks) == 39
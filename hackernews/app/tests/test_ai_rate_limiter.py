@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.ai.factory import close_ai_provider, get_ai_provider
+from app.services.ai.openai_provider import OpenAIProvider
+from app.services.ai.rate_limiter import AdaptiveRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_limiter_halves_on_429_and_recovers_additively():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(requests_per_minute=600, tokens_per_minute=10000, max_concurrency=8, increase_after=2, clock=clock)
+
+    limiter.on_rate_limited(retry_after=3)
+    assert limiter.concurrency == 4
+    assert limiter.snapshot()["paused_for"] == 3
+    limiter.on_rate_limited()
+    assert limiter.concurrency == 2
+
+    for _ in range(4):
+        limiter.on_success()
+    assert limiter.concurrency == 4
+
+
+@pytest.mark.asyncio
+async def test_burst_of_429s_halves_the_window_once():
+    limiter = AdaptiveRateLimiter(requests_per_minute=600, tokens_per_minute=10000, max_concurrency=8)
+    permits = []
+    release = asyncio.Event()
+
+    async def call():
+        async with limiter.slot(1) as permit:
+            permits.append(permit)
+            await release.wait()
+
+    tasks = [asyncio.create_task(call()) for _ in range(8)]
+    while len(permits) < 8:
+        await asyncio.sleep(0)
+    # all eight in-flight calls come back 429 together
+    for permit in permits:
+        permit.on_rate_limited()
+    assert limiter.concurrency == 4
+    release.set()
+    await asyncio.gather(*tasks)
+
+    # a request started after the cut can cut again
+    async with limiter.slot(1) as permit:
+        permit.on_rate_limited()
+    assert limiter.concurrency == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_in_flight_and_token_budget():
+    limiter = AdaptiveRateLimiter(requests_per_minute=6000, tokens_per_minute=6000, max_concurrency=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot(10):
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
+
+    # usage above the estimate is charged to the TPM bucket
+    async with limiter.slot(10) as permit:
+        before = limiter.snapshot()["llm_tokens"]
+        permit.record_usage(510)
+    assert limiter.snapshot()["llm_tokens"] < before - 450
+
+
+@pytest.mark.asyncio
+async def test_provider_retries_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_BACKOFF_BASE_SECONDS", 0.01)
+    calls = []
+    body = {
+        "output_text": json.dumps({"tldr": "ok", "key_points": ["a"], "consensus": "mixed"}),
+        "usage": {"total_tokens": 42},
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.05"})
+        if len(calls) == 2:
+            return httpx.Response(503)
+        return httpx.Response(200, json=body)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = OpenAIProvider(api_key="k", base_url="http://fake/v1", client=client)
+    summary = await provider.summarize_story({"id": 1, "title": "t"})
+    await client.aclose()
+
+    assert summary.tldr == "ok"
+    assert len(calls) == 3
+    assert provider.limiter.concurrency == settings.OPENAI_MAX_CONCURRENCY // 2
+
+
+@pytest.mark.asyncio
+async def test_provider_does_not_retry_client_errors():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(400, json={"error": "bad"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = OpenAIProvider(api_key="k", base_url="http://fake/v1", client=client)
+    with pytest.raises(httpx.HTTPStatusError):
+        await provider.summarize_story({"id": 1})
+    await client.aclose()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_factory_reuses_one_provider(monkeypatch):
+    monkeypatch.setattr(settings, "AI_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "k")
+    await close_ai_provider()
+    first = get_ai_provider()
+    assert get_ai_provider() is first
+
+    first._http()
+    monkeypatch.setattr(settings, "OPENAI_MODEL", "other-model")
+    assert get_ai_provider() is not first
+    # the replaced provider's pool is closed, not leaked
+    assert first._client is not None
+    await close_ai_provider()
+    assert first._client is None
@@ -0,0 +1,58 @@
+import pytest
+
+import fakeredis.aioredis as fakeredis
+
+from app.services.ai.base import AIProvider
+from app.services.ai.schemas import SummaryData
+from app.services.ai.result_cache import CachingAIProvider, result_cache_stats
+from app.services.cache.redis import RedisCache
+
+
+class CountingProvider(AIProvider):
+    def __init__(self):
+        self.calls = 0
+        self.seen = []
+
+    async def summarize_story(self, story_payload: dict) -> SummaryData:
+        self.calls += 1
+        self.seen.append(story_payload)
+        return SummaryData(tldr=f"TL;DR {story_payload.get('title')}", key_points=["k"], consensus="mixed")
+
+
+@pytest.mark.asyncio
+async def test_identical_inputs_reach_provider_once():
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    await cache.init()
+    inner = CountingProvider()
+
+    story = {"id": 1, "title": "Hello", "score": 10, "kids": [2, 3]}
+    first = await CachingAIProvider(inner, cache, model_version="v1").summarize_story(story)
+    # a new wrapper (another request / the worker) and moved counters still hit
+    again = await CachingAIProvider(inner, cache, model_version="v1").summarize_story({**story, "score": 99, "kids": [2, 3, 4]})
+    assert again == first
+    assert inner.calls == 1
+    # the provider only saw what was hashed, so the hit answers the same input
+    assert inner.seen == [{"id": 1, "title": "Hello"}]
+
+    # different content or model version is a different key
+    await CachingAIProvider(inner, cache, model_version="v1").summarize_story({"id": 1, "title": "Edited"})
+    await CachingAIProvider(inner, cache, model_version="v2").summarize_story(story)
+    assert inner.calls == 3
+
+    stats = await result_cache_stats(cache)
+    assert stats == {"hits": 1, "misses": 3, "hit_rate": 0.25}
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_cached_result():
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    await cache.init()
+    inner = CountingProvider()
+    provider = CachingAIProvider(inner, cache)
+
+    events = [e async for e in provider.stream_summary({"id": 2, "title": "T"})]
+    replay = [e async for e in provider.stream_summary({"id": 2, "title": "T"})]
+    assert [e.kind for e in replay] == [e.kind for e in events]
+    assert replay[-1].summary == events[-1].summary
+    assert inner.calls == 1
+    assert (provider.hits, provider.misses) == (1, 1)
@@ -1,6 +1,8 @@
 from fastapi.testclient import TestClient
 import asyncio
 
+import pytest
+
 import fakeredis.aioredis as fakeredis
 
 from app.main import create_app
@@ -79,3 +81,84 @@ def test_cache_hit_vs_db_fallback():
         assert resp.status_code == 200
         data = resp.json()
         assert data["tldr"] == "cached"
+
+
+def _stream_app(fake):
+    import httpx
+    from app.services.auth.deps import require_user
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+    from app.repositories.story_repo import StoryRepository
+    from app.services.sources.hackernews.fetcher import StoryData
+
+    with get_session(SessionLocal) as session:
+        StoryRepository().upsert(session, StoryData(hn_id=5, title="x", url="u", score=1, time=1, descendants=0, raw_payload={"id": 5, "title": "x"}))
+
+    redis = RedisCache(client=fake)
+    app = create_app(redis_cache=redis, engine=engine)
+    app.dependency_overrides[require_user] = lambda: type("U", (), {"id": 1})()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    return redis, SessionLocal, client
+
+
+def _sse_kinds(body: str) -> list[str]:
+    return [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_summary_streams_generate_once(monkeypatch):
+    from app.api.v1.endpoints import summaries
+    from app.services.ai.mock_provider import MockAIProvider
+
+    calls = 0
+
+    class SlowProvider(MockAIProvider):
+        async def summarize_story(self, story_payload):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return await super().summarize_story(story_payload)
+
+    monkeypatch.setattr(summaries, "get_ai_provider", lambda _redis: SlowProvider())
+    redis, _SessionLocal, client = _stream_app(fakeredis.FakeRedis())
+    await redis.init()
+
+    async with client:
+        responses = await asyncio.gather(*(client.post("/v1/stories/5/summary/stream") for _ in range(4)))
+    assert calls == 1
+    for resp in responses:
+        kinds = _sse_kinds(resp.text)
+        assert kinds[0] == "tldr" and kinds[-1] == "done"
+    await redis.close()
+
+
+@pytest.mark.asyncio
+async def test_summary_stream_in_async_mode_waits_for_the_worker(monkeypatch):
+    from app.api.v1.endpoints import summaries
+    from app.services.queue.summary_queue import summary_queue
+    from app.tasks.worker import _process_summary_queue
+    from app.repositories.story_repo import StoryRepository
+
+    def _no_inline_generation(_redis):
+        raise AssertionError("the API must not call the provider in async mode")
+
+    monkeypatch.setattr(summaries, "get_ai_provider", _no_inline_generation)
+    monkeypatch.setattr(settings, "SUMMARY_ASYNC_GENERATION", True)
+    redis, SessionLocal, client = _stream_app(fakeredis.FakeRedis())
+    await redis.init()
+    queue = summary_queue(redis, consumer="w")
+
+    async with client:
+        pending = asyncio.create_task(client.post("/v1/stories/5/summary/stream"))
+        for _ in range(100):
+            if await queue.length():
+                break
+            await asyncio.sleep(0.01)
+        assert await _process_summary_queue(SessionLocal, redis, StoryRepository(), queue) == 1
+        resp = await asyncio.wait_for(pending, timeout=5)
+
+    kinds = _sse_kinds(resp.text)
+    assert kinds[0] == "queued" and kinds[1] == "tldr" and kinds[-1] == "done"
+    await redis.close()
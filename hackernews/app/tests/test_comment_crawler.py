@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.services.sources.hackernews.comment_crawler import CommentTreeCrawler
+
+
+class FakeClient:
+    def __init__(self, items):
+        self.items = items
+        self.order = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def fetch_item(self, item_id):
+        self.order.append(item_id)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.items.get(item_id)
+
+
+def _comment(cid, kids=None, **extra):
+    return {"id": cid, "type": "comment", "parent": 0, "text": f"c{cid}", "kids": kids or [], **extra}
+
+
+@pytest.mark.asyncio
+async def test_crawler_prioritises_top_level_and_busy_branches_within_budget():
+    items = {
+        1: _comment(1, kids=[10]),
+        2: _comment(2, kids=[20, 21, 22]),
+        3: _comment(3, deleted=True),
+        10: _comment(10, kids=[100]),
+        20: _comment(20),
+        21: _comment(21),
+        22: _comment(22),
+        100: _comment(100),
+    }
+    client = FakeClient(items)
+    batches = []
+
+    async def persist(batch):
+        batches.append([c["id"] for c in batch])
+
+    crawler = CommentTreeCrawler(client, persist, budget=6, workers=1, flush_size=2)
+    stats = await crawler.crawl([1, 2, 3])
+
+    # top-level first, then the 3-reply branch before the 1-reply branch; budget cuts 100
+    assert client.order[:3] == [1, 2, 3]
+    assert set(client.order[3:6]) == {20, 21, 22}
+    assert 100 not in client.order
+    assert stats.fetched == 6
+    assert stats.skipped == 1
+
+    persisted = [cid for b in batches for cid in b]
+    assert sorted(persisted) == [1, 2, 20, 21, 22]
+    assert stats.persisted == 5
+    assert all(len(b) <= 2 for b in batches)
+
+
+@pytest.mark.asyncio
+async def test_crawler_keeps_worker_pool_saturated():
+    items = {i: _comment(i) for i in range(1, 21)}
+    client = FakeClient(items)
+    persisted = []
+
+    async def persist(batch):
+        persisted.extend(c["id"] for c in batch)
+
+    stats = await CommentTreeCrawler(client, persist, budget=100, workers=4, flush_size=5).crawl(list(items))
+
+    assert client.peak == 4
+    assert stats.fetched == 20
+    assert sorted(persisted) == list(range(1, 21))
@@ -0,0 +1,33 @@
+from app.db.session import get_engine, init_sessionmaker, Base, get_session
+from app.repositories.comment_repo import CommentRepository
+
+
+def _raw(cid: int, text: str, parent: int = 100) -> dict:
+    return {"id": cid, "type": "comment", "by": "u", "time": cid, "text": text, "parent": parent}
+
+
+def test_upsert_many_reports_created_and_updated_ids():
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    repo = CommentRepository()
+
+    with get_session(SessionLocal) as session:
+        created, updated = repo.upsert_many(session, 100, [_raw(1, "a"), _raw(2, "b")])
+        assert created == [1, 2]
+        assert updated == []
+
+        # loaded into the identity map before the bulk write
+        assert repo.get_by_hn_id(session, 2).text == "b"
+
+        created2, updated2 = repo.upsert_many(session, 100, [_raw(1, "a"), _raw(2, "b2", parent=1), _raw(3, "c")])
+        assert created2 == [3]
+        assert updated2 == [2]
+
+        row = repo.get_by_hn_id(session, 2)
+        assert row.text == "b2"
+        assert row.parent_hn_id == 1
+        assert [c.comment_hn_id for c in repo.fetch_for_story(session, 100)] == [1, 2, 3]
+
+        assert repo.upsert_many(session, 100, []) == ([], [])
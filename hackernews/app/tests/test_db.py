@@ -1,4 +1,8 @@
-from app.db.session import get_engine, init_sessionmaker, Base, get_session
+import threading
+
+import pytest
+
+from app.db.session import get_engine, init_sessionmaker, Base, get_session, run_db
 from app.db.models.story import Story
 
 
@@ -16,3 +20,23 @@ def test_db_insert_and_query():
         fetched = session.query(Story).filter_by(hn_id=100).one()
         assert fetched.title == "Hello"
         assert fetched.raw_payload["id"] == 100
+
+
+@pytest.mark.asyncio
+async def test_run_db_executes_off_loop_against_shared_memory_db():
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    def _insert_and_count(session, hn_id: int):
+        session.add(Story(hn_id=hn_id, title="t", raw_payload={"id": hn_id}))
+        session.commit()
+        return threading.current_thread().name, session.query(Story).count()
+
+    with get_session(SessionLocal) as session:
+        thread_name, count = await run_db(_insert_and_count, session, 1)
+        assert thread_name != threading.current_thread().name
+        assert count == 1
+
+        # rows written from the pool are visible to the loop thread
+        assert session.query(Story).filter_by(hn_id=1).one().title == "t"
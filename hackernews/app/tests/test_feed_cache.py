@@ -88,3 +88,87 @@ async def test_db_fallback_when_cache_empty():
         read = await fc.read_or_fallback(session)
         assert len(read) == 1
         assert read[0]["hn_id"] == 1
+
+
+@pytest.mark.asyncio
+async def test_prime_swaps_to_a_new_snapshot():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    repo = StoryRepository()
+
+    with get_session(SessionLocal) as session:
+        repo.upsert(session, StoryData(hn_id=1, title="a", url="u", score=1, time=1, descendants=0, raw_payload={"id": 1}))
+        fc = FeedCache(cache, repo)
+        await fc.prime_feed(session, limit=10)
+        first = (await cache.get_json(FEED_KEY))["version"]
+
+        # a refresh after new rows is visible immediately, not after the TTL
+        repo.upsert(session, StoryData(hn_id=2, title="b", url="v", score=2, time=2, descendants=0, raw_payload={"id": 2}))
+        await fc.prime_feed(session, limit=10)
+        assert {s["hn_id"] for s in await fc.read_feed()} == {1, 2}
+        assert (await cache.get_json(FEED_KEY))["version"] == first + 1
+        # the replaced snapshot lingers only briefly for in-flight readers
+        assert 0 < await fake.ttl(f"{FEED_KEY}:snap:{first}") <= 60
+
+
+@pytest.mark.asyncio
+async def test_soft_expired_snapshot_is_served_while_rebuilding(monkeypatch):
+    from app.config import settings
+    from app.services.cache import feed_cache as feed_cache_module
+
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    await cache.init()
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    repo = StoryRepository()
+    fc = FeedCache(cache, repo, SessionLocal)
+
+    with get_session(SessionLocal) as session:
+        repo.upsert(session, StoryData(hn_id=1, title="a", url="u", score=1, time=1, descendants=0, raw_payload={"id": 1}))
+        # cold cache: built once and served
+        assert [s["hn_id"] for s in await fc.read_or_fallback(session)] == [1]
+        repo.upsert(session, StoryData(hn_id=2, title="b", url="v", score=2, time=2, descendants=0, raw_payload={"id": 2}))
+
+    monkeypatch.setattr(settings, "FEED_TTL_SECONDS", -1)
+    # stale data is served without waiting on the DB; one rebuild starts
+    assert [s["hn_id"] for s in await fc.read_feed()] == [1]
+    assert len(feed_cache_module._refreshing) == 1
+    await asyncio.gather(*feed_cache_module._refreshing)
+
+    monkeypatch.setattr(settings, "FEED_TTL_SECONDS", 300)
+    assert {s["hn_id"] for s in await fc.read_feed()} == {1, 2}
+    assert not feed_cache_module._refreshing
+
+
+@pytest.mark.asyncio
+async def test_snapshots_leave_the_legacy_list_key_alone():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+    # a replica on the old layout still writes a bare list here during a rollout
+    legacy = [{"hn_id": 99, "title": "old"}]
+    await cache.set_json("top:global:v1", legacy, ex=300)
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    repo = StoryRepository()
+
+    with get_session(SessionLocal) as session:
+        repo.upsert(session, StoryData(hn_id=1, title="a", url="u", score=1, time=1, descendants=0, raw_payload={"id": 1}))
+        fc = FeedCache(cache, repo)
+        await fc.prime_feed(session, limit=10)
+
+        assert [s["hn_id"] for s in await fc.read_feed()] == [1]
+        assert await cache.get_json("top:global:v1") == legacy
+        assert 0 < await fake.ttl("top:global:v1") <= 300
@@ -6,9 +6,6 @@ import pytest
 
 from httpx import Response
 from httpx import AsyncClient, Request
-from httpx._transports.base import AsyncByteStream
-from httpx._content_streams import IteratorStream
-from httpx._models import Headers
 from httpx import MockTransport
 
 from app.services.sources.hackernews.client import AsyncHNClient
@@ -71,3 +68,32 @@ async def test_rate_limit_enforced():
         assert elapsed >= 0.9
         assert results[0]["id"] == 1
         assert results[1]["id"] == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_client_reuses_one_pool_across_requests():
+    from app.services.sources.hackernews.client import create_hn_client
+
+    class CountingTransport(MockTransport):
+        def __init__(self):
+            super().__init__(lambda request: Response(200, json={"id": int(request.url.path.split("/")[-1].split(".")[0])}))
+            self.requests = 0
+            self.closed = 0
+
+        async def handle_async_request(self, request):
+            self.requests += 1
+            return await super().handle_async_request(request)
+
+        async def aclose(self):
+            self.closed += 1
+
+    transport = CountingTransport()
+    client = create_hn_client(transport=transport)
+    await client.init()
+
+    results = await asyncio.gather(*(client.fetch_item(i) for i in range(1, 6)))
+    assert [r["id"] for r in results] == [1, 2, 3, 4, 5]
+    assert transport.requests == 5
+
+    await client.close()
+    assert transport.closed == 1
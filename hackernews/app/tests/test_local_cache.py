@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+import fakeredis
+import fakeredis.aioredis as fakeaioredis
+
+from app.services.cache.local_cache import LocalTTLCache
+from app.services.cache.redis import RedisCache
+
+FEED = "top:global:v2"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_per_namespace_and_lru_bounds():
+    clock = FakeClock()
+    local = LocalTTLCache({"a:": 10, "b:": 100}, max_entries=3, max_bytes=100, clock=clock)
+
+    assert local.set("other", 1) is False
+    local.set("a:1", "x", size=10)
+    local.set("b:1", "y", size=10)
+    clock.now = 11
+    assert local.get("a:1") is None
+    assert local.get("b:1") == "y"
+
+    local.set("b:2", 2, size=10)
+    local.set("b:3", 3, size=10)
+    local.get("b:1")  # most recently used survives
+    local.set("b:4", 4, size=10)
+    assert local.get("b:2") is None and local.get("b:1") == "y"
+
+    local.set("b:big", "z", size=95)
+    assert len(local) == 1 and local.stats()["bytes"] == 95
+
+    # a fill that raced an invalidation is discarded
+    token = local.token()
+    local.invalidate(["b:5"])
+    assert local.set("b:5", "stale", token=token) is False
+
+
+async def _ready(cache: RedisCache):
+    for _ in range(100):
+        if cache.local_stats()["subscribed"]:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("invalidation listener did not subscribe")
+
+
+@pytest.mark.asyncio
+async def test_l1_serves_hot_keys_and_invalidates_across_replicas():
+    server = fakeredis.FakeServer()
+    raw = fakeaioredis.FakeRedis(server=server)
+    a = RedisCache(client=fakeaioredis.FakeRedis(server=server), local=LocalTTLCache())
+    b = RedisCache(client=fakeaioredis.FakeRedis(server=server), local=LocalTTLCache())
+    await a.init()
+    await b.init()
+    try:
+        await _ready(a)
+        await _ready(b)
+
+        await raw.set(FEED, '[{"hn_id": 1}]')
+        assert await a.get_json(FEED) == [{"hn_id": 1}]
+        # served from memory: a write that bypasses RedisCache is not seen
+        await raw.set(FEED, '[{"hn_id": 2}]')
+        assert await a.get_json(FEED) == [{"hn_id": 1}]
+        assert a.local_stats()["hits"] == 1
+
+        # keys outside the L1 namespaces always go to Redis
+        await raw.set("feed:user:1", "1")
+        assert (await a.get_many(["feed:user:1", FEED])) == [1, [{"hn_id": 1}]]
+
+        await b.set_json(FEED, [{"hn_id": 3}])
+        for _ in range(100):
+            if await a.get_json(FEED) == [{"hn_id": 3}]:
+                break
+            await asyncio.sleep(0.01)
+        assert await a.get_json(FEED) == [{"hn_id": 3}]
+
+        await b.delete(FEED)
+        for _ in range(100):
+            if await a.get_json(FEED) is None:
+                break
+            await asyncio.sleep(0.01)
+        assert await a.get_json(FEED) is None
+    finally:
+        await a.close()
+        await b.close()
@@ -0,0 +1,63 @@
+import json
+
+import httpx
+import pytest
+
+from app.services.ai.openai_provider import OpenAIProvider
+from app.services.ai.mock_provider import MockAIProvider
+
+
+SUMMARY_TEXT = json.dumps(
+    {
+        "tldr": "Rust \"async\" lands in the kernel",
+        "key_points": ["Drivers first", "Toolchain pinned", "Reviewers split"],
+        "consensus": "mixed",
+    }
+)
+
+
+def _sse(event: dict) -> bytes:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+def _fake_openai(chunk_size: int):
+    seen = {}
+
+    async def body():
+        yield _sse({"type": "response.created"})
+        for i in range(0, len(SUMMARY_TEXT), chunk_size):
+            yield _sse({"type": "response.output_text.delta", "delta": SUMMARY_TEXT[i : i + chunk_size]})
+        yield _sse({"type": "response.completed", "response": {"output_text": SUMMARY_TEXT}})
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["body"] = json.loads(request.content)
+        seen["url"] = str(request.url)
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body())
+
+    return handler, seen
+
+
+@pytest.mark.asyncio
+async def test_stream_summary_emits_fields_as_they_complete():
+    handler, seen = _fake_openai(chunk_size=7)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = OpenAIProvider(api_key="k", base_url="http://fake/v1", client=client)
+
+    events = [e async for e in provider.stream_summary({"id": 1, "title": "t"})]
+    await client.aclose()
+
+    assert seen["url"] == "http://fake/v1/responses"
+    assert seen["body"]["stream"] is True
+    assert [e.kind for e in events] == ["tldr", "key_point", "key_point", "key_point", "consensus", "done"]
+    assert events[0].text == 'Rust "async" lands in the kernel'
+    assert [e.text for e in events[1:4]] == ["Drivers first", "Toolchain pinned", "Reviewers split"]
+    assert events[4].text == "mixed"
+    assert events[-1].summary.key_points == ["Drivers first", "Toolchain pinned", "Reviewers split"]
+
+
+@pytest.mark.asyncio
+async def test_default_stream_wraps_blocking_summary():
+    events = [e async for e in MockAIProvider().stream_summary({"id": 5, "title": "Hello"})]
+    assert events[0].kind == "tldr"
+    assert events[-1].kind == "done"
+    assert [e.text for e in events if e.kind == "key_point"] == events[-1].summary.key_points
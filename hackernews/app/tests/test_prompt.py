@@ -0,0 +1,41 @@
+import json
+
+from app.services.ai.prompt import build_summary_prompt, compact_payload, estimate_tokens, html_to_text
+
+
+def test_compact_story_drops_kids_and_counters():
+    raw = {
+        "by": "pg",
+        "descendants": 900,
+        "id": 1,
+        "kids": list(range(600)),
+        "score": 1200,
+        "time": 1609459200,
+        "title": "Show HN: a thing",
+        "type": "story",
+        "url": "https://example.com",
+    }
+    assert compact_payload(raw) == {"title": "Show HN: a thing", "url": "https://example.com"}
+
+    prompt = build_summary_prompt(raw)
+    assert "kids" not in prompt
+    assert estimate_tokens(prompt) < estimate_tokens(json.dumps(raw)) + 100
+
+
+def test_comment_html_becomes_plain_text():
+    raw = {
+        "by": "alice",
+        "type": "comment",
+        "kids": [5, 6],
+        "text": 'It&#x27;s fast.<p>See <a href="https:&#x2F;&#x2F;example.com&#x2F;a" rel="nofollow">https:&#x2F;&#x2F;example.com&#x2F;a</a> and <i>the docs</i>',
+    }
+    assert compact_payload(raw, "comment") == {"by": "alice", "text": "It's fast.\nSee https://example.com/a and the docs"}
+    assert html_to_text('<a href="https://x.io">docs</a>') == "docs (https://x.io)"
+    assert "Hacker News comment summary" in build_summary_prompt(raw)
+
+
+def test_long_text_is_trimmed_to_budget():
+    raw = {"type": "story", "title": "Ask HN: long", "text": "word \"quoted\" " * 4000}
+    prompt = build_summary_prompt(raw, token_budget=300)
+    assert 250 <= estimate_tokens(prompt) <= 300
+    assert prompt.endswith(' …"}')
@@ -35,3 +35,88 @@ async def test_lock_context_manager():
     # lock released, should be able to re-acquire
     async with cache.lock("lock:1", timeout=1):
         assert True
+
+
+@pytest.mark.asyncio
+async def test_interest_shelf_replaced_and_read_best_first():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    assert await cache.get_interest_shelf(1) is None
+
+    await cache.set_interest_shelf(1, {10: 0.5, 11: 2.0, 12: 1.0}, ex=60)
+    assert await cache.get_interest_shelf(1) == [11, 12, 10]
+    assert await cache.get_interest_shelf(1, limit=2) == [11, 12]
+
+    # full replacement drops stories rotated off the shelf
+    await cache.set_interest_shelf(1, {12: 3.0})
+    assert await cache.get_interest_shelf(1) == [12]
+
+    await cache.set_interest_shelf(1, {})
+    assert await cache.get_interest_shelf(1) is None
+
+
+@pytest.mark.asyncio
+async def test_multi_key_operations_and_fallback():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    await cache.set_many({"k:1": 1, "k:2": [2], "k:3": {"v": 3}}, ex={"k:1": 60, "k:2": 5})
+    assert await cache.get_many(["k:1", "k:2", "k:3", "k:4"]) == [1, [2], {"v": 3}, None]
+    assert await fake.ttl("k:1") == 60 and await fake.ttl("k:2") == 5 and await fake.ttl("k:3") == -1
+
+    await cache.delete_many(["k:1", "k:3"])
+    assert await cache.get_many(["k:1", "k:2", "k:3"]) == [None, [2], None]
+
+    async with cache.pipeline() as pipe:
+        pipe.incr("n")
+        pipe.incr("n")
+        assert await pipe.execute() == [1, 2]
+
+    await cache.set_interest_watermarks({1: 100, 2: 200})
+    assert await cache.get_interest_watermarks([1, 2, 3]) == {1: 100, 2: 200, 3: 0}
+    await cache.set_interest_shelf(1, {10: 1.0, 11: 2.0})
+    assert await cache.get_interest_shelves([1, 2]) == {1: [11, 10], 2: None}
+
+    # without Redis everything degrades to empty results
+    off = RedisCache()
+    await off.init()
+    assert await off.get_many(["a", "b"]) == [None, None]
+    await off.set_many({"a": 1})
+    await off.delete_many(["a"])
+    async with off.pipeline() as pipe:
+        pipe.set("a", 1).expire("a", 5)
+        assert await pipe.execute() == [None, None]
+    assert await off.get_interest_watermarks([1]) == {1: 0}
+    assert await off.get_interest_shelves([1]) == {1: None}
+
+
+@pytest.mark.asyncio
+async def test_codec_round_trips_and_reads_legacy_values():
+    from app.services.cache.redis import RedisCodec, orjson
+
+    fake = fakeredis.FakeRedis()
+    feed = [{"hn_id": i, "title": f"Story {i} — ünïcode", "url": None, "score": i * 3} for i in range(50)]
+    await fake.set("legacy", '{"a": [1, 2]}')
+
+    codecs = [RedisCodec("json"), RedisCodec("json", compress_min_bytes=64)]
+    if orjson is not None:
+        codecs += [RedisCodec("orjson"), RedisCodec("orjson", compress_min_bytes=64)]
+    for codec in codecs:
+        cache = RedisCache(client=fake, codec=codec)
+        await cache.init()
+        await cache.set_json("feed", feed)
+        assert await cache.get_json("feed") == feed
+        # every codec reads values written before the codec existed
+        assert await cache.get_json("legacy") == {"a": [1, 2]}
+        await cache.incr("counter")
+        assert isinstance(await cache.get_json("counter"), int)
+
+    compressed = RedisCodec("json", compress_min_bytes=64).encode(feed)
+    assert compressed[0] == 1 and len(compressed) < len(RedisCodec("json").encode(feed))
+
+    # a value from a newer codec version is a miss, not an error
+    await fake.set("future", b"\x02\x00{}")
+    assert await RedisCache(client=fake).get_json("future") is None
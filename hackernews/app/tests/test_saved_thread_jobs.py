@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+import fakeredis.aioredis as fakeredis
+
+from app.services.cache.redis import RedisCache
+from app.services.cache.comment_summary_cache import CommentSummaryCache
+from app.db.session import get_engine, init_sessionmaker, Base, get_session
+from app.db.models.saved_thread import SavedThread
+from app.db.models.saved_thread_item import SavedThreadItem
+from app.repositories.story_repo import StoryRepository
+from app.repositories.comment_repo import CommentRepository
+from app.repositories.comment_summary_repo import CommentSummaryRepository
+from app.repositories.saved_thread_repo import SavedThreadRepository
+from app.services.ai.mock_provider import MockAIProvider
+from app.services.ai.schemas import SummaryData
+from app.services.queue.saved_thread_queue import saved_thread_idempotency_key
+from app.services.sources.hackernews.fetcher import StoryData
+from app.tasks.worker import _build_saved_thread
+
+
+class SlowProvider(MockAIProvider):
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    async def summarize_story(self, story_payload):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return await super().summarize_story(story_payload)
+
+
+class FakeClient:
+    def __init__(self):
+        self.fetched = []
+
+    async def fetch_item(self, item_id):
+        self.fetched.append(item_id)
+        if item_id == 999:
+            return {"id": 999, "type": "comment", "deleted": True}
+        return {"id": item_id, "type": "comment", "parent": 1, "by": "u", "text": f"fetched {item_id}", "time": item_id}
+
+
+@pytest.mark.asyncio
+async def test_saved_thread_is_concurrent_and_idempotent():
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    await cache.init()
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    story_repo = StoryRepository()
+    comment_repo = CommentRepository()
+    comment_summary_repo = CommentSummaryRepository()
+    repo = SavedThreadRepository()
+    provider = SlowProvider()
+    client = FakeClient()
+    mv = "v1"
+
+    with get_session(SessionLocal) as session:
+        story_repo.upsert(session, StoryData(hn_id=1, title="t", url="u", score=1, time=1, descendants=0, raw_payload={"id": 1, "title": "t"}))
+        comment_repo.upsert_many(
+            session, 1, [{"id": i, "type": "comment", "parent": 1, "by": "u", "text": f"stored {i}", "time": i} for i in (10, 11, 12)]
+        )
+        # an existing summary is reused, not regenerated
+        comment_summary_repo.upsert(session, 10, SummaryData(tldr="old", key_points=["k"], consensus="mixed"), mv, "mock")
+
+    comment_ids = [12, 10, 11, 20, 21, 999, 12]
+    job = {
+        "user_id": 7,
+        "story_hn_id": 1,
+        "comment_hn_ids": comment_ids,
+        "idempotency_key": saved_thread_idempotency_key(7, 1, comment_ids),
+    }
+
+    async def run():
+        await _build_saved_thread(
+            SessionLocal, story_repo, comment_repo, None, client, repo, comment_summary_repo,
+            CommentSummaryCache(cache, comment_summary_repo), provider, mv, "mock", job,
+        )
+
+    await run()
+    # story + 4 new comment summaries (10 reused, 999 deleted, 12 de-duplicated)
+    assert provider.calls == 5
+    assert provider.peak > 1
+    assert sorted(client.fetched) == [20, 21, 999]
+
+    with get_session(SessionLocal) as session:
+        threads = session.query(SavedThread).all()
+        assert len(threads) == 1
+        items = session.query(SavedThreadItem).order_by(SavedThreadItem.id).all()
+        assert [(i.item_type, i.hn_id) for i in items] == [("story", 1), ("comment", 12), ("comment", 10), ("comment", 11), ("comment", 20), ("comment", 21)]
+        assert items[2].ai_summary["tldr"] == "old"
+
+    # a redelivered job finds the thread and does no work
+    await run()
+    assert provider.calls == 5
+    with get_session(SessionLocal) as session:
+        assert session.query(SavedThread).count() == 1
+        assert session.query(SavedThreadItem).count() == 6
+
+    # losing a create race returns the existing thread instead of raising
+    with get_session(SessionLocal) as session:
+        thread, created = repo.create_thread_with_items(session, 7, 1, "t", "u", [], job["idempotency_key"])
+        assert created is False and thread.id == threads[0].id
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+import fakeredis.aioredis as fakeredis
+
+from app.services.cache.redis import RedisCache
+from app.tasks.scheduler import JobFamily, Scheduler, METRICS_KEY
+
+
+@pytest.mark.asyncio
+async def test_slow_family_does_not_block_others_and_metrics_are_published():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    pending = list(range(20))
+    processed = []
+
+    async def slow_crawl():
+        await asyncio.sleep(10)
+        return 1
+
+    async def summaries():
+        if not pending:
+            return 0
+        item = pending.pop()
+        await asyncio.sleep(0.01)
+        processed.append(item)
+        return 1
+
+    async def flaky():
+        raise RuntimeError("boom")
+
+    scheduler = Scheduler(
+        [
+            JobFamily("comment_signals", slow_crawl, interval=0.01),
+            JobFamily("summary_queue", summaries, interval=0.01, concurrency=4),
+            JobFamily("flaky", flaky, interval=0.01, error_backoff=0.01),
+        ],
+        redis_cache=cache,
+        metrics_interval=3600,
+    )
+
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # four concurrent consumers drained the queue while the crawl was still running
+    assert sorted(processed) == list(range(20))
+    snap = scheduler.snapshot()
+    assert snap["summary_queue"]["items"] == 20
+    assert snap["comment_signals"]["runs"] == 0
+    assert snap["flaky"]["errors"] >= 1
+
+    await scheduler.publish_metrics()
+    stored = await cache.get_json(METRICS_KEY)
+    assert stored["families"]["summary_queue"]["items"] == 20
+
+    await cache.close()
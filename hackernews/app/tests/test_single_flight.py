@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+import fakeredis.aioredis as fakeredis
+
+from app.services.cache.redis import RedisCache
+from app.services.cache.single_flight import SingleFlight, summary_flight_key
+
+
+async def _stampede(cache: RedisCache, callers: int = 10):
+    store: dict[str, str] = {}
+    calls = 0
+    key = summary_flight_key("story", 1, "v1")
+
+    async def check():
+        return store.get(key)
+
+    async def produce():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        store[key] = "summary"
+        return store[key]
+
+    flight = SingleFlight(cache, lock_timeout=5, wait_timeout=5)
+    results = await asyncio.gather(*(flight.run(key, check, produce) for _ in range(callers)))
+    return calls, results
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_generation():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    calls, results = await _stampede(cache)
+    assert calls == 1
+    assert results == ["summary"] * 10
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_without_redis_dedups_in_process():
+    cache = RedisCache()
+    await cache.init()
+
+    calls, results = await _stampede(cache)
+    assert calls == 1
+    assert set(results) == {"summary"}
+
+
+@pytest.mark.asyncio
+async def test_lock_is_held_past_its_timeout_while_producing():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+    key = summary_flight_key("story", 2, "v1")
+    held_late = None
+
+    async def check():
+        return None
+
+    async def produce():
+        nonlocal held_late
+        # well past the 1s lock timeout
+        await asyncio.sleep(1.6)
+        held_late = await fake.exists(f"lock:{key}")
+        return "summary"
+
+    assert await SingleFlight(cache, lock_timeout=1, wait_timeout=5).run(key, check, produce) == "summary"
+    assert held_late == 1
+    assert await fake.exists(f"lock:{key}") == 0
+    await cache.close()
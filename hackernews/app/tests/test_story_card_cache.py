@@ -0,0 +1,50 @@
+import pytest
+
+import fakeredis.aioredis as fakeredis
+
+from app.services.cache.redis import RedisCache
+from app.services.cache.story_card_cache import StoryCardCache
+from app.repositories.story_repo import StoryRepository
+from app.db.session import get_engine, init_sessionmaker, Base, get_session
+from app.services.sources.hackernews.fetcher import StoryData
+
+
+@pytest.mark.asyncio
+async def test_cards_filled_from_db_then_served_from_redis():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    repo = StoryRepository()
+
+    class CountingRepo(StoryRepository):
+        calls: list[list[int]] = []
+
+        def get_many(self, session, hn_ids):
+            self.calls.append(sorted(hn_ids))
+            return super().get_many(session, hn_ids)
+
+    with get_session(SessionLocal) as session:
+        repo.upsert_many(session, [
+            StoryData(hn_id=1, title="a", url="u", score=5, time=10, descendants=0, raw_payload={"id": 1, "score": 5, "time": 10}),
+            StoryData(hn_id=2, title="b", url="v", score=6, time=20, descendants=0, raw_payload={"id": 2, "score": 6, "time": 20}),
+        ])
+
+        counting = CountingRepo()
+        cards = StoryCardCache(cache, counting)
+
+        first = await cards.get_many(session, [2, 1, 99])
+        assert first == {
+            1: {"hn_id": 1, "title": "a", "url": "u", "score": 5, "time": 10},
+            2: {"hn_id": 2, "title": "b", "url": "v", "score": 6, "time": 20},
+        }
+        assert counting.calls == [[1, 2, 99]]
+
+        # second read is served by MGET; only the unknown id goes back to the DB
+        second = await cards.get_many(session, [1, 2, 99])
+        assert second == first
+        assert counting.calls == [[1, 2, 99], [99]]
@@ -0,0 +1,99 @@
+import pytest
+
+import fakeredis.aioredis as fakeredis
+
+from app.services.cache.redis import RedisCache
+from app.services.cache.summary_cache import SummaryCache
+from app.repositories.summary_repo import SummaryRepository
+from app.services.queue.story_events import (
+    StoryEventHub,
+    StorySubscription,
+    publish_story_event,
+    SUMMARY_READY,
+    COMMENTS_READY,
+)
+from app.db.session import get_engine, init_sessionmaker, Base, get_session
+from app.services.ai.base import SummaryData
+
+
+@pytest.mark.asyncio
+async def test_summary_and_comment_events_reach_subscribers():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    repo = SummaryRepository()
+    summary_cache = SummaryCache(cache, repo)
+
+    hub = StoryEventHub(cache)
+    async with StorySubscription(hub, 7) as sub:
+        assert sub.active and hub.subscribers(7) == 1
+        assert await sub.next_event(timeout=0.05) is None
+
+        await summary_cache.set(7, "v1", {"tldr": "x"})
+        event = await sub.next_event(timeout=1)
+        assert event["event"] == SUMMARY_READY
+        assert event["summary"] == {"tldr": "x"}
+
+        # a DB backfill on read is not a new summary, so nobody is notified
+        with get_session(SessionLocal) as session:
+            repo.upsert_summary(session, 7, SummaryData(tldr="y", key_points=[], consensus="mixed"), "v2", "mock")
+            assert await summary_cache.get_or_db(session, 7, "v2") is not None
+        assert await sub.next_event(timeout=0.05) is None
+
+        await publish_story_event(cache, 7, COMMENTS_READY, {"persisted": 3})
+        event = await sub.next_event(timeout=1)
+        assert event == {"event": COMMENTS_READY, "hn_id": 7, "persisted": 3}
+
+    assert hub.subscribers(7) == 0
+    await hub.stop()
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_events_endpoint_pushes_summary_ready_over_one_shared_subscription(monkeypatch):
+    import asyncio
+    import httpx
+    from app.config import settings
+    from app.main import create_app
+
+    # the test transport returns a response once its stream ends
+    monkeypatch.setattr(settings, "SSE_MAX_STREAM_SECONDS", 1.0)
+    monkeypatch.setattr(settings, "SSE_HEARTBEAT_SECONDS", 0.1)
+
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+    engine = get_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    app = create_app(redis_cache=cache, engine=engine)
+    hub = app.state.story_events
+
+    async def read_events(client):
+        resp = await client.get("/v1/stories/9/events")
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        return resp.text.splitlines()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        readers = [asyncio.create_task(read_events(client)) for _ in range(3)]
+        for _ in range(100):
+            if hub.subscribers(9) == 3:
+                break
+            await asyncio.sleep(0.01)
+        assert hub.subscribers(9) == 3
+        # three SSE clients, one Redis subscription
+        assert (await fake.execute_command("PUBSUB", "NUMPAT")) == 1
+
+        await SummaryCache(cache, SummaryRepository()).set(9, "mock-v1", {"tldr": "ready"})
+        frames = await asyncio.wait_for(asyncio.gather(*readers), timeout=5)
+
+    for lines in frames:
+        assert f"event: {SUMMARY_READY}" in lines
+        assert any('"tldr": "ready"' in l for l in lines if l.startswith("data: "))
+    await hub.stop()
+    await cache.close()
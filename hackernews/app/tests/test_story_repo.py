@@ -56,3 +56,33 @@ def test_fetch_latest_ordering():
 
         latest = repo.fetch_latest(session, limit=10)
         assert [s.hn_id for s in latest] == [2, 1]
+
+
+def test_upsert_many_batches_inserts_updates_and_noops():
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    repo = StoryRepository()
+
+    with get_session(SessionLocal) as session:
+        a = StoryData(hn_id=1, title="a", url="u", score=1, time=1, descendants=0, raw_payload={"id": 1, "title": "a"})
+        b = StoryData(hn_id=2, title="b", url="v", score=2, time=2, descendants=0, raw_payload={"id": 2, "title": "b"})
+        first = repo.upsert_many(session, [a, b])
+        assert [(s.hn_id, c, u) for s, c, u in first] == [(1, True, False), (2, True, False)]
+        b_updated_at = first[1][0].updated_at
+
+        time.sleep(0.01)
+        a2 = StoryData(hn_id=1, title="a2", url="u2", score=5, time=1, descendants=0, raw_payload={"id": 1, "title": "a2"})
+        c = StoryData(hn_id=3, title="c", url="w", score=3, time=3, descendants=0, raw_payload={"id": 3, "title": "c"})
+        second = repo.upsert_many(session, [a2, b, c])
+        assert [(s.hn_id, c_, u) for s, c_, u in second] == [(1, False, True), (2, False, False), (3, True, False)]
+
+        story_a, _, _ = second[0]
+        assert story_a.title == "a2"
+        assert story_a.url == "u2"
+        story_b, _, _ = second[1]
+        assert story_b.updated_at == b_updated_at
+        assert story_b.last_fetched_at > b_updated_at
+
+        assert repo.upsert_many(session, []) == []
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+import fakeredis.aioredis as fakeredis
+
+from app.services.cache.redis import RedisCache, INTEREST_SIGNAL_STREAM, INTEREST_SIGNAL_PENDING
+from app.services.queue.streams import StreamQueue, dead_letter_stream
+from app.services.queue.summary_queue import enqueue_summary, summary_queue
+
+
+@pytest.mark.asyncio
+async def test_consumers_share_group_and_ack():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    for hn_id in (1, 2):
+        await enqueue_summary(cache, hn_id, user_id=7)
+
+    a = summary_queue(cache, consumer="a")
+    b = summary_queue(cache, consumer="b")
+    ja = await a.read(count=1, block_ms=10)
+    jb = await b.read(count=1, block_ms=10)
+    assert {ja[0].payload["hn_id"], jb[0].payload["hn_id"]} == {1, 2}
+
+    await a.ack(ja[0])
+    await b.ack(jb[0])
+    assert await a.read(count=1, block_ms=10) == []
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_unacked_jobs_are_reclaimed_then_dead_lettered():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    crashed = StreamQueue(cache, "jobs", consumer="crashed", claim_idle_ms=1, max_deliveries=2)
+    survivor = StreamQueue(cache, "jobs", consumer="survivor", claim_idle_ms=1, max_deliveries=2)
+    await crashed.publish({"n": 1})
+
+    first = await crashed.read(block_ms=10)
+    assert first[0].payload == {"n": 1}
+    # never acked -> another replica picks it up once it has been idle
+    await asyncio.sleep(0.01)
+    retried = await survivor.read(block_ms=10)
+    assert retried[0].id == first[0].id
+    assert retried[0].deliveries == 2
+
+    # one more failed delivery exceeds the budget and it is parked
+    await asyncio.sleep(0.01)
+    assert await survivor.read(block_ms=10) == []
+    dead = await cache.xlen(dead_letter_stream("jobs"))
+    assert dead == 1
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_interest_signals_are_deduped_until_delivered():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    await cache.signal_interest_fetch(5)
+    await cache.signal_interest_fetch(5)
+    assert await cache.xlen(INTEREST_SIGNAL_STREAM) == 1
+
+    q = StreamQueue(cache, INTEREST_SIGNAL_STREAM, consumer="w", pending_set=INTEREST_SIGNAL_PENDING)
+    jobs = await q.read(block_ms=10)
+    assert jobs[0].payload == 5
+    await q.ack(jobs[0])
+
+    # delivered -> a new signal is accepted again
+    await cache.signal_interest_fetch(5)
+    assert await cache.xlen(INTEREST_SIGNAL_STREAM) == 2
+
+    # a batch only appends the interests not already pending
+    await cache.signal_interest_fetches([5, 6, 7, 6])
+    assert await cache.xlen(INTEREST_SIGNAL_STREAM) == 4
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_jobs_left_in_the_pre_streams_list_are_moved_onto_the_stream():
+    from app.services.queue.summary_queue import LEGACY_QUEUE_KEY
+
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    # what a pre-streams replica left behind (LPUSH, consumed with RPOP)
+    await cache.lpush(LEGACY_QUEUE_KEY, {"hn_id": 1, "user_id": 7})
+    await cache.lpush(LEGACY_QUEUE_KEY, {"hn_id": 2, "user_id": 7})
+
+    # enqueueing no longer collides with the list key
+    assert await enqueue_summary(cache, 3, 7) is not None
+
+    worker = summary_queue(cache, consumer="w")
+    jobs = await worker.read(count=10, block_ms=10)
+    assert [j.payload["hn_id"] for j in jobs] == [3, 1, 2]
+    assert await fake.exists(LEGACY_QUEUE_KEY) == 0
+
+    await cache.close()
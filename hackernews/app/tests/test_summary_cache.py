@@ -34,3 +34,139 @@ async def test_summary_cache_set_get_and_db_fallback():
         got = await cache.get(1, "v1")
         assert got["tldr"] == "x"
 
+
+
+@pytest.mark.asyncio
+async def test_summary_cache_get_many_or_db_backfills():
+    redis = RedisCache(client=fakeredis.FakeRedis())
+    await redis.init()
+    cache = SummaryCache(redis, SummaryRepository())
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    with get_session(SessionLocal) as session:
+        for hn_id in (1, 2):
+            SummaryRepository().upsert_summary(session, hn_id, SummaryData(tldr=f"t{hn_id}", key_points=[], consensus="mixed"), "v1")
+        await cache.set(3, "v1", {"tldr": "cached"}, notify=False)
+
+        found = await cache.get_many_or_db(session, [3, 1, 2, 4], "v1")
+        assert {k: v["tldr"] for k, v in found.items()} == {3: "cached", 1: "t1", 2: "t2"}
+        # DB hits were written back
+        assert set(await cache.get_many([1, 2, 4], "v1")) == {1, 2}
+
+
+class SlowSummaryRepository(SummaryRepository):
+    def __init__(self):
+        self.reads = 0
+
+    def fetch_latest(self, session, story_hn_id, model_version):
+        import time
+
+        self.reads += 1
+        time.sleep(0.05)
+        return super().fetch_latest(session, story_hn_id, model_version)
+
+
+@pytest.mark.asyncio
+async def test_summary_cache_fill_is_single_flight_and_serves_stale():
+    from app.services.cache.early_expiry import should_refresh, wrap
+
+    fake = fakeredis.FakeRedis()
+    redis = RedisCache(client=fake)
+    await redis.init()
+    repo = SlowSummaryRepository()
+    cache = SummaryCache(redis, repo)
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    with get_session(SessionLocal) as session:
+        repo.upsert_summary(session, 1, SummaryData(tldr="db", key_points=[], consensus="mixed"), "v1")
+
+        # a cold popular key: one reader hits the DB, the rest wait for its fill
+        results = await asyncio.gather(*(cache.get_or_db(session, 1, "v1") for _ in range(20)))
+        assert {r["tldr"] for r in results} == {"db"}
+        assert repo.reads == 1
+        # stored in an envelope; callers only ever see the payload
+        assert (await cache.get(1, "v1"))["tldr"] == "db"
+
+        # logically expired while another reader holds the fill lock: stale value, no DB read
+        envelope, _ttl = wrap({"tldr": "stale"}, 60)
+        envelope["exp"] = 0
+        await redis.set_json("summary:v2:story:1:model:v1", envelope, ex=60)
+        await redis.set_json("fill:summary:v2:story:1:model:v1", 1, ex=5)
+        assert (await cache.get_or_db(session, 1, "v1"))["tldr"] == "stale"
+        assert repo.reads == 1
+
+        await redis.delete("fill:summary:v2:story:1:model:v1")
+        assert (await cache.get_or_db(session, 1, "v1"))["tldr"] == "db"
+        assert repo.reads == 2
+
+    # XFetch: never early when far from expiry, always once past it
+    assert not any(should_refresh(exp=1000.0, delta=0.01, now=0.0) for _ in range(100))
+    assert all(should_refresh(exp=1000.0, delta=0.01, now=1000.0) for _ in range(100))
+    # close to expiry with an expensive refill, some (not all) readers refresh early
+    early = sum(should_refresh(exp=1000.0, delta=5.0, now=995.0) for _ in range(1000))
+    assert 0 < early < 1000
+
+    # TTL jitter spreads keys written together
+    from app.config import settings
+
+    grace = settings.SUMMARY_STALE_GRACE_SECONDS
+    ttls = {wrap({}, 3600)[1] for _ in range(20)}
+    assert len(ttls) > 1 and all(3240 + grace <= t <= 3960 + grace for t in ttls)
+
+
+@pytest.mark.asyncio
+async def test_envelopes_do_not_overwrite_the_legacy_summary_keys():
+    fake = fakeredis.FakeRedis()
+    redis = RedisCache(client=fake)
+    await redis.init()
+    cache = SummaryCache(redis, SummaryRepository())
+
+    # replicas on the old layout read and write bare payloads here during a rollout
+    legacy = {"tldr": "old", "key_points": [], "consensus": "mixed"}
+    await redis.set_json("summary:story:1:model:v1", legacy, ex=60)
+
+    await cache.set(1, "v1", {"tldr": "new"}, notify=False)
+    assert await redis.get_json("summary:story:1:model:v1") == legacy
+    assert (await cache.get(1, "v1"))["tldr"] == "new"
+
+
+@pytest.mark.asyncio
+async def test_fill_lock_is_released_only_by_its_owner(monkeypatch):
+    from app.config import settings
+    from app.services.cache.early_expiry import read_through
+
+    monkeypatch.setattr(settings, "SUMMARY_FILL_LOCK_SECONDS", 1)
+    fake = fakeredis.FakeRedis()
+    redis = RedisCache(client=fake)
+    await redis.init()
+    key = "summary:v2:story:1:model:v1"
+    second_filling = asyncio.Event()
+    release_second = asyncio.Event()
+
+    async def slow_load():
+        await asyncio.sleep(1.3)  # outlives its fill lock
+        return {"tldr": "slow"}
+
+    async def second_load():
+        second_filling.set()
+        await release_second.wait()
+        return {"tldr": "second"}
+
+    first = asyncio.create_task(read_through(redis, key, slow_load, 60))
+    await asyncio.sleep(1.1)
+    second = asyncio.create_task(read_through(redis, key, second_load, 60))
+    await second_filling.wait()
+
+    assert (await first)["tldr"] == "slow"
+    # the late first filler must not have released the second filler's lock
+    assert await fake.exists(f"fill:{key}")
+
+    release_second.set()
+    assert (await second)["tldr"] == "second"
+    assert not await fake.exists(f"fill:{key}")
@@ -0,0 +1,170 @@
+import pytest
+
+import fakeredis.aioredis as fakeredis
+
+from app.config import settings
+from app.services.cache.redis import RedisCache
+from app.services.cache.summary_cache import SummaryCache
+from app.db.session import get_engine, init_sessionmaker, Base, get_session
+from app.repositories.story_repo import StoryRepository
+from app.repositories.comment_repo import CommentRepository
+from app.repositories.summary_repo import SummaryRepository
+from app.services.ai.mock_provider import MockAIProvider
+from app.services.sources.hackernews.fetcher import StoryData
+from app.tasks.worker import _summarize_queued_story
+
+
+class RecordingProvider(MockAIProvider):
+    def __init__(self):
+        self.payloads = []
+
+    async def summarize_story(self, story_payload):
+        self.payloads.append(story_payload)
+        return await super().summarize_story(story_payload)
+
+
+def _comments(start, count):
+    return [
+        {"id": i, "type": "comment", "parent": 1, "by": "u", "text": f"comment number {i}", "time": i}
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_refresh_sends_only_new_comments(monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_DELTA_MIN_NEW_COMMENTS", 5)
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    await cache.init()
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    story_repo = StoryRepository()
+    comment_repo = CommentRepository()
+    summary_repo = SummaryRepository()
+    summary_cache = SummaryCache(cache, summary_repo)
+    provider = RecordingProvider()
+    mv = "v1"
+
+    with get_session(SessionLocal) as session:
+        story_repo.upsert(session, StoryData(hn_id=1, title="t", url="u", score=1, time=1, descendants=0, raw_payload={"id": 1, "title": "t"}))
+        comment_repo.upsert_many(session, 1, _comments(100, 10))
+
+    async def run(job):
+        await _summarize_queued_story(SessionLocal, story_repo, summary_repo, summary_cache, provider, mv, "mock", job)
+
+    # a refresh never creates a summary nobody asked for
+    await run({"hn_id": 1, "refresh": True})
+    assert provider.payloads == []
+
+    await run({"hn_id": 1})
+    with get_session(SessionLocal) as session:
+        assert summary_repo.fetch_latest(session, 1, mv).comment_ids == list(range(100, 110))
+    full_calls = len(provider.payloads)
+
+    # below the threshold: nothing happens
+    with get_session(SessionLocal) as session:
+        comment_repo.upsert_many(session, 1, _comments(110, 3))
+    await run({"hn_id": 1, "refresh": True})
+    assert len(provider.payloads) == full_calls
+
+    with get_session(SessionLocal) as session:
+        comment_repo.upsert_many(session, 1, _comments(113, 20))
+    await run({"hn_id": 1, "refresh": True})
+
+    delta = provider.payloads[full_calls:]
+    assert len(delta) == 1
+    text = delta[0]["text"]
+    assert "Current summary" in text
+    new_section = text.split("New comments:")[1]
+    assert "comment number 110" in new_section and "comment number 132" in new_section
+    assert "comment number 109" not in new_section
+    with get_session(SessionLocal) as session:
+        assert summary_repo.fetch_latest(session, 1, mv).comment_ids == list(range(100, 133))
+
+    # nothing new since the refresh
+    await run({"hn_id": 1, "refresh": True})
+    assert len(provider.payloads) == full_calls + 1
+
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_busy_thread_refresh_reaches_the_newest_comments(monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_DELTA_MIN_NEW_COMMENTS", 5)
+    monkeypatch.setattr(settings, "DISCUSSION_MAX_COMMENTS", 20)
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    await cache.init()
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    story_repo = StoryRepository()
+    comment_repo = CommentRepository()
+    summary_repo = SummaryRepository()
+    provider = RecordingProvider()
+    mv = "v1"
+
+    # more stored comments than one summary reads
+    with get_session(SessionLocal) as session:
+        story_repo.upsert(session, StoryData(hn_id=1, title="t", url="u", score=1, time=1, descendants=0, raw_payload={"id": 1, "title": "t"}))
+        comment_repo.upsert_many(session, 1, _comments(100, 25))
+
+    async def run(job):
+        await _summarize_queued_story(SessionLocal, story_repo, summary_repo, SummaryCache(cache, summary_repo), provider, mv, "mock", job)
+
+    await run({"hn_id": 1})
+    with get_session(SessionLocal) as session:
+        assert summary_repo.fetch_latest(session, 1, mv).comment_ids == list(range(105, 125))
+
+    # comments arriving later are still picked up, along with older uncovered ones
+    with get_session(SessionLocal) as session:
+        comment_repo.upsert_many(session, 1, _comments(125, 6))
+    await run({"hn_id": 1, "refresh": True})
+    with get_session(SessionLocal) as session:
+        assert summary_repo.fetch_latest(session, 1, mv).comment_ids == list(range(100, 131))
+
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_small_crawls_add_up_to_a_refresh(monkeypatch):
+    from app.services.queue.summary_queue import summary_queue
+    from app.services.ai.schemas import SummaryData
+    from app.tasks.worker import _crawl_story_comments, _process_summary_queue
+
+    monkeypatch.setattr(settings, "SUMMARY_DELTA_MIN_NEW_COMMENTS", 10)
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    await cache.init()
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    story_repo = StoryRepository()
+    comment_repo = CommentRepository()
+    summary_repo = SummaryRepository()
+    mv = settings.SUMMARIZATION_MODEL_VERSION
+    queue = summary_queue(cache, consumer="w")
+
+    class FakeClient:
+        async def fetch_item(self, item_id):
+            return {"id": item_id, "type": "comment", "parent": 1, "by": "u", "text": f"comment number {item_id}", "time": item_id}
+
+    with get_session(SessionLocal) as session:
+        summary_repo.upsert_summary(session, 1, SummaryData(tldr="old", key_points=[], consensus="mixed"), mv, "mock", [])
+
+    # each crawl brings 4 new comments, below the threshold on its own
+    for crawl in range(3):
+        kids = list(range(100, 104 + crawl * 4))
+        with get_session(SessionLocal) as session:
+            story_repo.upsert(session, StoryData(hn_id=1, title="t", url="u", score=1, time=1, descendants=len(kids), raw_payload={"id": 1, "title": "t", "kids": kids}))
+        await _crawl_story_comments(SessionLocal, cache, FakeClient(), story_repo, comment_repo, 1)
+        await _process_summary_queue(SessionLocal, cache, story_repo, queue)
+        with get_session(SessionLocal) as session:
+            covered = summary_repo.fetch_latest(session, 1, mv).comment_ids
+        assert covered == ([] if crawl < 2 else list(range(100, 112)))
+
+    await cache.close()
@@ -0,0 +1,80 @@
+import pytest
+
+import fakeredis.aioredis as fakeredis
+
+from app.config import settings
+from app.services.cache.redis import RedisCache
+from app.db.session import get_engine, init_sessionmaker, Base, get_session
+from app.repositories.story_repo import StoryRepository
+from app.repositories.summary_repo import SummaryRepository
+from app.services.sources.hackernews.fetcher import StoryData
+from app.services.queue.summary_queue import (
+    submit_summary_job,
+    get_job_status,
+    summary_queue,
+    parse_summary_job_id,
+    JOB_DONE,
+    JOB_FAILED,
+)
+from app.tasks.worker import _process_summary_queue
+
+
+@pytest.mark.asyncio
+async def test_duplicate_requests_enqueue_one_job_that_the_worker_completes():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    story_repo = StoryRepository()
+    with get_session(SessionLocal) as session:
+        story_repo.upsert_many(session, [
+            StoryData(hn_id=42, title="t", url="u", score=1, time=1, descendants=0, raw_payload={"id": 42, "title": "t"}),
+        ])
+
+    mv = settings.SUMMARIZATION_MODEL_VERSION
+    first = await submit_summary_job(cache, "story", 42, 1, mv)
+    second = await submit_summary_job(cache, "story", 42, 2, mv)
+    assert first == second == (f"story:42:{mv}", "queued")
+    assert parse_summary_job_id(first[0]) == ("story", 42, mv)
+
+    queue = summary_queue(cache, consumer="w")
+    assert await queue.length() == 1
+
+    handled = await _process_summary_queue(SessionLocal, cache, story_repo, queue)
+    assert handled == 1
+    assert (await get_job_status(cache, first[0]))["status"] == JOB_DONE
+
+    with get_session(SessionLocal) as session:
+        assert SummaryRepository().fetch_latest(session, 42, mv) is not None
+
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_job_for_a_missing_story_or_comment_fails():
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    await cache.init()
+
+    engine = get_engine("sqlite:///:memory:")
+    SessionLocal = init_sessionmaker(engine)
+    Base.metadata.create_all(engine)
+
+    mv = settings.SUMMARIZATION_MODEL_VERSION
+    story_job, _ = await submit_summary_job(cache, "story", 404, 1, mv)
+    comment_job, _ = await submit_summary_job(cache, "comment", 405, 1, mv)
+
+    queue = summary_queue(cache, consumer="w")
+    assert await _process_summary_queue(SessionLocal, cache, StoryRepository(), queue) == 2
+
+    story_status = await get_job_status(cache, story_job)
+    comment_status = await get_job_status(cache, comment_job)
+    assert (story_status["status"], story_status["error"]) == (JOB_FAILED, "story not found")
+    assert (comment_status["status"], comment_status["error"]) == (JOB_FAILED, "comment not found")
+    # acked: a permanent miss is not retried
+    assert await queue.read(count=1, block_ms=10) == []
+
+    await cache.close()
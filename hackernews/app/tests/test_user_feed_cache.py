@@ -0,0 +1,54 @@
+import pytest
+
+import fakeredis.aioredis as fakeredis
+
+from app.services.cache.redis import RedisCache
+from app.services.cache.user_feed_cache import UserFeedCache
+
+
+@pytest.mark.asyncio
+async def test_user_feed_page_roundtrip_and_invalidation():
+    fake = fakeredis.FakeRedis()
+    cache = RedisCache(client=fake)
+    await cache.init()
+
+    feeds = UserFeedCache(cache)
+    assert await feeds.get(1) == (None, 0)
+
+    items = [{"hn_id": 10, "title": "a"}, {"hn_id": 11, "title": "b"}]
+    await feeds.set(1, items, 0)
+    await feeds.set(2, items[:1], 0)
+    assert await feeds.get(1) == (items, 0)
+
+    # user action drops only that user's page
+    await feeds.invalidate(1)
+    assert await feeds.get(1) == (None, 0)
+    assert await feeds.get(2) == (items[:1], 0)
+
+    # shelf rotation retires every page built on the old epoch
+    await feeds.bump_epoch()
+    cached, epoch = await feeds.get(2)
+    assert cached is None and epoch == 1
+
+    await feeds.set(2, items, epoch)
+    assert await feeds.get(2) == (items, 1)
+
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_page_built_across_a_shelf_rotation_is_not_served():
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    await cache.init()
+    feeds = UserFeedCache(cache)
+
+    cached, epoch = await feeds.get(1)
+    assert cached is None
+    # shelves rotate while the page is being built from the old ones
+    await feeds.bump_epoch()
+    await feeds.set(1, [{"hn_id": 10}], epoch)
+
+    cached, epoch = await feeds.get(1)
+    assert cached is None and epoch == 1
+
+    await cache.close()
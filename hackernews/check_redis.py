@@ -12,7 +12,7 @@ async def check_redis():
         return
         
     print("--- Interest Queue ---")
-    qlen = await redis.llen("interest_fetch_queue")
+    qlen = await redis.xlen("interest_fetch_stream")
     print(f"Queue length: {qlen}")
     
     print("\n--- Watermarks ---")
@@ -20,7 +20,7 @@ async def check_redis():
     print(val)
     
     print("\n--- Summary Queue ---")
-    slen = await redis.llen("summary_queue")
+    slen = await redis.xlen("summary:stream")
     print(f"Summary Queue length: {slen}")
     
     await redis.close()
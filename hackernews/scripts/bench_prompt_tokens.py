@@ -0,0 +1,101 @@
+"""Compare estimated prompt tokens per summary: raw-payload prompt vs compact prompt.
+
+Usage (from the hackernews/ directory):
+    python scripts/bench_prompt_tokens.py [--budget 1500] [--stories 200]
+
+Uses synthetic HN-shaped payloads (busy stories with large `kids` lists, Ask HN
+text posts, HTML-heavy comments) so it runs offline.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.ai.prompt import SUMMARY_INSTRUCTIONS, build_summary_prompt, estimate_tokens  # noqa: E402
+
+WORDS = "the rust kernel driver latency memory model compiler async runtime postgres index query cache".split()
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _html(rng: random.Random, paragraphs: int) -> str:
+    parts = []
+    for _ in range(paragraphs):
+        body = _sentence(rng, rng.randint(15, 40)).replace("the", "the &quot;", 1)
+        if rng.random() < 0.3:
+            body += ' See <a href="https:&#x2F;&#x2F;example.com&#x2F;post" rel="nofollow">https:&#x2F;&#x2F;example.com&#x2F;p...</a>'
+        if rng.random() < 0.2:
+            body += " <i>really</i>"
+        parts.append(body)
+    return "<p>".join(parts)
+
+
+def make_story(rng: random.Random, i: int) -> dict:
+    kids = [rng.randint(30_000_000, 40_000_000) for _ in range(rng.choice([0, 20, 150, 600]))]
+    story = {
+        "by": f"user{i}",
+        "descendants": len(kids) * 3,
+        "id": 40_000_000 + i,
+        "kids": kids,
+        "score": rng.randint(1, 2000),
+        "time": 1_700_000_000 + i,
+        "title": _sentence(rng, 8).rstrip("."),
+        "type": "story",
+        "url": f"https://example.com/{i}",
+    }
+    if rng.random() < 0.3:
+        story["text"] = _html(rng, rng.randint(1, 30))
+    return story
+
+
+def make_comment(rng: random.Random, i: int) -> dict:
+    return {
+        "by": f"commenter{i}",
+        "id": 41_000_000 + i,
+        "kids": [rng.randint(30_000_000, 40_000_000) for _ in range(rng.randint(0, 40))],
+        "parent": 40_000_000 + i,
+        "text": _html(rng, rng.randint(1, 12)),
+        "time": 1_700_000_000 + i,
+        "type": "comment",
+    }
+
+
+def legacy_prompt(payload: dict) -> str:
+    """The previous prompt: instructions + the full raw payload."""
+    return SUMMARY_INSTRUCTIONS.format(kind="story") + f"Story payload: {json.dumps(payload, ensure_ascii=False)}"
+
+
+def report(label: str, payloads: list, budget: int) -> None:
+    before = [estimate_tokens(legacy_prompt(p)) for p in payloads]
+    started = time.perf_counter()
+    after = [estimate_tokens(build_summary_prompt(p, token_budget=budget)) for p in payloads]
+    build_ms = (time.perf_counter() - started) * 1000 / len(payloads)
+    print(
+        f"{label:<9} n={len(payloads):<4} "
+        f"before mean={statistics.mean(before):>7.0f} p95={sorted(before)[int(len(before) * 0.95)]:>6} | "
+        f"after mean={statistics.mean(after):>6.0f} p95={sorted(after)[int(len(after) * 0.95)]:>5} | "
+        f"saved={1 - sum(after) / sum(before):.0%} build={build_ms:.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=1500)
+    parser.add_argument("--stories", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    report("stories", [make_story(rng, i) for i in range(args.stories)], args.budget)
+    report("comments", [make_comment(rng, i) for i in range(args.stories)], args.budget)
+
+
+if __name__ == "__main__":
+    main()
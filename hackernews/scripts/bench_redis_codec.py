@@ -0,0 +1,101 @@
+"""Compare Redis value codecs: bytes stored and encode/decode time per payload shape.
+
+Usage (from the hackernews/ directory):
+    python scripts/bench_redis_codec.py [--iterations 2000] [--compress-min-bytes 1024]
+
+Payloads mirror what the API caches (top-stories feed, search results, a story
+summary, a materialized user feed page) and are generated offline. Codecs whose
+package is not installed (orjson, msgpack) are skipped.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.cache.redis import RedisCodec, msgpack, orjson  # noqa: E402
+
+WORDS = "the rust kernel driver latency memory model compiler async runtime postgres index query cache".split()
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _card(rng: random.Random, i: int) -> dict:
+    return {
+        "hn_id": 40_000_000 + i,
+        "title": _words(rng, rng.randint(5, 12)).capitalize(),
+        "url": f"https://example.com/{_words(rng, 3).replace(' ', '-')}" if rng.random() < 0.85 else None,
+        "score": rng.randint(1, 2000),
+        "time": 1_700_000_000 + i * 37,
+    }
+
+
+def payloads(rng: random.Random) -> dict:
+    return {
+        "top feed (50)": [_card(rng, i) for i in range(50)],
+        "search (20)": [_card(rng, i) for i in range(20)],
+        "summary": {
+            "tldr": _words(rng, 25).capitalize() + ".",
+            "key_points": [_words(rng, rng.randint(10, 20)).capitalize() + "." for _ in range(5)],
+            "consensus": "mixed",
+            "model_version": "v1",
+            "model_name": "gpt-4o-mini",
+            "created_at": "2024-05-01T12:00:00",
+            "updated_at": "2024-05-01T12:00:00",
+        },
+        "user feed page": {
+            "epoch": 42,
+            "items": [{**_card(rng, i), "is_read": False, "tags": ["Databases", "Rust"]} for i in range(50)],
+        },
+    }
+
+
+def _time_us(fn, value, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(value)
+    return (time.perf_counter() - started) * 1_000_000 / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--compress-min-bytes", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    codecs = {"json (legacy)": RedisCodec("json"), "json+zlib": RedisCodec("json", args.compress_min_bytes)}
+    # before this codec layer: stdlib json both ways
+    stdlib = (json.dumps, json.loads)
+    if orjson is not None:
+        codecs["orjson"] = RedisCodec("orjson")
+        codecs["orjson+zlib"] = RedisCodec("orjson", args.compress_min_bytes)
+    if msgpack is not None:
+        codecs["msgpack"] = RedisCodec("msgpack")
+        codecs["msgpack+zlib"] = RedisCodec("msgpack", args.compress_min_bytes)
+
+    for label, value in payloads(random.Random(args.seed)).items():
+        print(label)
+        baseline = None
+        rows = [("stdlib json", *stdlib)] + [(name, codec.encode, codec.decode) for name, codec in codecs.items()]
+        for name, encode, decode in rows:
+            raw = encode(value)
+            raw = raw.encode("utf-8") if isinstance(raw, str) else raw
+            assert decode(raw) == value
+            _time_us(decode, raw, 50)  # warm up
+            enc = _time_us(encode, value, args.iterations)
+            dec = _time_us(decode, raw, args.iterations)
+            baseline = baseline or (len(raw), dec)
+            print(
+                f"  {name:<14} bytes={len(raw):>6} ({len(raw) / baseline[0]:>4.0%}) "
+                f"encode={enc:>7.1f}us decode={dec:>7.1f}us ({baseline[1] / dec:>4.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()